@@ -0,0 +1,76 @@
+"""
+Recall@k, query latency and memory of the FAISS index types in
+vector_controller, with the flat index as exact ground truth.
+
+Data is synthetic: 384-dim vectors drawn around random cluster centres and
+normalized, roughly like sentence embeddings.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_ann_index --sizes 20000 100000 --metric cosine
+"""
+
+import argparse
+import time
+
+import faiss
+import numpy as np
+
+from models.controller.vector_controller import choose_index_type, create_faiss_index, search_faiss_index
+
+
+def make_vectors(count, dimension, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype("float32")
+    vectors = centres[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, dimension)).astype("float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def query_latencies(index, queries, k, metric):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        search_faiss_index(index, query[None, :], k, metric)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", choices=["L2", "cosine"], default="cosine")
+    parser.add_argument("--memory-budget-mb", type=float, default=None)
+    args = parser.parse_args()
+
+    header = f"{'n':>8} {'type':>6} {'build s':>8} {'recall@k':>9} {'p50 ms':>7} {'p99 ms':>7} {'MB':>8}"
+    for size in args.sizes:
+        corpus = make_vectors(size, args.dimension)
+        queries = make_vectors(args.queries, args.dimension, seed=1)
+        print(f"\nauto -> {choose_index_type(size, args.dimension, args.memory_budget_mb)}")
+        print(header)
+
+        truth = None
+        for index_type in ("flat", "ivf", "hnsw", "ivfpq"):
+            start = time.perf_counter()
+            index = create_faiss_index(corpus, metric=args.metric, index_type=index_type)
+            build_s = time.perf_counter() - start
+
+            _, found = search_faiss_index(index, queries, args.k, args.metric)
+            if truth is None:
+                truth = found
+            latency = query_latencies(index, queries, args.k, args.metric)
+            memory_mb = faiss.serialize_index(index).nbytes / 2**20
+            print(f"{size:>8} {index_type:>6} {build_s:>8.2f} {recall_at_k(found, truth):>9.3f} "
+                  f"{np.percentile(latency, 50):>7.3f} {np.percentile(latency, 99):>7.3f} {memory_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Throughput and parity of the embedding backends against full-precision PyTorch.
+
+For each backend, reports chunks/s, the cosine similarity of its vectors
+to the fp32 ones (mean and worst case) and how often the nearest neighbour
+of a chunk among the others stays the same. Thread counts come from
+MED_CHAT_INTRA_OP_THREADS / MED_CHAT_INTER_OP_THREADS.
+
+Run from the `src` directory, with the model in MED_CHAT_MODEL_DIR:
+    MED_CHAT_INTRA_OP_THREADS=4 python -m benchmarks.bench_backends --chunks 512
+    python -m benchmarks.bench_backends --backends torch torch-int8
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_sentences
+from models.controller.model_registry import BACKENDS, INTER_OP_THREADS, INTRA_OP_THREADS, get_sentence_transformer
+
+
+def make_chunks(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(make_sentences(rng.randint(1, 6), rng)) for _ in range(count)]
+
+
+def encode(model, chunks, batch_size):
+    return np.asarray(
+        model.encode(chunks, batch_size=batch_size, show_progress_bar=False, normalize_embeddings=True),
+        dtype=np.float32,
+    )
+
+
+def nearest_neighbours(vectors):
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, -np.inf)
+    return similarity.argmax(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    reference = None
+    print(f"threads: intra-op {INTRA_OP_THREADS or 'default'}, inter-op {INTER_OP_THREADS or 'default'}")
+    print(f"{'backend':<11} {'chunks/s':>9} {'speedup':>8} {'cos mean':>9} {'cos min':>8} {'same NN':>8}")
+
+    for backend in ["torch"] + [b for b in args.backends if b != "torch"]:
+        try:
+            model = get_sentence_transformer(backend=backend)
+        except Exception as e:
+            print(f"{backend:<11} unavailable: {str(e)}")
+            continue
+        encode(model, chunks[:args.batch_size], args.batch_size)  # Warm up
+
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            vectors = encode(model, chunks, args.batch_size)
+            best = min(best, time.perf_counter() - start)
+
+        if reference is None:
+            reference, reference_s, reference_nn = vectors, best, nearest_neighbours(vectors)
+        cosine = (vectors * reference).sum(axis=1)
+        same_nn = (nearest_neighbours(vectors) == reference_nn).mean()
+        print(f"{backend:<11} {len(chunks) / best:>9.1f} {reference_s / best:>7.2f}x "
+              f"{cosine.mean():>9.4f} {cosine.min():>8.4f} {same_nn:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Time per Streamlit rerun of the chat sidebar with 10, 100 and 1000 turns of
+history: rendering every message (the old behaviour) versus the bounded,
+paginated history, plus repeated-question latency with the response cache.
+
+Uses Streamlit's AppTest, so no browser or server is needed.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_chat_rerun --turns 10 100 1000
+"""
+
+import argparse
+import statistics
+import time
+from collections import deque
+
+from streamlit.testing.v1 import AppTest
+
+
+def render_all_app():
+    import streamlit as st
+
+    for message in st.session_state.chat_history:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+
+def render_bounded_app():
+    import streamlit as st
+
+    from streamlit_app import render_chat_history
+
+    render_chat_history(st.session_state.chat_history)
+
+
+def make_history(turns):
+    history = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": f"I feel tired today with headache ({turn})"})
+        history.append({"role": "assistant", "content": "Try Deep Breathing to manage tired mood."})
+    return history
+
+
+def rerun_ms(app_fn, history, reruns):
+    from streamlit_app import MAX_CHAT_MESSAGES
+
+    app = AppTest.from_function(app_fn, default_timeout=60)
+    if app_fn is render_bounded_app:
+        history = deque(history, maxlen=MAX_CHAT_MESSAGES)
+    app.session_state["chat_history"] = history
+    app.run()  # First run imports modules
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def cached_lookup_ms(queries):
+    from benchmarks.synthetic import make_qa_dataset
+    from chatbot_matcher import QuestionMatcher, ResponseCache
+    from streamlit_app import get_chatbot_response
+
+    database = make_qa_dataset(20000)
+    matcher = QuestionMatcher(database)
+    cache = ResponseCache()
+
+    def timed(cache_arg):
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            get_chatbot_response(query, database, matcher, cache_arg)
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    return timed(None), timed(cache)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--reruns", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'turns':>6} {'render all ms':>14} {'bounded ms':>11}")
+    for turns in args.turns:
+        history = make_history(turns)
+        print(f"{turns:>6} {rerun_ms(render_all_app, history, args.reruns):>14.1f} "
+              f"{rerun_ms(render_bounded_app, history, args.reruns):>11.1f}")
+
+    # The same few questions in trivially different spellings, as users type them
+    queries = [q for base in ("fever", "headache", "i feel sad today") for q in (base, base.title(), base + "?")] * 10
+    uncached, cached = cached_lookup_ms(queries)
+    print(f"\nrepeated questions (20k rows): uncached {uncached:.2f} ms, cached {cached:.3f} ms per lookup")
+
+
+if __name__ == "__main__":
+    main()
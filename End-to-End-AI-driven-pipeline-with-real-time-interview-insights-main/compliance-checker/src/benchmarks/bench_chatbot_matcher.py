@@ -0,0 +1,83 @@
+"""
+Latency benchmark for chatbot question matching.
+
+Compares the original per-message lookup (list rebuild, `extractOne` scan and
+a second column scan for the answer) against the prebuilt QuestionMatcher
+across dataset sizes.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_chatbot_matcher --sizes 1000 10000 50000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from chatbot_matcher import QuestionMatcher
+
+try:
+    from fuzzywuzzy import process as baseline_process
+except ImportError:  # fuzzywuzzy is no longer a dependency; rapidfuzz has the same API
+    from rapidfuzz import process as baseline_process
+
+SYMPTOMS = ["fever", "headache", "cough", "back pain", "diarrhea", "fatigue", "stress",
+            "anxiety", "dengue", "cold", "acidity", "migraine", "insomnia", "sore throat"]
+TEMPLATES = ["I have a {s}, what should I do?", "How to reduce {s}?", "What are the symptoms of {s}?",
+             "Any home remedies for {s}?", "When should I see a doctor for {s}?"]
+
+
+def make_database(size, seed=0):
+    rng = random.Random(seed)
+    questions = [
+        rng.choice(TEMPLATES).format(s=rng.choice(SYMPTOMS)) + f" (case {i})"
+        for i in range(size)
+    ]
+    responses = [f"Response {i}" for i in range(size)]
+    return pd.DataFrame({"Question": questions, "Response": responses})
+
+
+def baseline_lookup(user_input, database):
+    questions = database["Question"].dropna().tolist()
+    best_match, score = baseline_process.extractOne(user_input, questions)[:2]
+    if score > 60:
+        return database.loc[database["Question"] == best_match, "Response"].values[0]
+    return None
+
+
+def time_queries(fn, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [rng.choice(TEMPLATES).format(s=rng.choice(SYMPTOMS)) for _ in range(args.queries)]
+
+    print(f"{'rows':>8} {'baseline p50 ms':>16} {'matcher p50 ms':>15} {'build ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        database = make_database(size)
+
+        start = time.perf_counter()
+        matcher = QuestionMatcher(database)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        baseline = time_queries(lambda q: baseline_lookup(q, database), queries)
+        matched = time_queries(matcher.match, queries)
+        print(f"{size:>8} {np.median(baseline):>16.2f} {np.median(matched):>15.2f} "
+              f"{build_ms:>9.1f} {np.median(baseline) / np.median(matched):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Chunk count, token fill and embedding time per document for the fixed
+500-character chunk_text versus the token-aware TokenChunker.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_chunker --docs 20 --sentences 120
+    python -m benchmarks.bench_chunker --pdf path/to/file.pdf
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_document
+from models.controller.chunk_controller import chunk_text
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.ingestion_controller import extract_text_from_pdf
+from models.controller.manager.chunk_manager import TokenChunker
+
+def measure(name, documents, split, tokenizer, max_tokens):
+    chunk_s = embed_s = 0.0
+    counts, fills, truncated = [], [], 0
+    for text in documents:
+        start = time.perf_counter()
+        chunks = split(text)
+        chunk_s += time.perf_counter() - start
+
+        lengths = [len(ids) for ids in tokenizer(chunks, add_special_tokens=False)["input_ids"]]
+        counts.append(len(chunks))
+        fills.extend(min(n, max_tokens) / max_tokens for n in lengths)
+        truncated += sum(n > max_tokens for n in lengths)
+
+        start = time.perf_counter()
+        generate_embeddings(chunks, show_progress_bar=False, use_cache=False)
+        embed_s += time.perf_counter() - start
+
+    n = len(documents)
+    print(f"{name:<11}: {np.mean(counts):7.1f} chunks/doc  fill {np.mean(fills):5.1%}  "
+          f"truncated {truncated:5d}  chunk {1000 * chunk_s / n:7.2f} ms/doc  embed {1000 * embed_s / n:8.1f} ms/doc")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=120)
+    parser.add_argument("--pdf", action="append", default=[], help="Benchmark real PDFs instead (repeatable)")
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.pdf:
+        documents = [extract_text_from_pdf(path) for path in args.pdf]
+    else:
+        documents = [make_document(args.sentences, seed=n) for n in range(args.docs)]
+
+    token_chunker = TokenChunker(overlap_tokens=args.overlap_tokens)
+    tokenizer, max_tokens = token_chunker.tokenizer, token_chunker.max_tokens
+    generate_embeddings(["warm up"], show_progress_bar=False, use_cache=False)
+
+    print(f"{len(documents)} documents, token budget {max_tokens}")
+    measure("chunk_text", documents, chunk_text, tokenizer, max_tokens)
+    measure("tokens", documents, lambda text: [c.text for c in token_chunker.chunk(text)], tokenizer, max_tokens)
+
+
+if __name__ == "__main__":
+    main()
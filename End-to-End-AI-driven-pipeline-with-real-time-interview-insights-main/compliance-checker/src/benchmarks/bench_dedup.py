@@ -0,0 +1,50 @@
+"""
+Near-duplicate elimination on documents with repeated boilerplate: dedup
+throughput, chunks skipped, and embedding time with and without the stage.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_dedup --pages 40 --boilerplate 0.3
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import make_boilerplate_document
+from models.controller.chunk_controller import chunk_spans, chunk_text
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.manager.dedup_manager import ChunkDeduplicator, split_duplicates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--boilerplate", type=float, default=0.3, help="Share of each page that is boilerplate")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--skip-embedding", action="store_true", help="Only time the dedup stage")
+    args = parser.parse_args()
+
+    chunks = chunk_text(make_boilerplate_document(args.pages, args.boilerplate))
+
+    dedup = ChunkDeduplicator(max_distance=args.max_distance)
+    start = time.perf_counter()
+    keep, aliases = split_duplicates(dedup.assign(chunks), chunk_spans(chunks))
+    dedup_s = time.perf_counter() - start
+    print(f"dedup      : {len(chunks) / dedup_s:8.0f} chunks/s, {len(aliases)} of {len(chunks)} chunks are duplicates")
+
+    if args.skip_embedding:
+        return
+
+    generate_embeddings(["warm up"], show_progress_bar=False, use_cache=False)
+    start = time.perf_counter()
+    generate_embeddings(chunks, show_progress_bar=False, use_cache=False)
+    all_s = time.perf_counter() - start
+    start = time.perf_counter()
+    generate_embeddings([chunks[n] for n in keep], show_progress_bar=False, use_cache=False)
+    unique_s = time.perf_counter() - start
+
+    print(f"embed all  : {all_s:8.2f} s")
+    print(f"embed kept : {unique_s + dedup_s:8.2f} s incl. dedup  ({all_s / (unique_s + dedup_s):.2f}x)")
+    print(f"estimated  : {dedup.stats(unique_s)['encode_seconds_saved']:8.2f} s saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Matching an uploaded prescription against the knowledge base: one chatbot
+query per passage (the old way) versus SemanticQuestionIndex.match_document,
+which embeds all chunks in one call and scores them with one matrix product.
+
+Also reports how long page extraction takes, which the app now does once
+per file hash.
+
+Run from the `src` directory, with the model in MED_CHAT_MODEL_DIR:
+    python -m benchmarks.bench_document_match --pages 50 --qa-rows 5000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_qa_dataset, write_pdf
+from models.controller.chunk_controller import chunk_text
+from models.controller.manager.ingestion_manager import iter_pdf_pages
+from semantic_search import SemanticQuestionIndex, _encode_normalized_query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--qa-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        pdf_path = os.path.join(folder, "prescription.pdf")
+        write_pdf(pdf_path, args.pages)
+        start = time.perf_counter()
+        text = "\n".join(iter_pdf_pages(pdf_path))
+        extract_s = time.perf_counter() - start
+
+        database = make_qa_dataset(args.qa_rows)
+        dataset_path = os.path.join(folder, "qa.csv")
+        database.to_csv(dataset_path, index=False)
+        index = SemanticQuestionIndex.load_or_build(database, dataset_path)
+        index.question_vectors()
+
+    chunks = chunk_text(text)
+    index.match_document(chunks[:2])  # Warm up
+
+    _encode_normalized_query.cache_clear()
+    start = time.perf_counter()
+    per_passage = [index.match(chunk) for chunk in chunks]
+    per_passage_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = index.match_document(chunks)
+    batched_s = time.perf_counter() - start
+
+    print(f"{args.pages} pages, {len(chunks)} chunks, {args.qa_rows} questions")
+    print(f"extraction:          {extract_s * 1000:>9.1f} ms (once per file hash)")
+    print(f"one query / passage: {per_passage_s * 1000:>9.1f} ms, {sum(r is not None for r in per_passage)} passages matched")
+    print(f"match_document:      {batched_s * 1000:>9.1f} ms, {len(hits)} distinct questions "
+          f"({per_passage_s / batched_s:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
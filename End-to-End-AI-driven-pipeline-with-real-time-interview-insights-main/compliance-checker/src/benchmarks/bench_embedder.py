@@ -0,0 +1,41 @@
+"""
+Throughput of Embedder.get_embeddings (one forward pass per chunk) versus
+Embedder.embed_batch (length-bucketed batches), with a parity check.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_embedder --chunks 512 --batch-size 32
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_chunks
+from models.controller.manager.embedding_manager import Embedder
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    embedder = Embedder()
+    chunks = make_chunks(args.chunks)
+
+    start = time.perf_counter()
+    reference = np.asarray(embedder.get_embeddings(chunks), dtype=np.float32).reshape(len(chunks), -1)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = embedder.embed_batch(chunks, batch_size=args.batch_size)
+    batch_s = time.perf_counter() - start
+
+    max_diff = float(np.abs(reference - batched).max())
+    print(f"per-chunk : {len(chunks) / loop_s:8.1f} chunks/s")
+    print(f"batched   : {len(chunks) / batch_s:8.1f} chunks/s  ({loop_s / batch_s:.1f}x)")
+    print(f"max |diff|: {max_diff:.2e}  {'OK' if np.allclose(reference, batched, atol=1e-4) else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Cost of re-embedding an unchanged document with the persistent embedding cache.
+
+Encodes the same synthetic chunks twice through generate_embeddings, using a
+throwaway cache file, and reports both timings with the cache counters.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_embedding_cache --chunks 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ["MED_CHAT_EMBEDDING_CACHE"] = os.path.join(tempfile.mkdtemp(), "embedding_cache.sqlite")
+
+from benchmarks.synthetic import make_chunks  # noqa: E402
+from models.controller.embedding_controller import generate_embeddings, get_embedding_cache  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks, min_words=80, max_words=80)
+
+    for label in ("first ingest", "re-ingest"):
+        start = time.perf_counter()
+        generate_embeddings(chunks, show_progress_bar=False)
+        print(f"{label:<13}: {time.perf_counter() - start:8.2f} s")
+    print(get_embedding_cache().stats())
+
+
+if __name__ == "__main__":
+    main()
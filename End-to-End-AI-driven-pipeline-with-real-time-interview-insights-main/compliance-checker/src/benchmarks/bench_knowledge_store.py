@@ -0,0 +1,60 @@
+"""
+SQLite knowledge store against the in-memory DataFrame matcher: import
+throughput, chatbot lookup latency (p50/p99) with the full fuzzy scan versus
+the BM25-prefiltered one, and how often the two pick the same answer.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_knowledge_store --rows 10000 100000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_qa_dataset, make_queries
+from chatbot_matcher import PrefilteredMatcher, QuestionMatcher
+from knowledge_store import KnowledgeStore
+
+
+def latencies_ms(matcher, queries):
+    timings, answers = [], []
+    for query in queries:
+        start = time.perf_counter()
+        answers.append(matcher.match(query))
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--style", default="mental_health", choices=["mental_health", "chatbot"])
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, style=args.style)
+    print(f"{'rows':>7} {'import rows/s':>14} {'full p50':>9} {'full p99':>9} "
+          f"{'bm25 p50':>9} {'bm25 p99':>9} {'agree':>6}")
+    for rows in args.rows:
+        database = make_qa_dataset(rows, style=args.style)
+        with tempfile.TemporaryDirectory() as folder:
+            store = KnowledgeStore(os.path.join(folder, "kb.sqlite"))
+            start = time.perf_counter()
+            store.upsert_many(zip(database["Question"], database["Response"]), source="bench")
+            import_s = time.perf_counter() - start
+
+            full_ms, full_answers = latencies_ms(QuestionMatcher(database), queries)
+            bm25_ms, bm25_answers = latencies_ms(PrefilteredMatcher(store), queries)
+            agree = np.mean([a == b for a, b in zip(full_answers, bm25_answers)])
+            store.close()
+
+        print(f"{rows:>7} {rows / import_s:>14.0f} "
+              f"{np.percentile(full_ms, 50):>9.2f} {np.percentile(full_ms, 99):>9.2f} "
+              f"{np.percentile(bm25_ms, 50):>9.2f} {np.percentile(bm25_ms, 99):>9.2f} {agree:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
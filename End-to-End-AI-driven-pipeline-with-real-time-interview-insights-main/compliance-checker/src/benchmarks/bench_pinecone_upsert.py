@@ -0,0 +1,53 @@
+"""
+Upsert throughput against the in-process FakePineconeIndex: the previous
+single-request upsert versus size-bounded batches sent concurrently.
+
+The fake adds a fixed latency per request (default 50 ms) and can inject
+transient failures to exercise retries. No network access is needed.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_pinecone_upsert --vectors 5000 --latency 0.05 --failure-rate 0.05
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from models.controller.manager.utils.fake_pinecone import FakePineconeIndex
+from models.controller.manager.utils.vector_store_pinecone import MAX_VECTORS_PER_REQUEST, PineconeVectorStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=5000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    embeddings = np.random.default_rng(0).standard_normal((args.vectors, args.dimension)).astype("float32")
+    ids = [f"doc:{i}" for i in range(args.vectors)]
+
+    # Previous behaviour: one upsert call for the whole document
+    index = FakePineconeIndex(latency=args.latency)
+    start = time.perf_counter()
+    try:
+        index.upsert(vectors=[{"id": i, "values": e.tolist()} for i, e in zip(ids, embeddings)])
+        print(f"single request : {args.vectors / (time.perf_counter() - start):8.0f} vectors/s")
+    except ValueError as e:
+        print(f"single request : rejected ({e}); limit is {MAX_VECTORS_PER_REQUEST} vectors")
+
+    for workers in args.workers:
+        index = FakePineconeIndex(latency=args.latency, failure_rate=args.failure_rate)
+        store = PineconeVectorStore("bench", index=index)
+        stats = store.add_embeddings(ids, embeddings, batch_size=args.batch_size, max_workers=workers, backoff=0.01)
+        assert len(index.vectors) == args.vectors
+        print(f"{workers:>2} workers     : {stats['vectors_per_sec']:8.0f} vectors/s  "
+              f"({stats['batches']} batches, {stats['retries']} retries, peak concurrency {index.max_concurrency})")
+
+
+if __name__ == "__main__":
+    main()
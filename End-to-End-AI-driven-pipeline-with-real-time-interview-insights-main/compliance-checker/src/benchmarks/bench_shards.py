@@ -0,0 +1,76 @@
+"""
+Query latency of the sharded index as shard count and corpus size grow,
+plus latency while one shard is being rebuilt.
+
+Documents are hash-routed across the shards; each query searches all of
+them in parallel and merges the top-k. Vectors are random, so only timings
+are meaningful. With more shards than cores the fan-out stops paying off;
+MED_CHAT_SHARD_SEARCH_THREADS caps the concurrent shard searches.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_shards --vectors 100000 400000 --shards 1 2 4 8
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from models.controller.manager.shard_manager import ShardedIndex
+
+DIMENSION = 384
+DOC_CHUNKS = 100
+
+
+def build(folder, vectors, shards):
+    index = ShardedIndex(folder, metric="cosine", hash_shards=shards)
+    for start in range(0, len(vectors), DOC_CHUNKS):
+        batch = vectors[start:start + DOC_CHUNKS]
+        index.add_document(f"doc-{start}", [""] * len(batch), batch)
+    return index
+
+
+def latencies_ms(index, queries, top_k):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query[None, :], top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, nargs="+", default=[100000, 400000])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>8} {'shards':>6} {'p50 ms':>8} {'p99 ms':>8} {'rebuild p50':>12} {'rebuild p99':>12}")
+    for count in args.vectors:
+        vectors = rng.standard_normal((count, DIMENSION)).astype(np.float32)
+        queries = rng.standard_normal((args.queries, DIMENSION)).astype(np.float32)
+        for shards in args.shards:
+            with tempfile.TemporaryDirectory() as folder:
+                index = build(folder, vectors, shards)
+                latencies_ms(index, queries[:10], args.top_k)  # Warm up
+                timings = latencies_ms(index, queries, args.top_k)
+
+                # Rebuild the largest shard as IVF while queries keep coming
+                largest = max(index.shards, key=index.shards.get)
+                rebuild = threading.Thread(target=index.rebuild_shard, args=(largest, "ivf"))
+                rebuild.start()
+                during = latencies_ms(index, queries, args.top_k)
+                rebuild.join()
+                index.close()
+
+            print(f"{count:>8} {shards:>6} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 99):>8.2f} "
+                  f"{np.percentile(during, 50):>12.2f} {np.percentile(during, 99):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Import time and peak RSS of the ingestion pipeline, before and after the
+shared model registry.
+
+"before" reproduces the old behaviour in a fresh interpreter: three
+SentenceTransformer loads at import time plus a separate AutoModel copy for
+Embedder. "after (import)" imports the controllers with lazy loading, and
+"after (first use)" also builds an Embedder and encodes one sentence, which
+loads the single shared copy.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_startup
+"""
+
+import json
+import subprocess
+import sys
+
+BEFORE = """
+from sentence_transformers import SentenceTransformer
+from transformers import AutoModel, AutoTokenizer
+models = [SentenceTransformer('all-MiniLM-L6-v2') for _ in range(3)]
+AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+AutoModel.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+"""
+
+AFTER_IMPORT = """
+import models.controller.embedding_controller
+import models.controller.ingestion_controller
+import models.controller.pinecone_controller
+import models.controller.manager.embedding_manager
+"""
+
+AFTER_FIRST_USE = AFTER_IMPORT + """
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.manager.embedding_manager import Embedder
+Embedder()
+generate_embeddings(["warm up"], show_progress_bar=False)
+"""
+
+PROBE = """
+import json, resource, time
+start = time.perf_counter()
+exec(compile({code!r}, "<bench>", "exec"))
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                   "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def measure(code):
+    result = subprocess.run([sys.executable, "-c", PROBE.format(code=code)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    print(f"{'scenario':<20} {'seconds':>8} {'peak RSS MB':>12}")
+    for label, code in [("before", BEFORE), ("after (import)", AFTER_IMPORT), ("after (first use)", AFTER_FIRST_USE)]:
+        stats = measure(code)
+        print(f"{label:<20} {stats['seconds']:>8.2f} {stats['max_rss_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Memory and queries per second of LocalVectorStore versus the previous
+implementation (IndexFlatL2 plus a Python list copy of every embedding).
+
+Memory is the growth in peak RSS while loading the corpus, measured in a
+fresh subprocess per variant; "mmap" reopens a saved store memory-mapped.
+
+Run from the `src` directory:
+    python -m benchmarks.bench_vector_store --vectors 100000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = """
+import json, os, resource, tempfile, time
+import faiss
+import numpy as np
+from models.controller.manager.utils.vector_store import LocalVectorStore
+
+class LegacyLocalVectorStore:
+    def __init__(self, embedding_dim):
+        self.index = faiss.IndexFlatL2(embedding_dim)
+        self.embeddings = []
+
+    def add_embeddings(self, embeddings):
+        vectors = np.array(embeddings).astype("float32")
+        self.index.add(vectors)
+        self.embeddings.extend(embeddings)
+
+    def search(self, query_vector, top_k=5):
+        query = np.array([query_vector]).astype("float32")
+        distances, indices = self.index.search(query, top_k)
+        return [distances.tolist()[0], indices.tolist()[0]]
+
+variant, n, d, n_queries = {variant!r}, {n}, {d}, {queries}
+rng = np.random.default_rng(0)
+queries = rng.standard_normal((n_queries, d)).astype("float32")
+path = os.path.join(tempfile.gettempdir(), f"bench_vector_store_{{n}}_{{d}}.npy")
+if variant == "mmap" and not os.path.exists(path):
+    store = LocalVectorStore(d)
+    store.add_embeddings(rng.standard_normal((n, d)).astype("float32"))
+    store.save(path)
+    del store
+
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if variant == "legacy":
+    store = LegacyLocalVectorStore(d)
+    store.add_embeddings(rng.standard_normal((n, d)).astype("float32").tolist())
+elif variant == "mmap":
+    store = LocalVectorStore.open(path)
+else:
+    store = LocalVectorStore(d)
+    store.add_embeddings(rng.standard_normal((n, d)).astype("float32"))
+rss_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024
+
+start = time.perf_counter()
+for query in queries:
+    store.search(query.tolist())
+single_qps = n_queries / (time.perf_counter() - start)
+
+batch_qps = None
+if variant != "legacy":
+    start = time.perf_counter()
+    store.search_many(queries)
+    batch_qps = n_queries / (time.perf_counter() - start)
+
+print(json.dumps({{"rss_mb": rss_mb, "single_qps": single_qps, "batch_qps": batch_qps}}))
+"""
+
+
+def run(variant, args):
+    code = PROBE.format(variant=variant, n=args.vectors, d=args.dimension, queries=args.queries)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'variant':<8} {'load RSS MB':>12} {'search qps':>11} {'search_many qps':>16}")
+    for variant in ("legacy", "buffer", "mmap"):
+        stats = run(variant, args)
+        batch = f"{stats['batch_qps']:.0f}" if stats["batch_qps"] else "-"
+        print(f"{variant:<8} {stats['rss_mb']:>12.1f} {stats['single_qps']:>11.0f} {batch:>16}")
+
+
+if __name__ == "__main__":
+    main()
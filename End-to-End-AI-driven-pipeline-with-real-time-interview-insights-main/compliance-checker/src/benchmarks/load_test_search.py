@@ -0,0 +1,95 @@
+"""
+Load test for the /search endpoint: concurrent clients, with and without
+request micro-batching.
+
+By default it builds a throwaway index of synthetic chunks and drives the
+Flask app in-process through its test client, so it runs offline. Pass --url
+to hit a running server instead (e.g. http://127.0.0.1:5000/search); batching
+settings then come from that server's MED_CHAT_SEARCH_* environment.
+
+Run from the `src` directory:
+    python -m benchmarks.load_test_search --clients 16 --requests 50
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+from benchmarks.synthetic import make_chunks
+from models.controller import search_controller
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.manager.index_manager import IndexManager
+from models.controller.upload_controller import app
+
+def build_index(chunk_count):
+    chunks = make_chunks(chunk_count, min_words=60, max_words=60)
+    index = IndexManager(tempfile.mkdtemp())
+    index.add_document("synthetic", chunks, generate_embeddings(chunks, show_progress_bar=False))
+    return index
+
+
+def run_clients(send, clients, requests_per_client):
+    queries = make_chunks(clients * requests_per_client, min_words=6, max_words=6, seed=1)
+    latencies, lock = [], threading.Lock()
+
+    def client(offset):
+        for query in queries[offset::clients]:
+            start = time.perf_counter()
+            send(query)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(latencies) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Requests per client")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<22} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    if args.url:
+        def send(query):
+            url = f"{args.url}?{urllib.parse.urlencode({'query': query})}"
+            with urllib.request.urlopen(url) as response:
+                json.load(response)
+
+        p50, p99, rps = run_clients(send, args.clients, args.requests)
+        print(f"{'server':<22} {p50:>8.2f} {p99:>8.2f} {rps:>8.1f}")
+        return
+
+    index = build_index(args.chunks)
+    for label, batch_size, window_ms in [("one query at a time", 1, 0.0),
+                                         (f"batched ({args.batch_size}, {args.window_ms} ms)",
+                                          args.batch_size, args.window_ms)]:
+        search_controller.configure_search(index, max_batch_size=batch_size, max_wait_ms=window_ms)
+
+        def send(query):
+            response = app.test_client().get("/search", query_string={"query": query})
+            assert response.status_code == 200, response.data
+
+        p50, p99, rps = run_clients(send, args.clients, args.requests)
+        print(f"{label:<22} {p50:>8.2f} {p99:>8.2f} {rps:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Reproducible end-to-end benchmark suite on synthetic data, offline and on CPU.
+
+Times each pipeline stage on its own (PDF extraction, chunking, dedup,
+embedding, FAISS build and search, index writes), the whole PDF pipeline,
+and chatbot lookups (p50/p99), then writes the results as JSON. With
+--compare, each metric is checked against a previous results file and the
+run exits with status 1 if any got worse by more than --threshold.
+
+The embedding model must already be in the local cache (or MED_CHAT_MODEL_DIR);
+pass --no-model to skip the stages that need it.
+
+Run from the `src` directory:
+    python -m benchmarks.run_suite --out bench_results.json
+    python -m benchmarks.run_suite --out new.json --compare bench_results.json --threshold 0.15
+"""
+
+import os
+
+# Offline, CPU-only and uncached, so runs are comparable across machines and over time
+os.environ.setdefault("MED_CHAT_OFFLINE", "1")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ.setdefault("MED_CHAT_EMBEDDING_CACHE", "off")
+os.environ.setdefault("MED_CHAT_METRICS", "off")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_qa_dataset, make_queries, write_pdf
+from chatbot_matcher import PrefilteredMatcher
+from knowledge_store import KnowledgeStore
+from models.controller.chunk_controller import chunk_spans, chunk_text
+from models.controller.manager.dedup_manager import ChunkDeduplicator, split_duplicates
+from models.controller.manager.index_manager import IndexManager
+from models.controller.manager.ingestion_manager import file_sha256, iter_pdf_pages
+from models.controller.vector_controller import create_faiss_index, search_faiss_index
+
+# Embedding size of all-MiniLM-L6-v2, used for random vectors with --no-model
+DIMENSION = 384
+
+
+def timed(fn, repeat):
+    # Returns the median wall time over `repeat` calls and the last call's result
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def latencies_ms(fn, inputs):
+    timings = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def lower(value, unit):
+    return {"value": value, "unit": unit, "better": "lower"}
+
+
+def higher(value, unit):
+    return {"value": value, "unit": unit, "better": "higher"}
+
+
+def bench_pipeline(args, workdir, results):
+    paths = []
+    for n in range(args.docs):
+        path = os.path.join(workdir, f"doc_{n}.pdf")
+        write_pdf(path, args.pages, seed=n)
+        paths.append(path)
+    total_pages = args.docs * args.pages
+
+    extract_s, texts = timed(lambda: ["".join(iter_pdf_pages(path)) for path in paths], args.repeat)
+    results["extraction_seconds"] = lower(extract_s, "s")
+    results["extraction_pages_per_sec"] = higher(total_pages / extract_s, "pages/s")
+
+    chunk_s, document_chunks = timed(lambda: [chunk_text(text) for text in texts], args.repeat)
+    chunks = [chunk for doc in document_chunks for chunk in doc]
+    results["chunking_seconds"] = lower(chunk_s, "s")
+    results["chunking_chunks_per_sec"] = higher(len(chunks) / chunk_s, "chunks/s")
+
+    dedup_s, _ = timed(lambda: [ChunkDeduplicator().assign(doc) for doc in document_chunks], args.repeat)
+    results["dedup_seconds"] = lower(dedup_s, "s")
+
+    if args.no_model:
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((len(chunks), DIMENSION)).astype(np.float32)
+    else:
+        from models.controller.embedding_controller import generate_embeddings
+
+        generate_embeddings(["warm up"], show_progress_bar=False, use_cache=False)
+        embed_s, embeddings = timed(
+            lambda: generate_embeddings(chunks, show_progress_bar=False, use_cache=False), args.repeat
+        )
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        results["embedding_seconds"] = lower(embed_s, "s")
+        results["embedding_chunks_per_sec"] = higher(len(chunks) / embed_s, "chunks/s")
+
+    build_s, index = timed(lambda: create_faiss_index(embeddings, metric="cosine"), args.repeat)
+    results["faiss_build_seconds"] = lower(build_s, "s")
+    queries = embeddings[np.random.default_rng(1).choice(len(embeddings), size=min(200, len(embeddings)))]
+    search_ms = latencies_ms(lambda q: search_faiss_index(index, q[None, :], top_k=5, metric="cosine"), queries)
+    results["faiss_search_p50_ms"] = lower(float(np.percentile(search_ms, 50)), "ms")
+    results["faiss_search_p99_ms"] = lower(float(np.percentile(search_ms, 99)), "ms")
+
+    def index_writes():
+        with tempfile.TemporaryDirectory(dir=workdir) as folder:
+            manager = IndexManager(folder, metric="cosine")
+            manager.add_document("bench", chunks, embeddings, spans=chunk_spans(chunks))
+            manager.save()
+            manager.close()
+
+    results["indexing_seconds"] = lower(timed(index_writes, args.repeat)[0], "s")
+
+    if not args.no_model:
+        def end_to_end():
+            with tempfile.TemporaryDirectory(dir=workdir) as folder:
+                manager = IndexManager(folder)
+                for path in paths:
+                    doc_id = file_sha256(path)
+                    doc = chunk_text("".join(iter_pdf_pages(path)))
+                    spans = chunk_spans(doc)
+                    keep, aliases = split_duplicates(ChunkDeduplicator().assign(doc), spans)
+                    unique = [doc[n] for n in keep]
+                    vectors = generate_embeddings(unique, show_progress_bar=False, use_cache=False)
+                    ids = manager.add_document(doc_id, unique, vectors, spans=[spans[n] for n in keep])
+                    chunk_ids = dict(zip(keep, ids))
+                    manager.add_aliases(doc_id, [(chunk_ids[rep], begin, end) for rep, begin, end in aliases])
+                manager.save()
+                manager.close()
+
+        e2e_s, _ = timed(end_to_end, args.repeat)
+        results["pipeline_seconds"] = lower(e2e_s, "s")
+        results["pipeline_pages_per_sec"] = higher(total_pages / e2e_s, "pages/s")
+
+
+def bench_chatbot(args, results):
+    from streamlit_app import get_chatbot_response
+
+    for style in ("mental_health", "chatbot"):
+        database = make_qa_dataset(args.qa_rows, style=style)
+        queries = make_queries(args.queries, style=style)
+
+        with tempfile.TemporaryDirectory() as folder:
+            # The app answers from a KnowledgeStore through its BM25 prefilter
+            store = KnowledgeStore(os.path.join(folder, "kb.sqlite"))
+            start = time.perf_counter()
+            store.upsert_many(zip(database["Question"], database["Response"]), source="bench")
+            matcher = PrefilteredMatcher(store)
+            results[f"chatbot_{style}_build_ms"] = lower((time.perf_counter() - start) * 1000, "ms")
+
+            get_chatbot_response(queries[0], database, matcher=matcher)  # Warm up
+            timings = latencies_ms(lambda q: get_chatbot_response(q, database, matcher=matcher), queries)
+            results[f"chatbot_{style}_p50_ms"] = lower(float(np.percentile(timings, 50)), "ms")
+            results[f"chatbot_{style}_p99_ms"] = lower(float(np.percentile(timings, 99)), "ms")
+            store.close()
+
+
+def compare(current, baseline, threshold):
+    """
+    Prints each metric's change against a baseline and returns the regressions.
+
+    Args:
+        current (dict): Results of this run.
+        baseline (dict): Results of the run to compare against.
+        threshold (float): Relative change tolerated before a metric counts as a regression.
+
+    Returns:
+        list[str]: Names of the metrics that regressed.
+    """
+
+    regressions = []
+    print(f"\n{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metric in current.items():
+        if name not in baseline or not baseline[name]["value"]:
+            continue
+        old, new = baseline[name]["value"], metric["value"]
+        change = (new - old) / old
+        worse = change > threshold if metric["better"] == "lower" else change < -threshold
+        if worse:
+            regressions.append(name)
+        print(f"{name:<36} {old:>12.4g} {new:>12.4g} {change:>+7.1%} {'REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=3, help="Synthetic PDFs")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per PDF")
+    parser.add_argument("--qa-rows", type=int, default=5000, help="Rows per synthetic Q/R dataset")
+    parser.add_argument("--queries", type=int, default=200, help="Chatbot lookups timed per dataset")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the median is reported")
+    parser.add_argument("--no-model", action="store_true", help="Skip stages that need the embedding model")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Tolerated relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        bench_pipeline(args, workdir, results)
+    bench_chatbot(args, results)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("out", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as out:
+        json.dump(report, out, indent=2)
+
+    for name, metric in results.items():
+        print(f"{name:<36} {metric['value']:>12.4g} {metric['unit']}")
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline["meta"]["args"] != report["meta"]["args"]:
+            print("Warning: baseline was run with different arguments; comparisons may be meaningless.")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
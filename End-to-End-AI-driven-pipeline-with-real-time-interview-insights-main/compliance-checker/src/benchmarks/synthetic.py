@@ -0,0 +1,204 @@
+"""
+Deterministic synthetic inputs for the benchmarks: plain-text documents and
+chunks, text PDFs of any page count and Question/Response datasets shaped
+like the shipped ones.
+
+Only the standard library and pandas are needed; the PDFs are written by
+hand (one Helvetica text stream per page), so no PDF library is required.
+"""
+
+import random
+
+import pandas as pd
+
+WORDS = ("patient fever dosage tablet twice daily after meals blood pressure report "
+         "prescribed follow up review allergy history symptoms headache cough "
+         "compliance requirement section clause employer shall ensure records").split()
+
+HEADER = "City Hospital - Department of General Medicine - Confidential"
+FOOTER = "This report does not replace professional medical advice."
+
+# Per-page boilerplate for make_boilerplate_document
+BOILERPLATE_HEADER = ("City Hospital Department of General Medicine. This report is confidential and intended "
+                      "only for the named patient and the treating physician. ")
+DISCLAIMER = ("Disclaimer: the information in this document does not replace professional medical advice. "
+              "Consult your doctor before changing any medication or dosage. ")
+
+# mental_health_chatbot_dataset.csv: User_Input / Chatbot_Response
+MOODS = ["stressed", "neutral", "sad", "anxious", "happy", "angry", "tired"]
+SYMPTOMS = ["none", "insomnia", "fatigue", "headache", "fever", "cough", "back pain", "acidity",
+            "migraine", "sore throat", "dizziness", "loss of appetite"]
+ACTIVITIES = ["Meditation", "Deep Breathing", "Journaling", "Exercise", "Talking to a Friend", "Music Therapy"]
+
+# chatbot_dataset.xlsx: Last_Message / AI_Response
+MESSAGES = ["I had a great day!", "Work has been overwhelming.", "Feeling down today.",
+            "I'm nervous about my exam.", "Just a regular day.", "I can't sleep at night.",
+            "My {symptom} is getting worse.", "What should I take for {symptom}?"]
+REPLIES = ["That's awesome! Keep up the positive energy!", "Take a deep breath. Maybe a short break will help.",
+           "I'm here for you. Want to talk about it?", "Try some deep breathing exercises. You got this!",
+           "Let me know if you need anything. I'm here to chat!", "Rest well and see a doctor if {symptom} persists."]
+
+
+def make_sentences(count, rng):
+    return [" ".join(rng.choices(WORDS, k=rng.randint(6, 18))).capitalize() + "." for _ in range(count)]
+
+
+def make_chunks(count, min_words=5, max_words=120, seed=0):
+    """
+    Builds chunk-sized strings of random words.
+
+    Args:
+        count (int): Number of chunks.
+        min_words (int, optional): Fewest words per chunk. Defaults to 5.
+        max_words (int, optional): Most words per chunk. Defaults to 120.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list[str]: The chunks.
+    """
+
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words))) for _ in range(count)]
+
+
+def make_document(sentences, seed=0):
+    """
+    Builds a plain-text document of sentences with mixed punctuation and paragraph breaks.
+
+    Args:
+        sentences (int): Number of sentences.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        str: The document.
+    """
+
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(sentences):
+        sentence = " ".join(rng.choices(WORDS, k=rng.randint(4, 30))).capitalize()
+        parts.append(sentence + rng.choice([". ", ". ", "! ", ".\n\n"]))
+    return "".join(parts)
+
+
+def make_boilerplate_document(pages, boilerplate, seed=0):
+    """
+    Builds a plain-text document whose pages repeat a header and a disclaimer.
+
+    Args:
+        pages (int): Number of pages.
+        boilerplate (float): Share of each page's words taken by the header and disclaimer.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        str: The document.
+    """
+
+    rng = random.Random(seed)
+    body_words = int(len((BOILERPLATE_HEADER + DISCLAIMER).split()) * (1 - boilerplate) / boilerplate)
+    return "".join(
+        BOILERPLATE_HEADER + f"Page {page + 1}. " + " ".join(rng.choices(WORDS, k=body_words)) + ". " + DISCLAIMER
+        for page in range(pages)
+    )
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages, lines_per_page=45, seed=0):
+    """
+    Writes a text PDF with a repeated header and footer on every page.
+
+    Args:
+        path (str): Output file.
+        pages (int): Number of pages.
+        lines_per_page (int, optional): Body lines per page. Defaults to 45.
+        seed (int, optional): Random seed for the body text. Defaults to 0.
+
+    Returns:
+        int: The number of characters of body text written.
+    """
+
+    rng = random.Random(seed)
+    # Object numbers: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    objects = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids, body_chars = [], 0
+    for page in range(pages):
+        page_obj, content_obj = 4 + 2 * page, 5 + 2 * page
+        body = make_sentences(lines_per_page, rng)
+        body_chars += sum(len(line) for line in body)
+        lines = [HEADER, f"Page {page + 1} of {pages}", *body, FOOTER]
+        text = "\n".join(f"({_pdf_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td\n{text}\nET".encode("latin-1")
+        objects[content_obj] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        objects[page_obj] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_obj
+        )
+        kids.append(b"%d 0 R" % page_obj)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[number] for number in sorted(objects))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as file:
+        file.write(out)
+    return body_chars
+
+
+def make_qa_dataset(rows, style="mental_health", seed=0):
+    """
+    Builds a Question/Response dataset modeled on a shipped one.
+
+    Like the originals, questions repeat with small variations (mood,
+    symptom), which is what makes fuzzy lookups ambiguous.
+
+    Args:
+        rows (int): Number of rows.
+        style (str, optional): 'mental_health' (mental_health_chatbot_dataset.csv)
+            or 'chatbot' (chatbot_dataset.xlsx). Defaults to 'mental_health'.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        pandas.DataFrame: 'Question' and 'Response' columns.
+    """
+
+    rng = random.Random(seed)
+    questions, responses = [], []
+    for _ in range(rows):
+        symptom = rng.choice(SYMPTOMS)
+        if style == "chatbot":
+            questions.append(rng.choice(MESSAGES).format(symptom=symptom))
+            responses.append(rng.choice(REPLIES).format(symptom=symptom))
+        else:
+            mood = rng.choice(MOODS)
+            questions.append(f"I feel {mood} today with {symptom}")
+            responses.append(f"Try {rng.choice(ACTIVITIES)} to manage {mood} mood.")
+    return pd.DataFrame({"Question": questions, "Response": responses})
+
+
+def make_queries(count, style="mental_health", seed=1):
+    """
+    Builds chat messages resembling, but not copied from, a dataset's questions.
+
+    Args:
+        count (int): Number of queries.
+        style (str, optional): The dataset style, as in make_qa_dataset.
+        seed (int, optional): Random seed. Defaults to 1.
+
+    Returns:
+        list[str]: The queries.
+    """
+
+    rng = random.Random(seed)
+    if style == "chatbot":
+        return [rng.choice(MESSAGES).format(symptom=rng.choice(SYMPTOMS)).lower() for _ in range(count)]
+    return [f"feeling {rng.choice(MOODS)} and {rng.choice(SYMPTOMS)} today" for _ in range(count)]
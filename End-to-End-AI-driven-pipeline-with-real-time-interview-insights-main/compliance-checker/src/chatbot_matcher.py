@@ -0,0 +1,211 @@
+import threading
+from collections import OrderedDict
+
+from rapidfuzz import fuzz, process, utils
+
+# Same cut-off the chatbot has always used: a match must score strictly above it.
+DEFAULT_SCORE_THRESHOLD = 60
+
+
+class QuestionMatcher:
+    """
+    Fuzzy matcher over the knowledge base questions, built once per dataset.
+
+    Questions are normalized a single time at construction, so a query is
+    scored against the prepared list with the threshold as a cut-off, and the
+    winning row position maps straight to its response without a second scan
+    of the DataFrame.
+
+    Attributes:
+        questions (list[str]): The preprocessed questions, in row order.
+        responses (numpy.ndarray): The responses aligned with `questions`.
+        threshold (int): Minimum score (exclusive) for a match to be accepted.
+    """
+
+    def __init__(self, database, threshold=DEFAULT_SCORE_THRESHOLD):
+        """
+        Preprocesses the questions of a Question/Response dataset.
+
+        Args:
+            database (pandas.DataFrame): Dataset with 'Question' and 'Response' columns.
+            threshold (int, optional): Minimum score (exclusive). Defaults to 60.
+        """
+
+        rows = database[database["Question"].notna()]
+        self.questions = [utils.default_process(str(q)) for q in rows["Question"]]
+        self.responses = rows["Response"].to_numpy()
+        self.threshold = threshold
+
+    def __len__(self):
+        return len(self.questions)
+
+    def query_key(self, query):
+        """
+        Returns the form of a query that determines its match, for response caching.
+
+        Scoring only sees the preprocessed query, so "Fever?" and "fever" share a key.
+        """
+
+        return utils.default_process(query)
+
+    def match_many(self, queries):
+        """
+        Finds the best response for each query.
+
+        Args:
+            queries (list[str]): Raw user queries.
+
+        Returns:
+            list: One entry per query, the matched response or None if no
+                question scored above the threshold.
+        """
+
+        results = []
+        for query in queries:
+            # score_cutoff lets WRatio skip questions that cannot beat the threshold
+            best = process.extractOne(
+                utils.default_process(query),
+                self.questions,
+                scorer=fuzz.WRatio,
+                processor=None,
+                score_cutoff=self.threshold,
+            )
+            results.append(self.responses[best[2]] if best is not None and best[1] > self.threshold else None)
+        return results
+
+    def match(self, query):
+        """
+        Finds the best response for a single query.
+
+        Args:
+            query (str): The raw user query.
+
+        Returns:
+            The matched response, or None if nothing scored above the threshold.
+        """
+
+        return self.match_many([query])[0]
+
+
+class PrefilteredMatcher:
+    """
+    Fuzzy matcher that only scores the BM25 candidates of a KnowledgeStore.
+
+    The FTS5 index narrows the table to the few dozen questions sharing words
+    with the query, and WRatio picks among those, so a lookup costs the same
+    however large the store grows. A question sharing no word with the query
+    is never considered, which the full QuestionMatcher could still accept
+    on character overlap alone.
+
+    Attributes:
+        store (knowledge_store.KnowledgeStore): The store providing candidates.
+        threshold (int): Minimum score (exclusive) for a match to be accepted.
+        limit (int): Candidates scored per query.
+    """
+
+    def __init__(self, store, threshold=DEFAULT_SCORE_THRESHOLD, limit=50):
+        self.store = store
+        self.threshold = threshold
+        self.limit = limit
+
+    def __len__(self):
+        return len(self.store)
+
+    def query_key(self, query):
+        """
+        Returns the form of a query that determines its match, for response caching.
+        """
+
+        return utils.default_process(query)
+
+    def match(self, query):
+        """
+        Finds the best response among the query's BM25 candidates.
+
+        Args:
+            query (str): The raw user query.
+
+        Returns:
+            The matched response, or None if no candidate scored above the threshold.
+        """
+
+        candidates = self.store.candidates(query, limit=self.limit)
+        if not candidates:
+            return None
+        best = process.extractOne(
+            utils.default_process(query),
+            [utils.default_process(question) for question, _ in candidates],
+            scorer=fuzz.WRatio,
+            processor=None,
+            score_cutoff=self.threshold,
+        )
+        if best is None or best[1] <= self.threshold:
+            return None
+        return candidates[best[2]][1]
+
+    def match_many(self, queries):
+        """
+        Finds the best response for each query.
+
+        Args:
+            queries (list[str]): Raw user queries.
+
+        Returns:
+            list: The matched response or None, one per query.
+        """
+
+        return [self.match(query) for query in queries]
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of chatbot answers keyed by normalized query.
+
+    One instance is meant to serve every session for a given dataset version
+    and matcher, so it must be replaced when either changes.
+
+    Attributes:
+        max_entries (int): Answers kept before the least recently used is evicted.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that ran the matcher.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached answer for a key, computing and storing it on a miss.
+
+        Args:
+            key (str): The normalized query.
+            compute (callable): Produces the answer (None for "no match" is cached too).
+
+        Returns:
+            The answer.
+        """
+
+        with self._lock:
+            value = self._entries.get(key, self._MISSING)
+            if value is not self._MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
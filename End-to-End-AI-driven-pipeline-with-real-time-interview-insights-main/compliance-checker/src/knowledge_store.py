@@ -0,0 +1,275 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+# Embedded Question/Response store used by the chatbot.
+KB_DB_PATH = os.getenv("MED_CHAT_KB_DB", "knowledge_base.sqlite")
+
+# Rows written per transaction while importing.
+IMPORT_BATCH_SIZE = 1000
+
+# Datasets imported into an empty store, relative to the working directory.
+# Only files of real Question/Response pairs belong here.
+SHIPPED_DATASETS = ("indian_health_chatbot_dataset (1)4444.xlsx",)
+
+# Shipped datasets imported only on request, with their (question, response) columns.
+OPTIONAL_DATASETS = {
+    "mental_health_chatbot_dataset.csv": ("User_Input", "Chatbot_Response"),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qa (
+    id INTEGER PRIMARY KEY,
+    question_key TEXT NOT NULL UNIQUE,
+    question TEXT NOT NULL,
+    response TEXT,
+    source TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS qa_fts USING fts5(
+    question, content='qa', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS qa_ai AFTER INSERT ON qa BEGIN
+    INSERT INTO qa_fts(rowid, question) VALUES (new.id, new.question);
+END;
+CREATE TRIGGER IF NOT EXISTS qa_ad AFTER DELETE ON qa BEGIN
+    INSERT INTO qa_fts(qa_fts, rowid, question) VALUES ('delete', old.id, old.question);
+END;
+CREATE TRIGGER IF NOT EXISTS qa_au AFTER UPDATE OF question ON qa BEGIN
+    INSERT INTO qa_fts(qa_fts, rowid, question) VALUES ('delete', old.id, old.question);
+    INSERT INTO qa_fts(rowid, question) VALUES (new.id, new.question);
+END;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('version', 0);
+CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_UPSERT = (
+    "INSERT INTO qa (question_key, question, response, source, updated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(question_key) DO UPDATE SET "
+    "question = excluded.question, response = excluded.response, "
+    "source = excluded.source, updated_at = excluded.updated_at"
+)
+
+
+def normalize_question(text):
+    """
+    Normalizes a question for deduplication: lowercase words separated by single spaces.
+
+    Args:
+        text (str): The question.
+
+    Returns:
+        str: The normalized key ("" if the text has no words).
+    """
+
+    return re.sub(r"[\W_]+", " ", str(text).lower()).strip()
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and value != value):  # None or NaN
+        return None
+    return str(value)
+
+
+def _columns_for(header, columns):
+    if set(columns).issubset(header):
+        return columns
+    raise ValueError(f"Dataset must contain {columns[0]!r} and {columns[1]!r} columns.")
+
+
+class KnowledgeStore:
+    """
+    Question/Response knowledge base in SQLite with an FTS5 index over the questions.
+
+    Rows are keyed by normalized question, so importing a dataset merges it
+    into the store: new questions are added and known ones get the latest
+    response. A version counter bumps on every write, for keying caches.
+    The counter restarts when the database is recreated, so caches that
+    outlive the process also key on the store's random id.
+
+    Attributes:
+        path (str): The SQLite database file.
+        store_id (str): Random id given to the database when it was created.
+    """
+
+    def __init__(self, path=KB_DB_PATH):
+        """
+        Opens (or creates) the store.
+
+        Args:
+            path (str, optional): The SQLite database file. Defaults to KB_DB_PATH.
+        """
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("INSERT OR IGNORE INTO settings VALUES ('store_id', ?)", (uuid.uuid4().hex,))
+        self._conn.commit()
+        self.store_id = self._conn.execute("SELECT value FROM settings WHERE name = 'store_id'").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM qa").fetchone()[0]
+
+    def version(self):
+        """
+        Returns a counter that changes whenever the store's contents do.
+        """
+
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+    def upsert_many(self, pairs, source=None, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Inserts or updates Question/Response pairs in batched transactions.
+
+        Args:
+            pairs (iterable): (question, response) tuples; rows without a question are skipped.
+            source (str, optional): Where the rows came from, e.g. the file name.
+            batch_size (int, optional): Rows per transaction. Defaults to 1000.
+
+        Returns:
+            int: The number of rows written.
+        """
+
+        written = 0
+        batch = []
+
+        def flush():
+            with self._lock, self._conn:
+                self._conn.executemany(_UPSERT, batch)
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+            batch.clear()
+
+        now = time.time()
+        for question, response in pairs:
+            question = _clean(question)
+            key = normalize_question(question) if question is not None else ""
+            if not key:
+                continue
+            batch.append((key, question, _clean(response), source, now))
+            written += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        return written
+
+    def import_file(self, file, name=None, columns=("Question", "Response"), batch_size=IMPORT_BATCH_SIZE):
+        """
+        Streams a CSV or XLSX dataset into the store.
+
+        CSV files are read in chunks and XLSX sheets row by row, so the whole
+        file is never held in memory.
+
+        Args:
+            file: A path or binary file object.
+            name (str, optional): The file name, when `file` is a file object.
+            columns (tuple, optional): The question and response columns. Defaults to
+                ('Question', 'Response').
+            batch_size (int, optional): Rows per transaction. Defaults to 1000.
+
+        Returns:
+            int: The number of rows written.
+
+        Raises:
+            ValueError: If the question and response columns cannot be found.
+        """
+
+        name = name or (file if isinstance(file, str) else getattr(file, "name", None))
+        source = os.path.basename(name) if name else None
+        if name and name.lower().endswith(".csv"):
+            return self._import_csv(file, columns, source, batch_size)
+        return self._import_xlsx(file, columns, source, batch_size)
+
+    def _import_csv(self, file, columns, source, batch_size):
+        written = 0
+        for frame in pd.read_csv(file, chunksize=batch_size):
+            question_column, response_column = _columns_for(set(frame.columns), columns)
+            written += self.upsert_many(
+                zip(frame[question_column], frame[response_column]), source=source, batch_size=batch_size
+            )
+        return written
+
+    def _import_xlsx(self, file, columns, source, batch_size):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell) if cell is not None else "" for cell in next(rows, ())]
+            question_column, response_column = _columns_for(set(header), columns)
+            q, r = header.index(question_column), header.index(response_column)
+            pairs = ((row[q], row[r]) for row in rows if row is not None and len(row) > max(q, r))
+            return self.upsert_many(pairs, source=source, batch_size=batch_size)
+        finally:
+            workbook.close()
+
+    def import_shipped_datasets(self, folder=".", paths=SHIPPED_DATASETS, optional=()):
+        """
+        Imports every shipped dataset found in a folder.
+
+        Args:
+            folder (str, optional): Where the datasets live. Defaults to the working directory.
+            paths (tuple, optional): Question/Response dataset file names. Defaults to SHIPPED_DATASETS.
+            optional (tuple, optional): Names from OPTIONAL_DATASETS to import as well,
+                using their mapped columns. Defaults to none.
+
+        Returns:
+            dict: Rows written per dataset that was found.
+        """
+
+        datasets = [(name, ("Question", "Response")) for name in paths]
+        datasets += [(name, OPTIONAL_DATASETS[name]) for name in optional]
+        imported = {}
+        for name, columns in datasets:
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                imported[name] = self.import_file(path, columns=columns)
+        return imported
+
+    def to_frame(self):
+        """
+        Returns the whole store as a DataFrame with 'Question' and 'Response' columns.
+        """
+
+        with self._lock:
+            rows = self._conn.execute("SELECT question, response FROM qa ORDER BY id").fetchall()
+        return pd.DataFrame(rows, columns=["Question", "Response"])
+
+    def candidates(self, query, limit=50):
+        """
+        Finds the questions sharing the most relevant words with a query, ranked by BM25.
+
+        Args:
+            query (str): The raw user query.
+            limit (int, optional): Maximum candidates. Defaults to 50.
+
+        Returns:
+            list: (question, response) tuples, best first.
+        """
+
+        words = normalize_question(query).split()
+        if not words:
+            return []
+        match = " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+        with self._lock:
+            return self._conn.execute(
+                "SELECT qa.question, qa.response FROM qa_fts JOIN qa ON qa.id = qa_fts.rowid "
+                "WHERE qa_fts MATCH ? ORDER BY bm25(qa_fts) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
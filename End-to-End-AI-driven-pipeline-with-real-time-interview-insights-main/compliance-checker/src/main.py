@@ -1,67 +1,375 @@
-from src.models.controllers.upload_controller import app as upload_app
-from src.models.controllers.ingestion_controller import extract_text_from_pdf
-from src.models.controllers.chunk_controller import chunk_text
-from src.models.controllers.embedding_controller import generate_embeddings
-from src.models.controllers.vector_controller import create_faiss_index, save_faiss_index
-from src.models.controllers.pinecone_controller import upsert_to_pinecone
+from models.controller.upload_controller import app as upload_app, configure_ingestion
+from models.controller.ingestion_controller import file_sha256, iter_pdf_pages
+from models.controller.chunk_controller import chunk_spans, chunk_text, chunk_text_by_tokens, iter_chunks
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.manager.index_manager import IndexManager
+from models.controller.manager.shard_manager import ShardedIndex, routing
+from models.controller.manager.dedup_manager import ChunkDeduplicator, split_duplicates
+from models.controller.pinecone_controller import upsert_to_pinecone
+from models.controller.model_registry import model_id, warm_up
+from models.controller.bulk_ingestion_controller import bulk_ingest
+from models.controller.search_controller import configure_search
+from models.controller.manager.metrics_manager import profiled, start_run
+import argparse
+import json
+import logging
 import os
+import queue
+import threading
+import time
 
 # PDF upload folder
 UPLOAD_FOLDER = 'data/uploads'
 
 # FAISS index folder
 FAISS_FOLDER = 'data/vector_store'
+
+# Hash-routed shards for the index; 0 keeps a single unsharded index
+INDEX_SHARDS = int(os.getenv("MED_CHAT_INDEX_SHARDS", "0"))
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(FAISS_FOLDER, exist_ok=True)
 
 # Pinecone setup
 INDEX_NAME = "pdf-compliance-index"
 
-def process_pdf_pipeline(filepath, use_pinecone=False):
+# Shared by every pipeline run in this process, so concurrent ingestion jobs
+# append to one index instead of overwriting each other's saves
+_index_manager = None
+_index_manager_lock = threading.Lock()
+
+# Streaming mode: chunks per embedding micro-batch, and batches buffered between stages
+STREAM_BATCH_SIZE = 64
+STREAM_QUEUE_SIZE = 4
+
+# Marks the end of a stage's output on a queue
+_END_OF_STREAM = object()
+
+def get_index_manager():
     """
-    Processes a PDF file through the pipeline, extracting text, chunking,
-    generating embeddings, and storing them in Pinecone or a local FAISS index.
+    Returns the process-wide index for FAISS_FOLDER, opening it on first use.
 
-    Args:
-        filepath (str): The path to the PDF file.
-        use_pinecone (bool, optional): Whether to store embeddings in Pinecone. Defaults to False.
+    This is an IndexManager, or a ShardedIndex under FAISS_FOLDER/shards when
+    INDEX_SHARDS is set.
     """
 
-    print("\n--- Starting PDF Processing Pipeline ---\n")
+    global _index_manager
+    with _index_manager_lock:
+        if _index_manager is None:
+            if INDEX_SHARDS > 0:
+                _index_manager = ShardedIndex(os.path.join(FAISS_FOLDER, "shards"), hash_shards=INDEX_SHARDS,
+                                             model=model_id())
+            else:
+                _index_manager = IndexManager(FAISS_FOLDER, model=model_id())
+        return _index_manager
+
+
+def _put_unless_stopped(batches, item, stop):
+    # Waits for room on the queue, giving up once the consumer has stopped reading
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce_chunk_batches(filepath, batches, batch_size, run, stop):
+    """
+    Extracts pages and chunks them incrementally, feeding micro-batches into a bounded queue.
+
+    Returns early, closing the PDF, once `stop` is set by the consumer.
+    """
+
+    pdf_pages = iter_pdf_pages(filepath)
+    try:
+        batch = []
+        pages = run.timed_iter("extraction", pdf_pages)
+        for chunk in run.timed_iter("chunking", iter_chunks(pages)):
+            batch.append(chunk)
+            if len(batch) == batch_size:
+                if not _put_unless_stopped(batches, batch, stop):
+                    return
+                batch = []
+        if batch:
+            _put_unless_stopped(batches, batch, stop)
+    except Exception as e:
+        _put_unless_stopped(batches, e, stop)
+    finally:
+        pdf_pages.close()
+        _put_unless_stopped(batches, _END_OF_STREAM, stop)
+
+
+def _process_pdf_streaming(filepath, use_pinecone, batch_size, queue_size, collection, run):
+    """
+    Streaming variant of the pipeline with bounded memory.
+
+    A producer thread extracts and chunks page by page while this thread
+    embeds each micro-batch and stages it in the index, so extraction and
+    encoding overlap and at most `queue_size` batches are buffered in between.
+    The staged chunks replace the document's indexed version only once the
+    whole document went through; on failure they are discarded.
+    With the local index, near-duplicates of earlier chunks of the document are
+    recorded as aliases instead of being embedded. The chunking stage's time
+    includes the page extraction it waits on.
+    """
+
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce_chunk_batches, args=(filepath, batches, batch_size, run, stop), name="pdf-extractor",
+        daemon=True,
+    )
+
+    doc_id = file_sha256(filepath)
+    index = None if use_pinecone else get_index_manager()
+    # The new version is swapped in only once the whole document went through
+    staged = None if index is None else index.stage_document(doc_id, **routing(index, collection))
+    # Pinecone vectors are already uploaded when later duplicates of them show up
+    dedup = ChunkDeduplicator() if index is not None else None
+    chunk_ids = {}
+    total, encode_seconds = 0, 0.0
+
+    print("[1/4] Extracting, chunking and embedding in micro-batches...")
+    producer.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _END_OF_STREAM:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+
+            spans = chunk_spans(batch, first_index=total)
+            if dedup is None:
+                keep, aliases = list(range(len(batch))), []
+            else:
+                with run.stage("dedup", items=len(batch)):
+                    keep, aliases = split_duplicates(dedup.assign(batch), spans, first_index=total)
+
+            if keep:
+                start = time.perf_counter()
+                with run.stage("embedding") as stage:
+                    stage.batch(len(keep))
+                    embeddings = generate_embeddings([batch[n] for n in keep], show_progress_bar=False)
+                encode_seconds += time.perf_counter() - start
+                if isinstance(embeddings, dict):
+                    raise RuntimeError(embeddings["error"])
+
+                if use_pinecone:
+                    with run.stage("upsert") as stage:
+                        stage.batch(len(batch))
+                        upsert_to_pinecone(INDEX_NAME, embeddings, ids=range(total, total + len(batch)), doc_id=doc_id, chunks=batch)
+                else:
+                    with run.stage("indexing") as stage:
+                        stage.batch(len(keep))
+                        ids = staged.add_chunks([batch[n] for n in keep], embeddings, spans=[spans[n] for n in keep])
+                    chunk_ids.update(zip((total + n for n in keep), ids))
+            if aliases:
+                staged.add_aliases([(chunk_ids[representative], begin, end) for representative, begin, end in aliases])
+            total += len(batch)
+        if staged is not None:
+            with run.stage("indexing"):
+                staged.commit()
+    except Exception:
+        if staged is not None:
+            staged.discard()
+        raise
+    finally:
+        # Unblocks and retires the producer even when this loop failed
+        stop.set()
+        producer.join()
+    print(f"Embedded {total} chunks.")
+    if dedup is not None:
+        dedup_stats = dedup.stats(encode_seconds)
+        run.annotate(dedup=dedup_stats)
+        print(f"Near-duplicates: {dedup_stats}")
+
+    if use_pinecone:
+        print("[4/4] Embeddings uploaded to Pinecone.")
+    else:
+        print("[4/4] Saving FAISS index...")
+        with run.stage("indexing"):
+            index.save()
+        print("FAISS index saved locally.")
+
+
+def _process_pdf(filepath, use_pinecone, chunker, collection, run):
+    index = None if use_pinecone else get_index_manager()
+    route = {} if index is None else routing(index, collection)  # Fails before any work is done
 
     # Step 1: Extract text from PDF
     print("[1/5] Extracting text...")
-    text = extract_text_from_pdf(filepath)
+    text = "".join(run.timed_iter("extraction", iter_pdf_pages(filepath)))
     print("Text extraction complete.")
 
     # Step 2: Chunk the text
     print("[2/5] Chunking text...")
-    chunks = chunk_text(text)
+    with run.stage("chunking") as stage:
+        if chunker == "tokens":
+            chunks, spans = chunk_text_by_tokens(text)
+        else:
+            chunks = chunk_text(text)
+            spans = chunk_spans(chunks)
+        stage.items = len(chunks)
     print(f"Text chunked into {len(chunks)} chunks.")
 
-    # Step 3: Generate embeddings
+    # Step 3: Drop near-duplicate chunks (repeated headers, footers, disclaimers)
+    with run.stage("dedup", items=len(chunks)):
+        dedup = ChunkDeduplicator()
+        keep, aliases = split_duplicates(dedup.assign(chunks), spans)
+    unique_chunks = [chunks[n] for n in keep]
+    unique_spans = [spans[n] for n in keep]
+
+    # Step 4: Generate embeddings
     print("[3/5] Generating embeddings...")
-    embeddings = generate_embeddings(chunks)
+    start = time.perf_counter()
+    with run.stage("embedding") as stage:
+        stage.batch(len(unique_chunks))
+        embeddings = generate_embeddings(unique_chunks)
+    dedup_stats = dedup.stats(time.perf_counter() - start)
     print("Embeddings generated.")
+    run.annotate(dedup=dedup_stats)
+    print(f"Near-duplicates: {dedup_stats}")
 
-    # Step 4: Store embeddings
+    # Step 5: Store embeddings
     if use_pinecone:
         print("[4/5] Upserting embeddings to Pinecone...")
-        upsert_to_pinecone(INDEX_NAME, embeddings, ids=range(len(chunks)))
+        alias_spans = {n: [] for n in keep}
+        for representative, begin, end in aliases:
+            alias_spans[representative].append((begin, end))
+        with run.stage("upsert", items=len(unique_chunks)):
+            upsert_to_pinecone(INDEX_NAME, embeddings, ids=keep, doc_id=file_sha256(filepath), chunks=unique_chunks,
+                               aliases=[alias_spans[n] for n in keep])
         print("Embeddings uploaded to Pinecone.")
     else:
-        print("[4/5] Creating FAISS index...")
-        index = create_faiss_index(embeddings)
-        save_faiss_index(index, path=os.path.join(FAISS_FOLDER, "index.faiss"))  # Specify path
+        print("[4/5] Adding to FAISS index...")
+        with run.stage("indexing", items=len(unique_chunks)):
+            doc_id = file_sha256(filepath)
+            ids = index.add_document(doc_id, unique_chunks, embeddings, spans=unique_spans, **route)
+            chunk_ids = dict(zip(keep, ids))
+            index.add_aliases(doc_id, [(chunk_ids[n], begin, end) for n, begin, end in aliases], **route)
+            index.save()
         print("FAISS index saved locally.")
 
+
+def process_pdf_pipeline(filepath, use_pinecone=False, streaming=False,
+                         batch_size=STREAM_BATCH_SIZE, queue_size=STREAM_QUEUE_SIZE, chunker="chars",
+                         profile_path=None, collection=None):
+    """
+    Processes a PDF file through the pipeline, extracting text, chunking,
+    generating embeddings, and storing them in Pinecone or a local FAISS index.
+
+    Near-duplicate chunks (repeated headers, footers, disclaimers) are embedded
+    once; the other occurrences are stored as aliases of the indexed chunk.
+    Each stage is timed, and the run's metrics are logged as JSON and
+    published on the API's /metrics endpoints (unless MED_CHAT_METRICS=off).
+
+    Args:
+        filepath (str): The path to the PDF file.
+        use_pinecone (bool, optional): Whether to store embeddings in Pinecone. Defaults to False.
+        streaming (bool, optional): Whether to process the document page by page in
+            overlapping stages with bounded memory. Defaults to False.
+        batch_size (int, optional): Chunks per embedding micro-batch in streaming mode.
+        queue_size (int, optional): Micro-batches buffered between stages in streaming mode.
+        chunker (str, optional): 'chars' for fixed 500-character windows or 'tokens' for
+            sentence-aligned chunks sized to the model's token limit. Streaming mode
+            always uses 'chars'. Defaults to 'chars'.
+        profile_path (str, optional): Write a cProfile dump of this run to this path.
+        collection (str, optional): The collection (shard) of the local index the document
+            goes to; needs MED_CHAT_INDEX_SHARDS. Defaults to routing by document hash.
+
+    Returns:
+        dict: The run's metrics summary (empty when metrics are disabled).
+
+    Raises:
+        ValueError: If a collection is given for Pinecone or an unsharded index.
+    """
+
+    if collection is not None and use_pinecone:
+        raise ValueError("Collections are only supported by the local sharded index")
+    print("\n--- Starting PDF Processing Pipeline ---\n")
+    run = start_run("pdf_pipeline", file=os.path.basename(filepath), streaming=streaming,
+                    store="pinecone" if use_pinecone else "faiss")
+
+    try:
+        with profiled(profile_path):
+            if streaming:
+                _process_pdf_streaming(filepath, use_pinecone, batch_size, queue_size, collection, run)
+            else:
+                _process_pdf(filepath, use_pinecone, chunker, collection, run)
+    except Exception:
+        run.finish("failed")
+        raise
+
+    summary = run.finish()
+    if summary:
+        logging.info(f"Pipeline metrics: {json.dumps(summary)}")
     print("\n--- Pipeline Complete ---\n")
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PDF compliance pipeline")
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser("serve", help="Run the upload API (default)")
+
+    ingest = commands.add_parser("ingest", help="Bulk-ingest a directory of PDFs into the FAISS index")
+    ingest.add_argument("directory", help="Directory to scan recursively for PDFs")
+    ingest.add_argument("--workers", type=int, default=None, help="PDF parser processes (default: CPU count)")
+    ingest.add_argument("--batch-size", type=int, default=256, help="Minimum chunks per embedding batch")
+    ingest.add_argument("--collection", help="Shard the documents go to (needs MED_CHAT_INDEX_SHARDS)")
+
+    process = commands.add_parser("process", help="Run the pipeline on one PDF and print its metrics")
+    process.add_argument("file", help="The PDF to process")
+    process.add_argument("--pinecone", action="store_true", help="Store embeddings in Pinecone")
+    process.add_argument("--streaming", action="store_true", help="Process page by page with bounded memory")
+    process.add_argument("--chunker", choices=["chars", "tokens"], default="chars")
+    process.add_argument("--collection", help="Shard the document goes to (needs MED_CHAT_INDEX_SHARDS)")
+    process.add_argument("--profile", metavar="PATH", help="Write a cProfile dump of the run")
+    process.add_argument("--metrics-out", metavar="PATH", help="Also write the metrics summary as JSON")
+
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    # Run the Flask API for uploading files
-    upload_app.run(debug=True)
+    args = parse_args()
+
+    if args.command == "ingest":
+        stats = bulk_ingest(
+            args.directory,
+            workers=args.workers,
+            embed_batch_size=args.batch_size,
+            index=get_index_manager(),
+            collection=args.collection,
+        )
+        print(json.dumps(stats, indent=2))
+    elif args.command == "process":
+        summary = process_pdf_pipeline(
+            args.file,
+            use_pinecone=args.pinecone,
+            streaming=args.streaming,
+            chunker=args.chunker,
+            profile_path=args.profile,
+            collection=args.collection,
+        )
+        print(json.dumps(summary, indent=2))
+        if args.metrics_out:
+            with open(args.metrics_out, "w") as out:
+                json.dump(summary, out, indent=2)
+    else:
+        # Load the embedding model in the background while the API starts
+        warm_up()
+
+        # Ingest uploads in background workers; uploads get a job id immediately
+        configure_ingestion(
+            lambda filepath, collection: process_pdf_pipeline(filepath, streaming=True, collection=collection),
+            collections=INDEX_SHARDS > 0,
+        )
+
+        # Serve /search from the same index the ingestion jobs append to
+        configure_search(get_index_manager())
 
-    # For testing, process a file directly
-    test_filepath = 'data/uploads/sample.pdf'  # Replace with your test PDF
-    process_pdf_pipeline(test_filepath, use_pinecone=False)
\ No newline at end of file
+        # Run the Flask API for uploading files
+        upload_app.run(debug=True, use_reloader=False)
@@ -0,0 +1,160 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .chunk_controller import chunk_spans, chunk_text
+from .embedding_controller import generate_embeddings
+from .manager.dedup_manager import ChunkDeduplicator, split_duplicates
+from .manager.index_manager import IndexManager
+from .manager.shard_manager import routing
+from .manager.ingestion_manager import file_sha256, iter_pdf_pages
+from .model_registry import model_id
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+def _parse_pdf(path):
+    # Runs in a worker process: PyPDF2 is pure Python and holds the GIL.
+    pages = list(iter_pdf_pages(path))
+    return "".join(pages), len(pages)
+
+def find_pdfs(directory):
+    """
+    Lists the PDF files under a directory, recursively and in a stable order.
+
+    Args:
+        directory (str): The directory to scan.
+
+    Returns:
+        list: Paths of the PDF files found.
+    """
+
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+    return sorted(paths)
+
+def bulk_ingest(directory, index_folder=None, workers=None, embed_batch_size=256, index=None, collection=None):
+    """
+    Ingests every PDF under a directory into the managed FAISS index.
+
+    PDFs are parsed in parallel worker processes; the parsed text is chunked
+    and embedded in large batches and appended to the index by this process,
+    which is the only writer. Near-duplicate chunks within a document are
+    embedded once and recorded as aliases. Files whose content hash is already
+    indexed are skipped, and a file that fails to parse or embed is logged
+    without stopping the run. PDFs without text are recorded as indexed, so
+    later runs skip them.
+
+    Args:
+        directory (str): The directory containing the PDFs.
+        index_folder (str, optional): The folder of the IndexManager to extend, when `index` is not given.
+        workers (int, optional): Parser processes. Defaults to the CPU count.
+        embed_batch_size (int, optional): Minimum chunks per embedding batch. Defaults to 256.
+        index (IndexManager | ShardedIndex, optional): An open index to extend instead; it is
+            saved but left open.
+        collection (str, optional): The collection the documents go to; needs a ShardedIndex.
+
+    Returns:
+        dict: Counts (including near-duplicate chunks skipped), failures, elapsed seconds,
+        estimated encode seconds saved by deduplication and documents/pages per second.
+
+    Raises:
+        ValueError: If a collection is given for an unsharded index.
+    """
+
+    start = time.perf_counter()
+    route = routing(index, collection)  # Checked before opening: an index opened here is not sharded
+    owned = index is None
+    if owned:
+        index = IndexManager(index_folder, model=model_id())
+    stats = {"documents": 0, "pages": 0, "chunks": 0, "duplicates": 0, "skipped": 0, "failed": []}
+    encode_seconds = 0.0
+
+    pending, queued = {}, set()
+    for path in find_pdfs(directory):
+        try:
+            digest = file_sha256(path)
+        except OSError as e:
+            stats["failed"].append({"file": path, "error": str(e)})
+            continue
+        if digest in queued or index.has_document(digest, **route):
+            stats["skipped"] += 1
+        else:
+            pending[path] = digest
+            queued.add(digest)
+
+    batch_docs, batch_chunks = [], []
+
+    def flush():
+        nonlocal encode_seconds
+        if not batch_chunks:
+            return
+        started = time.perf_counter()
+        try:
+            embeddings = generate_embeddings(batch_chunks, show_progress_bar=False)
+            if isinstance(embeddings, dict):
+                raise RuntimeError(embeddings["error"])
+        except Exception as e:
+            logging.error(f"Failed to embed a batch of {len(batch_docs)} documents: {str(e)}")
+            for path, _, _, spans, aliases, page_count in batch_docs:
+                stats["failed"].append({"file": path, "error": str(e)})
+                stats["documents"] -= 1
+                stats["pages"] -= page_count
+                stats["chunks"] -= len(spans)
+                stats["duplicates"] -= len(aliases)
+            batch_docs.clear()
+            batch_chunks.clear()
+            return
+        finally:
+            encode_seconds += time.perf_counter() - started
+        offset = 0
+        for _, digest, keep, spans, aliases, _ in batch_docs:
+            count = len(keep)
+            ids = index.add_document(digest, batch_chunks[offset:offset + count], embeddings[offset:offset + count],
+                                     spans=[spans[n] for n in keep], **route)
+            chunk_ids = dict(zip(keep, ids))
+            index.add_aliases(digest, [(chunk_ids[representative], begin, end) for representative, begin, end in aliases],
+                              **route)
+            offset += count
+        batch_docs.clear()
+        batch_chunks.clear()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_parse_pdf, path): path for path in pending}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                text, page_count = future.result()
+            except Exception as e:
+                logging.error(f"Failed to parse {path}: {str(e)}")
+                stats["failed"].append({"file": path, "error": str(e)})
+                continue
+
+            chunks = chunk_text(text)
+            stats["documents"] += 1
+            stats["pages"] += page_count
+            if chunks:
+                spans = chunk_spans(chunks)
+                keep, aliases = split_duplicates(ChunkDeduplicator().assign(chunks), spans)
+                batch_docs.append((path, pending[path], keep, spans, aliases, page_count))
+                batch_chunks.extend(chunks[n] for n in keep)
+                stats["chunks"] += len(chunks)
+                stats["duplicates"] += len(aliases)
+            else:
+                index.add_document(pending[path], [], None, **route)
+            if len(batch_chunks) >= embed_batch_size:
+                flush()
+    flush()
+    index.save()
+    if owned:
+        index.close()
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    embedded = stats["chunks"] - stats["duplicates"]
+    stats["encode_seconds_saved"] = encode_seconds / embedded * stats["duplicates"] if embedded else 0.0
+    stats["docs_per_sec"] = stats["documents"] / elapsed if elapsed else 0.0
+    stats["pages_per_sec"] = stats["pages"] / elapsed if elapsed else 0.0
+    return stats
@@ -20,4 +20,72 @@ def chunk_text(text, chunk_size=500, overlap=50):
         chunks.append(chunk)
         start += chunk_size - overlap
 
-    return chunks
\ No newline at end of file
+    return chunks
+
+def iter_chunks(texts, chunk_size=500, overlap=50):
+    """
+    Chunks a stream of text pieces (e.g. PDF pages) incrementally.
+
+    Produces exactly the chunks `chunk_text` would return for the concatenated
+    text, carrying the overlap across piece boundaries, while only buffering
+    the unconsumed tail of the stream.
+
+    Args:
+        texts (iterable): Text pieces in document order.
+        chunk_size (int, optional): The desired size of each chunk. Defaults to 500.
+        overlap (int, optional): The number of characters to overlap between chunks. Defaults to 50.
+
+    Yields:
+        str: Text chunks.
+    """
+
+    step = chunk_size - overlap
+    buffer = ""
+
+    for text in texts:
+        buffer += text
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[step:]
+
+    while buffer:
+        yield buffer[:chunk_size]
+        buffer = buffer[step:]
+
+
+def chunk_spans(chunks, chunk_size=500, overlap=50, first_index=0):
+    """
+    Computes the character offsets of chunks produced by `chunk_text` or `iter_chunks`.
+
+    Args:
+        chunks (list): The chunks, in order.
+        chunk_size (int, optional): The chunk size they were produced with. Defaults to 500.
+        overlap (int, optional): The overlap they were produced with. Defaults to 50.
+        first_index (int, optional): Position of the first chunk in the document,
+            for chunks that arrive in batches. Defaults to 0.
+
+    Returns:
+        list: (start, end) offsets of each chunk in the source text.
+    """
+
+    step = chunk_size - overlap
+    return [(i * step, i * step + len(chunk)) for i, chunk in enumerate(chunks, start=first_index)]
+
+
+def chunk_text_by_tokens(text, max_tokens=None, overlap_tokens=32):
+    """
+    Chunks text into sentence-aligned segments that fit the embedding model's token limit.
+
+    Args:
+        text (str): The input text to be chunked.
+        max_tokens (int, optional): Token budget per chunk. Defaults to the model's limit.
+        overlap_tokens (int, optional): Tokens shared by consecutive chunks. Defaults to 32.
+
+    Returns:
+        tuple: (chunks, spans), the chunk texts and their (start, end) character offsets.
+    """
+
+    from .manager.chunk_manager import TokenChunker
+
+    pieces = TokenChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens).chunk(text)
+    return [piece.text for piece in pieces], [(piece.start, piece.end) for piece in pieces]
@@ -1,26 +1,89 @@
-
-from sentence_transformers import SentenceTransformer
 import logging
+import os
+import threading
+
+import numpy as np
+
+from .manager.embedding_cache import EmbeddingCache
+from .manager.metrics_manager import count as count_metric, registry as metrics_registry
+from .model_registry import get_sentence_transformer, model_id
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Load a pre-trained model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Persistent embedding cache; set MED_CHAT_EMBEDDING_CACHE=off to disable it
+EMBEDDING_CACHE_PATH = os.getenv("MED_CHAT_EMBEDDING_CACHE", "data/embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("MED_CHAT_EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+_cache = None
+_cache_lock = threading.Lock()
+
 
-def generate_embeddings(chunks):
+def get_embedding_cache():
+    """
+    Returns the process-wide embedding cache, or None when caching is disabled.
+    """
+
+    global _cache
+    if EMBEDDING_CACHE_PATH.lower() in ("", "off"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+        return _cache
+
+def _cache_counters():
+    cache = _cache
+    return {"hits": cache.hits, "misses": cache.misses} if cache is not None else {"hits": 0, "misses": 0}
+
+metrics_registry.register_counters("embedding_cache", _cache_counters)
+
+def _no_embeddings(model):
+    # A (0, dim) array, so callers can still tell the index dimension from it
+    return np.empty((0, model.get_sentence_embedding_dimension() or 0), dtype=np.float32)
+
+def _encode_with_cache(model, chunks, cache, show_progress_bar):
+    keys = [EmbeddingCache.key(model_id(), chunk) for chunk in chunks]
+    found = cache.get_many(keys)
+    count_metric("embedding_cache", hits=len(found), misses=len(set(keys)) - len(found))
+
+    # Encode each missing text once, even if it repeats within the batch
+    missing = {key: chunk for key, chunk in zip(keys, chunks) if key not in found}
+    if missing:
+        encoded = model.encode(list(missing.values()), show_progress_bar=show_progress_bar)
+        cache.put_many(list(missing), encoded)
+        found.update(zip(missing, np.asarray(encoded, dtype=np.float32)))
+
+    return np.stack([found[key] for key in keys]) if keys else _no_embeddings(model)
+
+def generate_embeddings(chunks, normalize=False, show_progress_bar=True, use_cache=True):
     """
     Generates embeddings for a list of text chunks.
 
+    Chunks already embedded by the same model are read from the persistent
+    cache; only the misses are encoded, in a single batch.
+
     Args:
         chunks (list): A list of text chunks.
+        normalize (bool, optional): Whether to L2-normalize the embeddings. Defaults to False.
+        show_progress_bar (bool, optional): Whether to display a progress bar. Defaults to True.
+        use_cache (bool, optional): Whether to consult the persistent embedding cache. Defaults to True.
 
     Returns:
         list: A list of embeddings, or an error message if the process fails.
     """
 
     try:
-        embeddings = model.encode(chunks, show_progress_bar=True)
+        model = get_sentence_transformer()
+        cache = get_embedding_cache() if use_cache else None
+        if not len(chunks):
+            return _no_embeddings(model)
+        if cache is None:
+            return model.encode(chunks, show_progress_bar=show_progress_bar, normalize_embeddings=normalize)
+
+        embeddings = _encode_with_cache(model, list(chunks), cache, show_progress_bar)
+        if normalize and len(embeddings):
+            embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
         return embeddings
     except Exception as e:
         logging.error(f"Embedding generation failed: {str(e)}")
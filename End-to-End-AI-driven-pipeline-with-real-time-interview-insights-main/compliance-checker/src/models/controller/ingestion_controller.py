@@ -1,12 +1,10 @@
-from sentence_transformers import SentenceTransformer
 import logging
+from .model_registry import get_sentence_transformer
+from .manager.ingestion_manager import extract_text_from_pdf, file_sha256, iter_pdf_pages  # noqa: F401
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Load a pre-trained model
-model = SentenceTransformer('all-MiniLM-L6-v2')
-
 def generate_embeddings(chunks):
     """
     Generates embeddings for a list of text chunks.
@@ -19,6 +17,7 @@ def generate_embeddings(chunks):
     """
 
     try:
+        model = get_sentence_transformer()
         embeddings = model.encode(chunks, show_progress_bar=True)
         return embeddings
     except Exception as e:
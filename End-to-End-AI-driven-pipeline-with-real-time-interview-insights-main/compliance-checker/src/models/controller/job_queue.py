@@ -0,0 +1,177 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another pending job."""
+
+
+class Job:
+    """
+    A unit of background work and its lifecycle timestamps.
+
+    Attributes:
+        id (str): The job id returned to clients.
+        key (str): Deduplication key, e.g. the upload's content hash.
+        args (tuple): Arguments passed to the worker function.
+        status (str): 'queued', 'running', 'done' or 'failed'.
+        error (str | None): The failure message, if any.
+    """
+
+    def __init__(self, key, args):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.args = args
+        self.status = "queued"
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        """
+        Returns the job's status and timing as a JSON-serializable dict.
+        """
+
+        queued_for = (self.started_at or time.time()) - self.created_at
+        running_for = None
+        if self.started_at is not None:
+            running_for = (self.finished_at or time.time()) - self.started_at
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queued_seconds": queued_for,
+            "running_seconds": running_for,
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs processed by a fixed pool of background worker threads.
+
+    Submitting a job whose key matches a queued, running or completed job
+    returns that job instead of running the work again; failed jobs can be
+    resubmitted. Finished jobs are forgotten once more than `max_finished`
+    of them are kept or after `finished_ttl` seconds, whichever comes first;
+    their ids then answer as unknown and their keys can be submitted again.
+
+    Args:
+        worker_fn (callable): Called with each job's args.
+        num_workers (int, optional): Worker threads. Defaults to 2.
+        max_pending (int, optional): Jobs allowed to wait in the queue. Defaults to 16.
+        max_finished (int, optional): Finished jobs kept for status lookups. Defaults to 1000.
+        finished_ttl (float, optional): Seconds a finished job is kept. Defaults to one day.
+    """
+
+    def __init__(self, worker_fn, num_workers=2, max_pending=16, max_finished=1000, finished_ttl=24 * 3600):
+        self.worker_fn = worker_fn
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._jobs = {}
+        self._jobs_by_key = {}
+        # Finished jobs, oldest first
+        self._finished = deque()
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"job-worker-{n}", daemon=True) for n in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, key, *args):
+        """
+        Enqueues a job unless one with the same key is already known.
+
+        Args:
+            key (str): Deduplication key.
+            *args: Arguments for the worker function.
+
+        Returns:
+            tuple: (job, created) where `created` is False for a deduplicated job.
+
+        Raises:
+            QueueFullError: If `max_pending` jobs are already waiting.
+        """
+
+        with self._lock:
+            self._evict_finished()
+            existing = self._jobs_by_key.get(key)
+            if existing is not None and existing.status != "failed":
+                return existing, False
+
+            job = Job(key, args)
+            try:
+                self._pending.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError("Ingestion queue is full, retry later")
+            self._jobs[job.id] = job
+            self._jobs_by_key[key] = job
+            return job, True
+
+    def get(self, job_id):
+        """
+        Looks up a job by id.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Job | None: The job, or None if unknown.
+        """
+
+        with self._lock:
+            self._evict_finished()
+            return self._jobs.get(job_id)
+
+    def references(self, arg):
+        """
+        Tells whether a known job was submitted with an argument.
+
+        Args:
+            arg: The argument, e.g. an uploaded file path.
+
+        Returns:
+            bool: True if a queued, running or kept finished job has it among its args.
+        """
+
+        with self._lock:
+            return any(arg in job.args for job in self._jobs.values())
+
+    def _evict_finished(self):
+        # Callers hold _lock
+        expired = time.time() - self.finished_ttl
+        while self._finished and (len(self._finished) > self.max_finished or self._finished[0].finished_at < expired):
+            job = self._finished.popleft()
+            self._jobs.pop(job.id, None)
+            if self._jobs_by_key.get(job.key) is job:
+                del self._jobs_by_key[job.key]
+
+    def _run(self):
+        while True:
+            job = self._pending.get()
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                self.worker_fn(*job.args)
+                job.status = "done"
+            except Exception as e:
+                logging.error(f"Job {job.id} failed: {str(e)}")
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                with self._lock:
+                    job.finished_at = time.time()
+                    self._finished.append(job)
+                    self._evict_finished()
+                self._pending.task_done()
@@ -0,0 +1,110 @@
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+
+from ..model_registry import DEFAULT_MODEL, get_transformer
+
+# Sentence ends: terminal punctuation followed by whitespace, or a blank line.
+SENTENCE_END = re.compile(r"[.!?](?=\s)|\n\s*\n")
+
+
+@dataclass
+class Chunk:
+    """
+    A chunk of a document.
+
+    Attributes:
+        text (str): The chunk text.
+        start (int): Offset of the first character in the source text.
+        end (int): Offset one past the last character in the source text.
+        n_tokens (int): Number of model tokens, excluding special tokens.
+    """
+
+    text: str
+    start: int
+    end: int
+    n_tokens: int
+
+
+class TokenChunker:
+    """
+    Packs whole sentences into chunks that fit the embedding model's token budget.
+
+    The text is tokenized once; sentence boundaries are mapped to token
+    positions through the tokenizer's character offsets, and chunks are cut
+    at the last sentence boundary within the budget (or mid-sentence when one
+    sentence alone exceeds it). Consecutive chunks share `overlap_tokens`
+    tokens.
+
+    Attributes:
+        tokenizer: A fast Hugging Face tokenizer (needed for offset mapping).
+        max_tokens (int): Token budget per chunk, excluding special tokens.
+        overlap_tokens (int): Tokens repeated at the start of the next chunk.
+    """
+
+    def __init__(self, tokenizer=None, max_tokens: int = None, overlap_tokens: int = 32):
+        """
+        Initializes the chunker.
+
+        Args:
+            tokenizer (optional): A fast tokenizer. Defaults to the shared model's tokenizer.
+            max_tokens (int, optional): Token budget per chunk. Defaults to the model's
+                maximum sequence length minus its special tokens.
+            overlap_tokens (int, optional): Token overlap between chunks. Defaults to 32.
+        """
+
+        if tokenizer is None:
+            from ..model_registry import get_sentence_transformer
+
+            tokenizer, _ = get_transformer(DEFAULT_MODEL)
+            max_tokens = max_tokens or get_sentence_transformer(DEFAULT_MODEL).max_seq_length - 2
+        if not getattr(tokenizer, "is_fast", False):
+            raise ValueError("TokenChunker needs a fast tokenizer for character offsets.")
+
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens or tokenizer.model_max_length - 2
+        self.overlap_tokens = min(overlap_tokens, self.max_tokens // 2)
+
+    def chunk(self, text: str) -> list[Chunk]:
+        """
+        Splits text into token-bounded, sentence-aligned chunks.
+
+        Args:
+            text (str): The input text.
+
+        Returns:
+            list[Chunk]: The chunks with their character offsets and token counts.
+        """
+
+        offsets = self.tokenizer(
+            text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+        )["offset_mapping"]
+        n_tokens = len(offsets)
+        if n_tokens == 0:
+            return []
+
+        # Token index just after each sentence end; offsets and matches both
+        # increase, so a single forward walk maps them.
+        boundaries, t = [], 0
+        for match in SENTENCE_END.finditer(text):
+            while t < n_tokens and offsets[t][0] < match.end():
+                t += 1
+            if not boundaries or boundaries[-1] != t:
+                boundaries.append(t)
+
+        chunks, start, prev_end = [], 0, 0
+        while True:
+            limit = min(start + self.max_tokens, n_tokens)
+            if limit == n_tokens:
+                end = n_tokens
+            else:
+                # Furthest sentence boundary within the budget that moves past the previous chunk
+                i = bisect_right(boundaries, limit) - 1
+                end = boundaries[i] if i >= 0 and boundaries[i] > prev_end else limit
+
+            char_start, char_end = offsets[start][0], offsets[end - 1][1]
+            chunks.append(Chunk(text[char_start:char_end], char_start, char_end, end - start))
+            if end == n_tokens:
+                return chunks
+            prev_end = end
+            start = end - self.overlap_tokens
@@ -0,0 +1,159 @@
+import hashlib
+import re
+from collections import defaultdict
+
+import numpy as np
+
+WORD = re.compile(r"\w+")
+
+FINGERPRINT_BITS = 64
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    Computes the 64-bit SimHash of a text over lowercased word shingles.
+
+    Texts that share most of their shingles get fingerprints that differ in
+    only a few bits, so near-duplicates can be found by Hamming distance.
+
+    Args:
+        text (str): The input text.
+        shingle_size (int, optional): Words per shingle. Defaults to 3.
+
+    Returns:
+        int: The fingerprint.
+    """
+
+    words = WORD.findall(text.lower())
+    if len(words) > shingle_size:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+    else:
+        shingles = [" ".join(words) or text]
+
+    hashes = np.array(
+        [hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles], dtype="S8"
+    ).view(np.uint8).reshape(len(shingles), 8)
+    # Bit i of the fingerprint is set when most shingle hashes have it set
+    votes = np.unpackbits(hashes, axis=1).sum(axis=0, dtype=np.int64)
+    return int.from_bytes(np.packbits(2 * votes > len(shingles)).tobytes(), "big")
+
+
+def split_duplicates(groups, spans, first_index=0):
+    """
+    Separates group representatives from their near-duplicates.
+
+    Args:
+        groups (list): Representative position per chunk, from ChunkDeduplicator.assign.
+        spans (list): (start, end) offsets per chunk.
+        first_index (int, optional): Position of the first chunk in the document. Defaults to 0.
+
+    Returns:
+        tuple: (keep, aliases) where `keep` lists the indexes of the chunks to embed and
+        `aliases` holds (representative position, start, end) for each duplicate.
+    """
+
+    keep, aliases = [], []
+    for n, (representative, (start, end)) in enumerate(zip(groups, spans)):
+        if representative == first_index + n:
+            keep.append(n)
+        else:
+            aliases.append((representative, start, end))
+    return keep, aliases
+
+
+class ChunkDeduplicator:
+    """
+    Groups near-duplicate chunks by SimHash so only one per group gets embedded.
+
+    Fingerprints are split into `max_distance + 1` bands; two fingerprints
+    within `max_distance` bits of each other must agree on at least one band,
+    so each chunk is only compared against the representatives sharing a band
+    with it, keeping the stage roughly linear in the number of chunks. The
+    first chunk of a group is its representative. State is kept across calls,
+    so a document streamed in batches is deduplicated as a whole.
+
+    Attributes:
+        max_distance (int): The largest Hamming distance treated as a duplicate.
+        shingle_size (int): Words per shingle.
+        chunks (int): Chunks seen so far.
+        duplicates (int): Chunks found to duplicate an earlier representative.
+    """
+
+    def __init__(self, max_distance: int = 6, shingle_size: int = 3):
+        """
+        Initializes the deduplicator.
+
+        Args:
+            max_distance (int, optional): Maximum differing fingerprint bits. Defaults to 6.
+            shingle_size (int, optional): Words per shingle. Defaults to 3.
+        """
+
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.chunks = 0
+        self.duplicates = 0
+        self._band_bits = FINGERPRINT_BITS // (max_distance + 1)
+        self._buckets = [defaultdict(list) for _ in range(max_distance + 1)]
+        self._fingerprints = []
+
+    def _bands(self, fingerprint):
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (band * self._band_bits)) & mask for band in range(len(self._buckets))]
+
+    def assign(self, chunks: list[str]) -> list[int]:
+        """
+        Assigns each chunk to a group.
+
+        Args:
+            chunks (list[str]): The next chunks of the document, in order.
+
+        Returns:
+            list[int]: For each chunk, the position (counted over every chunk
+            seen so far) of its group's representative; a chunk that starts a
+            new group is its own representative.
+        """
+
+        assignments = []
+        for text in chunks:
+            position = self.chunks
+            self.chunks += 1
+            fingerprint = simhash(text, self.shingle_size)
+            bands = self._bands(fingerprint)
+
+            match = None
+            for bucket, band in zip(self._buckets, bands):
+                for candidate in bucket.get(band, ()):
+                    if bin(fingerprint ^ self._fingerprints[candidate][1]).count("1") <= self.max_distance:
+                        match = candidate
+                        break
+                if match is not None:
+                    break
+
+            if match is None:
+                for bucket, band in zip(self._buckets, bands):
+                    bucket[band].append(len(self._fingerprints))
+                self._fingerprints.append((position, fingerprint))
+                assignments.append(position)
+            else:
+                self.duplicates += 1
+                assignments.append(self._fingerprints[match][0])
+        return assignments
+
+    def stats(self, encode_seconds: float = None) -> dict:
+        """
+        Summarizes the savings so far.
+
+        Args:
+            encode_seconds (float, optional): Time spent embedding the representatives,
+                used to estimate the encode time the duplicates would have cost.
+
+        Returns:
+            dict: 'chunks', 'duplicates', 'embedded' and, when `encode_seconds` is
+            given, 'encode_seconds_saved'.
+        """
+
+        embedded = self.chunks - self.duplicates
+        stats = {"chunks": self.chunks, "duplicates": self.duplicates, "embedded": embedded}
+        if encode_seconds is not None:
+            stats["encode_seconds_saved"] = encode_seconds / embedded * self.duplicates if embedded else 0.0
+        return stats
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+# SQLite's default limit on host parameters per statement is 999.
+_SQL_BATCH = 900
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed store of embedding vectors backed by SQLite.
+
+    Vectors are keyed by a hash of the model identity and the chunk text, stored
+    as float32 blobs, and evicted least-recently-used once the cache grows past
+    `max_entries`.
+
+    Attributes:
+        path (str): The SQLite database file.
+        max_entries (int): The maximum number of vectors kept on disk.
+        hits (int): Lookups answered from the cache since creation.
+        misses (int): Lookups that had to be encoded since creation.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path (str): The SQLite database file.
+            max_entries (int, optional): The maximum number of cached vectors. Defaults to 100000.
+        """
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model_id: str, text: str) -> str:
+        """
+        Builds the cache key of a chunk for a given model.
+
+        Args:
+            model_id (str): Identifies the model (and backend) that produced the vector.
+            text (str): The chunk text.
+
+        Returns:
+            str: The hex SHA-256 key.
+        """
+
+        return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict:
+        """
+        Looks up vectors and refreshes their recency.
+
+        Args:
+            keys (list[str]): Cache keys to look up.
+
+        Returns:
+            dict: Maps each found key to its float32 vector.
+        """
+
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        now = time.time_ns()
+        with self._lock:
+            for start in range(0, len(unique), _SQL_BATCH):
+                batch = unique[start:start + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                self._conn.execute(f"UPDATE embeddings SET last_used = ? WHERE key IN ({marks})", [now, *batch])
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, keys: list[str], vectors: np.ndarray):
+        """
+        Stores vectors, evicting the least recently used entries beyond `max_entries`.
+
+        Args:
+            keys (list[str]): Cache keys, one per row of `vectors`.
+            vectors (np.ndarray): A (len(keys), dim) array of embeddings.
+        """
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        now = time.time_ns()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                ((key, vector.tobytes(), now) for key, vector in zip(keys, vectors)),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters and the current size.
+
+        Returns:
+            dict: 'hits', 'misses', 'hit_rate' and 'entries'.
+        """
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,7 @@
+import numpy as np
 import torch
-from transformers import AutoTokenizer, AutoModel
+
+from ..model_registry import get_transformer
 
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
@@ -13,13 +15,16 @@ class Embedder:
         model (transformers.AutoModel): The pre-trained sentence transformer model.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = None):
         """
-        Loads the pre-trained model and tokenizer.
+        Loads the pre-trained model and tokenizer from the shared model registry.
+
+        Args:
+            backend (str, optional): The inference backend ('torch', 'torch-int8', 'onnx'
+                or 'onnx-int8'). Defaults to MED_CHAT_EMBEDDING_BACKEND.
         """
 
-        self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-        self.model = AutoModel.from_pretrained(MODEL_NAME)
+        self.tokenizer, self.model = get_transformer(MODEL_NAME, backend)
 
     def get_embeddings(self, chunks: list[str]) -> list[list[float]]:
         """
@@ -46,6 +51,49 @@ class Embedder:
 
         return embeddings
 
+    def embed_batch(
+        self, chunks: list[str], batch_size: int = 32, normalize: bool = False
+    ) -> np.ndarray:
+        """
+        Generates embeddings for many chunks with batched, length-bucketed inference.
+
+        Chunks are tokenized once, sorted by token length so each batch pads to
+        a similar length, and mean-pooled over real tokens only. Rows of the
+        result follow the order of `chunks`.
+
+        Args:
+            chunks (list[str]): A list of text chunks to be embedded.
+            batch_size (int, optional): Chunks per forward pass. Defaults to 32.
+            normalize (bool, optional): Whether to L2-normalize each vector. Defaults to False.
+
+        Returns:
+            np.ndarray: A contiguous (len(chunks), dim) float32 array.
+        """
+
+        dim = self.model.config.hidden_size
+        output = np.empty((len(chunks), dim), dtype=np.float32)
+        if not chunks:
+            return output
+
+        encoded = self.tokenizer(list(chunks), truncation=True)
+        order = np.argsort([len(ids) for ids in encoded["input_ids"]], kind="stable")
+
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch_idx = order[start:start + batch_size]
+                features = self.tokenizer.pad(
+                    [{key: encoded[key][i] for key in encoded} for i in batch_idx],
+                    return_tensors="pt",
+                )
+                hidden = self.model(**features).last_hidden_state
+                mask = features["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                if normalize:
+                    pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+                output[batch_idx] = pooled.numpy()
+
+        return output
+
 
 # Example usage
 if __name__ == "__main__":
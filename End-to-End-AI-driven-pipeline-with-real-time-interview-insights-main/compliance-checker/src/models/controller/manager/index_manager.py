@@ -0,0 +1,671 @@
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+
+import faiss
+import numpy as np
+
+from ..vector_controller import (
+    REMOVABLE_INDEX_TYPES, create_empty_faiss_index, create_faiss_index, load_faiss_index, prepare_vectors,
+    save_faiss_index,
+)
+
+INDEX_FILENAME = "chunks.faiss"
+METADATA_FILENAME = "chunks.sqlite"
+
+# `save` rewrites the FAISS file once this many vectors were added or removed
+# since the last checkpoint, and at least this fraction of the index; until
+# then the vectors committed with the metadata are replayed when opening.
+CHECKPOINT_MIN_CHANGES = 10_000
+CHECKPOINT_FRACTION = 0.25
+
+# Vectors read back from SQLite per batch
+_REPLAY_BATCH = 4096
+
+# SQLite's default limit on host parameters per statement is 999.
+_SQL_BATCH = 900
+
+
+class IndexManager:
+    """
+    Append-only FAISS index with per-chunk metadata and per-document deletion.
+
+    Vectors are stored under stable 64-bit ids that are never reused. Each id
+    maps to a metadata row holding the source document id, the chunk's
+    character offsets in that document, its text and its vector, plus the
+    offsets of any near-duplicate occurrences that were folded into it (its
+    aliases) instead of being embedded again.
+
+    The SQLite metadata is the source of truth: `save` commits it, which costs
+    time proportional to the changes, and only rewrites the FAISS file (a
+    checkpoint) once enough of the index changed since the last one. Opening
+    the folder brings the checkpoint up to date by re-adding the committed
+    vectors it lacks and dropping the ids no longer in the metadata, so a
+    crash at any point loses at most the uncommitted changes.
+
+    The metadata also records the model the vectors came from (the `model`
+    of the first write); writes from a manager opened for another model are
+    refused, so vectors of different models never share an index.
+
+    Attributes:
+        folder (str): Directory holding the index and metadata files.
+        metric (str): The distance metric ('L2' or 'cosine').
+        model (str | None): Id of the model producing this manager's vectors, if checked.
+        index (faiss.IndexIDMap2 | None): The index, created on the first add.
+    """
+
+    def __init__(self, folder: str, metric: str = 'L2', model: str = None):
+        """
+        Opens the index and metadata in a folder, creating them if needed.
+
+        Args:
+            folder (str): Directory holding the index and metadata files.
+            metric (str, optional): The distance metric for a new index. Defaults to 'L2'.
+            model (str, optional): Id of the model producing the vectors (see model_registry.model_id).
+                Writes are refused when the folder holds vectors of another model. Defaults to None,
+                which skips the check.
+        """
+
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.metric = metric
+        self.model = model
+        self.index_path = os.path.join(folder, INDEX_FILENAME)
+        self.index = None
+        self._lock = threading.RLock()
+        # Held by writers and for the whole of a rebuild or checkpoint; searches only take _lock
+        self._write_lock = threading.RLock()
+        # Vectors added or removed since the FAISS file was last written
+        self._changes = 0
+        self._checkpoint_due = False
+
+        self._conn = sqlite3.connect(os.path.join(folder, METADATA_FILENAME), check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id INTEGER PRIMARY KEY, doc_id TEXT NOT NULL, chunk_no INTEGER NOT NULL,"
+            " start INTEGER, end INTEGER, text TEXT, vector BLOB);"
+            "CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks(doc_id);"
+            "CREATE TABLE IF NOT EXISTS aliases ("
+            " chunk_id INTEGER NOT NULL, doc_id TEXT NOT NULL, start INTEGER, end INTEGER);"
+            "CREATE INDEX IF NOT EXISTS aliases_chunk_id ON aliases(chunk_id);"
+            "CREATE INDEX IF NOT EXISTS aliases_doc_id ON aliases(doc_id);"
+            "CREATE TABLE IF NOT EXISTS staged_chunks ("
+            " id INTEGER PRIMARY KEY, token TEXT NOT NULL, chunk_no INTEGER NOT NULL,"
+            " start INTEGER, end INTEGER, text TEXT, vector BLOB NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS staged_chunks_token ON staged_chunks(token);"
+            "CREATE TABLE IF NOT EXISTS staged_aliases ("
+            " token TEXT NOT NULL, chunk_id INTEGER NOT NULL, start INTEGER, end INTEGER);"
+            "CREATE TABLE IF NOT EXISTS empty_documents (doc_id TEXT PRIMARY KEY);"
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            "INSERT OR IGNORE INTO counters VALUES ('next_id', 0);"
+            "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL);"
+        )
+        if "vector" not in [row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")]:
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN vector BLOB")  # Folders from before vectors were kept
+        # Staged documents of a previous process can no longer be committed
+        self._conn.execute("DELETE FROM staged_chunks")
+        self._conn.execute("DELETE FROM staged_aliases")
+        self._conn.commit()
+        self.index, self._changes = self._recover(self._read_checkpoint())
+        stored_model = self.stored_model()
+        if model is not None and stored_model is not None and stored_model != model:
+            logging.warning(f"{folder} holds vectors from model '{stored_model}', not '{model}'; "
+                            "searches will not match and writes are refused")
+
+    def __len__(self):
+        return 0 if self.index is None else self.index.ntotal
+
+    def _allocate_ids(self, count):
+        next_id = self._conn.execute("SELECT value FROM counters WHERE name = 'next_id'").fetchone()[0]
+        self._conn.execute("UPDATE counters SET value = ? WHERE name = 'next_id'", (next_id + count,))
+        return np.arange(next_id, next_id + count, dtype=np.int64)
+
+    def _read_checkpoint(self):
+        return load_faiss_index(self.index_path) if os.path.exists(self.index_path) else None
+
+    def _recover(self, index):
+        # Brings a checkpoint up to date with the committed metadata: re-adds the vectors it lacks
+        # and drops ids deleted since it was written. Returns the index and the changes made.
+        with self._lock:
+            committed = {row[0] for row in self._conn.execute("SELECT id FROM chunks")}
+        indexed = set() if index is None else set(faiss.vector_to_array(index.id_map).tolist())
+        stale = np.array(sorted(indexed - committed), dtype=np.int64)
+        if len(stale):
+            index.remove_ids(stale)
+        missing = sorted(committed - indexed)
+        for start in range(0, len(missing), _SQL_BATCH):
+            batch = missing[start:start + _SQL_BATCH]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, vector FROM chunks WHERE id IN ({','.join('?' * len(batch))}) AND vector IS NOT NULL",
+                    batch,
+                ).fetchall()
+            if len(rows) < len(batch):
+                logging.warning(f"{len(batch) - len(rows)} chunks in {self.folder} have no stored vector; skipping them")
+            if rows:
+                index = self._with_vectors(
+                    index,
+                    np.array([row[0] for row in rows], dtype=np.int64),
+                    np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]),
+                )
+        return index, len(stale) + len(missing)
+
+    def reload(self):
+        """
+        Re-reads the checkpoint from disk, e.g. after another process rebuilt the index.
+
+        Pending changes are committed first and replayed onto the checkpoint
+        read, so nothing written through this manager is lost. The same
+        connection is kept, so documents being staged carry on; writes wait
+        meanwhile and searches keep using the current index until the
+        reloaded one is swapped in.
+        """
+
+        with self._write_lock:
+            with self._lock:
+                self._conn.commit()
+            index, changes = self._recover(self._read_checkpoint())
+            with self._lock:
+                self.index = index
+            self._changes = changes
+            self._checkpoint_due = False
+
+    def stored_model(self):
+        """
+        Returns the id of the model the indexed vectors came from.
+
+        Returns:
+            str | None: The model id, or None if no write recorded one yet.
+        """
+
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE name = 'model'").fetchone()
+        return None if row is None else row[0]
+
+    def _check_model(self):
+        # Callers hold _lock; records the model on the first checked write, in the same transaction
+        if self.model is None:
+            return
+        stored_model = self.stored_model()
+        if stored_model is None:
+            self._conn.execute("INSERT INTO settings VALUES ('model', ?)", (self.model,))
+        elif stored_model != self.model:
+            raise ValueError(
+                f"{self.folder} holds vectors from model '{stored_model}', not '{self.model}'; "
+                "index into a new folder or switch back to that model"
+            )
+
+    def _check_dimension(self, vectors):
+        if self.index is not None and vectors.shape[1] != self.index.d:
+            raise ValueError(f"Vectors have dimension {vectors.shape[1]}, the index expects {self.index.d}")
+
+    def _with_vectors(self, index, ids, vectors):
+        # Adds vectors to an index, creating it on the first add
+        if index is None:
+            index = faiss.IndexIDMap2(create_empty_faiss_index(vectors.shape[1], metric=self.metric))
+        index.add_with_ids(vectors, ids)
+        return index
+
+    def _add_vectors(self, ids, vectors):
+        # Callers hold _write_lock and _lock
+        if not len(ids):
+            return
+        self.index = self._with_vectors(self.index, ids, vectors)
+        self._changes += len(ids)
+
+    def has_document(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM chunks WHERE doc_id = ? UNION ALL SELECT 1 FROM empty_documents WHERE doc_id = ? LIMIT 1",
+                (doc_id, doc_id),
+            ).fetchone() is not None
+
+    def add_chunks(self, doc_id: str, chunks: list[str], embeddings, spans: list = None) -> np.ndarray:
+        """
+        Appends chunks of a document to the index.
+
+        Args:
+            doc_id (str): The source document id (e.g. its content hash).
+            chunks (list[str]): The chunk texts.
+            embeddings: A (len(chunks), dim) array of embeddings.
+            spans (list, optional): (start, end) character offsets per chunk.
+
+        Returns:
+            np.ndarray: The int64 ids assigned to the chunks (none for a document without text).
+
+        Raises:
+            ValueError: If the index holds vectors of another model than `model`.
+        """
+
+        if not len(chunks):
+            return np.empty(0, dtype=np.int64)
+        vectors = prepare_vectors(embeddings, self.metric)
+        spans = spans or [(None, None)] * len(chunks)
+        with self._write_lock, self._lock:
+            self._check_model()
+            self._check_dimension(vectors)
+            first_chunk_no = self._conn.execute(
+                "SELECT COALESCE(MAX(chunk_no) + 1, 0) FROM chunks WHERE doc_id = ?", (doc_id,)
+            ).fetchone()[0]
+            ids = self._allocate_ids(len(chunks))
+            self._conn.executemany(
+                "INSERT INTO chunks (id, doc_id, chunk_no, start, end, text, vector) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (int(i), doc_id, first_chunk_no + n, start, end, text, vector.tobytes())
+                    for n, (i, text, (start, end), vector) in enumerate(zip(ids, chunks, spans, vectors))
+                ],
+            )
+            self._add_vectors(ids, vectors)
+        return ids
+
+    def add_aliases(self, doc_id: str, aliases: list):
+        """
+        Records occurrences of already indexed chunks.
+
+        Args:
+            doc_id (str): The document containing the occurrences.
+            aliases (list): (chunk_id, start, end) per occurrence, where chunk_id is the
+                indexed chunk it duplicates.
+        """
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO aliases (chunk_id, doc_id, start, end) VALUES (?, ?, ?, ?)",
+                [(int(chunk_id), doc_id, start, end) for chunk_id, start, end in aliases],
+            )
+
+    def add_document(self, doc_id: str, chunks: list[str], embeddings, spans: list = None) -> np.ndarray:
+        """
+        Indexes a document, replacing any vectors previously stored for it.
+
+        A document without chunks is recorded as well, so `has_document` is
+        true for it and it is not parsed again.
+
+        Args:
+            doc_id (str): The source document id (e.g. its content hash).
+            chunks (list[str]): The chunk texts.
+            embeddings: A (len(chunks), dim) array of embeddings.
+            spans (list, optional): (start, end) character offsets per chunk.
+
+        Returns:
+            np.ndarray: The int64 ids assigned to the chunks.
+
+        Raises:
+            ValueError: If the index holds vectors of another model than `model`.
+        """
+
+        with self._write_lock, self._lock:
+            self.remove_document(doc_id)
+            if not len(chunks):
+                self._conn.execute("INSERT INTO empty_documents (doc_id) VALUES (?)", (doc_id,))
+            return self.add_chunks(doc_id, chunks, embeddings, spans)
+
+    def remove_document(self, doc_id: str) -> int:
+        """
+        Removes every vector and metadata row of a document.
+
+        Args:
+            doc_id (str): The source document id.
+
+        Returns:
+            int: The number of chunks removed.
+        """
+
+        with self._write_lock, self._lock:
+            ids = np.array(
+                [row[0] for row in self._conn.execute("SELECT id FROM chunks WHERE doc_id = ?", (doc_id,))],
+                dtype=np.int64,
+            )
+            if len(ids) and self.index is not None:
+                self.index.remove_ids(ids)
+                self._changes += len(ids)
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM aliases WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM empty_documents WHERE doc_id = ?", (doc_id,))
+            return len(ids)
+
+    def stage_document(self, doc_id: str) -> "StagedDocument":
+        """
+        Starts replacing a document chunk by chunk, without touching its indexed version yet.
+
+        Args:
+            doc_id (str): The source document id (e.g. its content hash).
+
+        Returns:
+            StagedDocument: Collects the new chunks; commit it to swap them in.
+
+        Raises:
+            ValueError: If the index holds vectors of another model than `model`.
+        """
+
+        with self._lock:
+            self._check_model()
+        return StagedDocument(self, doc_id)
+
+    def _stage_chunks(self, token, first_chunk_no, chunks, embeddings, spans):
+        if not len(chunks):
+            return np.empty(0, dtype=np.int64)
+        vectors = prepare_vectors(embeddings, self.metric)
+        spans = spans or [(None, None)] * len(chunks)
+        with self._lock:
+            self._check_model()
+            self._check_dimension(vectors)
+            ids = self._allocate_ids(len(chunks))
+            self._conn.executemany(
+                "INSERT INTO staged_chunks (id, token, chunk_no, start, end, text, vector) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (int(i), token, first_chunk_no + n, start, end, text, vector.tobytes())
+                    for n, (i, text, (start, end), vector) in enumerate(zip(ids, chunks, spans, vectors))
+                ],
+            )
+        return ids
+
+    def _stage_aliases(self, token, aliases):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO staged_aliases (token, chunk_id, start, end) VALUES (?, ?, ?, ?)",
+                [(token, int(chunk_id), start, end) for chunk_id, start, end in aliases],
+            )
+
+    def _commit_staged(self, token, doc_id):
+        with self._write_lock, self._lock:
+            self.remove_document(doc_id)
+            self._conn.execute(
+                "INSERT INTO chunks (id, doc_id, chunk_no, start, end, text, vector)"
+                " SELECT id, ?, chunk_no, start, end, text, vector FROM staged_chunks WHERE token = ? ORDER BY id",
+                (doc_id, token),
+            )
+            self._conn.execute(
+                "INSERT INTO aliases (chunk_id, doc_id, start, end)"
+                " SELECT chunk_id, ?, start, end FROM staged_aliases WHERE token = ? ORDER BY rowid",
+                (doc_id, token),
+            )
+            last_id, count = -1, 0
+            while True:
+                rows = self._conn.execute(
+                    "SELECT id, vector FROM staged_chunks WHERE token = ? AND id > ? ORDER BY id LIMIT ?",
+                    (token, last_id, _REPLAY_BATCH),
+                ).fetchall()
+                if not rows:
+                    break
+                self._add_vectors(
+                    np.array([row[0] for row in rows], dtype=np.int64),
+                    np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]),
+                )
+                last_id, count = rows[-1][0], count + len(rows)
+            self._discard_staged(token)
+            return count
+
+    def _discard_staged(self, token):
+        with self._lock:
+            self._conn.execute("DELETE FROM staged_chunks WHERE token = ?", (token,))
+            self._conn.execute("DELETE FROM staged_aliases WHERE token = ?", (token,))
+
+    def vectors(self):
+        """
+        Returns the indexed vectors with their ids, as stored in the metadata.
+
+        The exact vectors are read from SQLite, so they carry no quantisation
+        error whatever the index type. Chunks of folders from before vectors
+        were stored are reconstructed from a copy of the index instead, so the
+        index being searched is never modified.
+
+        Returns:
+            tuple: (ids, vectors) int64 (n,) and float32 (n, dim) arrays, ordered by id.
+        """
+
+        with self._write_lock:
+            ids, rows, missing, last_id = [], [], [], -1
+            while True:
+                with self._lock:
+                    batch = self._conn.execute(
+                        "SELECT id, vector FROM chunks WHERE id > ? ORDER BY id LIMIT ?", (last_id, _REPLAY_BATCH)
+                    ).fetchall()
+                if not batch:
+                    break
+                for row_id, vector in batch:
+                    if vector is None:
+                        missing.append(row_id)
+                    else:
+                        ids.append(row_id)
+                        rows.append(np.frombuffer(vector, dtype=np.float32))
+                last_id = batch[-1][0]
+            if missing:
+                ids, rows = self._reconstruct_missing(ids, rows, missing)
+
+            if not ids:
+                dimension = 0 if self.index is None else self.index.d
+                return np.empty(0, dtype=np.int64), np.empty((0, dimension), dtype=np.float32)
+            ids = np.array(ids, dtype=np.int64)
+            order = np.argsort(ids, kind="stable")
+            return ids[order], np.stack(rows)[order]
+
+    def _reconstruct_missing(self, ids, rows, missing):
+        # Callers hold _write_lock. IVF indexes need a direct map to reconstruct, which
+        # would stop the live index from removing vectors, so a copy gets it instead.
+        with self._lock:
+            copy = faiss.clone_index(self.index)
+        inner = faiss.downcast_index(copy.index)
+        ivf = faiss.try_extract_index_ivf(inner)
+        if ivf is not None:
+            ivf.make_direct_map()
+        positions = {int(i): n for n, i in enumerate(faiss.vector_to_array(copy.id_map))}
+        lost = [i for i in missing if i not in positions]
+        if lost:
+            logging.warning(f"{len(lost)} chunks in {self.folder} have no stored or indexed vector; skipping them")
+        for chunk_id in missing:
+            if chunk_id in positions:
+                ids.append(chunk_id)
+                rows.append(inner.reconstruct(positions[chunk_id]))
+        return ids, rows
+
+    def rebuild(self, index_type: str = 'auto', **index_params) -> str:
+        """
+        Rebuilds the index, e.g. as another type once it has grown, without blocking searches.
+
+        The new index is built from the stored vectors under the same ids
+        while searches keep using the old one, which is left untouched; writes wait until it is swapped
+        in. Documents must stay replaceable, so only REMOVABLE_INDEX_TYPES are
+        built: 'auto' never picks a graph index ('hnsw'). The next `save` writes
+        a checkpoint of the new index.
+
+        Args:
+            index_type (str, optional): 'auto' or one of REMOVABLE_INDEX_TYPES. Defaults to 'auto'.
+            **index_params: Further create_faiss_index arguments (memory_budget_mb, nlist, nprobe...).
+
+        Returns:
+            str: The FAISS class of the new index, or '' if the index is empty.
+
+        Raises:
+            ValueError: If the index type cannot remove vectors, or the index holds
+                vectors of another model than `model`.
+        """
+
+        if index_type != 'auto' and index_type not in REMOVABLE_INDEX_TYPES:
+            raise ValueError(f"Index type {index_type!r} cannot remove vectors; use one of {REMOVABLE_INDEX_TYPES}")
+        with self._write_lock:
+            with self._lock:
+                self._check_model()
+            ids, vectors = self.vectors()
+            if not len(ids):
+                return ''
+            index = create_faiss_index(vectors, metric=self.metric, index_type=index_type, ids=ids, removable=True,
+                                       **index_params)
+            with self._lock:
+                self.index = index
+            self._checkpoint_due = True
+            return type(faiss.downcast_index(index.index)).__name__
+
+    def search(self, query_vectors, top_k: int = 5):
+        """
+        Searches the index.
+
+        Args:
+            query_vectors: An (n, dim) array of query embeddings.
+            top_k (int, optional): The number of neighbours per query. Defaults to 5.
+
+        Returns:
+            tuple: (distances, ids) arrays of shape (n, top_k); missing results have id -1.
+        """
+
+        queries = prepare_vectors(query_vectors, self.metric)
+        with self._lock:  # FAISS indexes are not safe to search while another thread adds
+            if self.index is None or self.index.ntotal == 0:
+                return (np.full((len(queries), top_k), np.inf, dtype=np.float32),
+                        np.full((len(queries), top_k), -1, dtype=np.int64))
+            return self.index.search(queries, top_k)
+
+    def get_chunks(self, ids) -> dict:
+        """
+        Fetches the metadata of chunks by id.
+
+        Args:
+            ids: Chunk ids; -1 entries are ignored.
+
+        Returns:
+            dict: Maps each found id to a dict with 'doc_id', 'chunk_no', 'start', 'end', 'text'
+            and 'aliases', the other occurrences of the chunk as dicts with 'doc_id', 'start' and 'end'.
+        """
+
+        wanted = [int(i) for i in np.ravel(ids) if i != -1]
+        found = {}
+        with self._lock:
+            for start in range(0, len(wanted), 900):
+                batch = wanted[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT id, doc_id, chunk_no, start, end, text FROM chunks WHERE id IN ({','.join('?' * len(batch))})",
+                    batch,
+                )
+                for row_id, doc_id, chunk_no, begin, end, text in rows:
+                    found[row_id] = {
+                        "doc_id": doc_id, "chunk_no": chunk_no, "start": begin, "end": end, "text": text, "aliases": [],
+                    }
+                rows = self._conn.execute(
+                    f"SELECT chunk_id, doc_id, start, end FROM aliases WHERE chunk_id IN ({','.join('?' * len(batch))})"
+                    " ORDER BY rowid",
+                    batch,
+                )
+                for chunk_id, doc_id, begin, end in rows:
+                    if chunk_id in found:
+                        found[chunk_id]["aliases"].append({"doc_id": doc_id, "start": begin, "end": end})
+        return found
+
+    def save(self):
+        """
+        Commits the pending changes, and writes a checkpoint of the index when one is due.
+
+        The metadata (with the vectors and the id counter) is committed first,
+        so the FAISS file never holds ids the metadata could hand out again. A
+        checkpoint is due once the vectors added or removed since the last one
+        reach CHECKPOINT_MIN_CHANGES and CHECKPOINT_FRACTION of the index,
+        which spreads its cost over the adds that made it due.
+        """
+
+        with self._write_lock:
+            with self._lock:
+                self._conn.commit()
+                due = self._checkpoint_due or self._changes >= max(CHECKPOINT_MIN_CHANGES,
+                                                                   CHECKPOINT_FRACTION * len(self))
+            if due:
+                self._write_checkpoint()
+
+    def checkpoint(self):
+        """
+        Commits the pending changes and writes the index to disk now.
+        """
+
+        with self._write_lock:
+            with self._lock:
+                self._conn.commit()
+            self._write_checkpoint()
+
+    def _write_checkpoint(self):
+        # Under _write_lock only: nothing modifies the index meanwhile, and searches keep running
+        if self.index is not None:
+            tmp_path = self.index_path + ".tmp"
+            save_faiss_index(self.index, path=tmp_path)
+            os.replace(tmp_path, self.index_path)
+        self._changes = 0
+        self._checkpoint_due = False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+
+class StagedDocument:
+    """
+    A new version of a document, built up in batches and swapped in at once.
+
+    Chunks and their vectors go to staging tables as they arrive, so nothing
+    is held in memory and searches keep seeing the previous version. `commit`
+    replaces the previous version in one step; `discard` drops the staged
+    chunks and leaves the index as it was. As a context manager it commits
+    when the block succeeds and discards when it raises.
+
+    Attributes:
+        doc_id (str): The source document id.
+    """
+
+    def __init__(self, manager: IndexManager, doc_id: str):
+        self.doc_id = doc_id
+        self._manager = manager
+        self._token = uuid.uuid4().hex
+        self._chunk_count = 0
+
+    def add_chunks(self, chunks: list[str], embeddings, spans: list = None) -> np.ndarray:
+        """
+        Stages chunks of the document.
+
+        Args:
+            chunks (list[str]): The chunk texts.
+            embeddings: A (len(chunks), dim) array of embeddings.
+            spans (list, optional): (start, end) character offsets per chunk.
+
+        Returns:
+            np.ndarray: The int64 ids the chunks will have once committed.
+        """
+
+        ids = self._manager._stage_chunks(self._token, self._chunk_count, chunks, embeddings, spans)
+        self._chunk_count += len(chunks)
+        return ids
+
+    def add_aliases(self, aliases: list):
+        """
+        Stages occurrences of chunks staged earlier.
+
+        Args:
+            aliases (list): (chunk_id, start, end) per occurrence.
+        """
+
+        self._manager._stage_aliases(self._token, aliases)
+
+    def commit(self) -> int:
+        """
+        Replaces the document's indexed chunks with the staged ones.
+
+        Returns:
+            int: The number of chunks indexed.
+        """
+
+        return self._manager._commit_staged(self._token, self.doc_id)
+
+    def discard(self):
+        """
+        Drops the staged chunks; the document's indexed version is left as it was.
+        """
+
+        self._manager._discard_staged(self._token)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
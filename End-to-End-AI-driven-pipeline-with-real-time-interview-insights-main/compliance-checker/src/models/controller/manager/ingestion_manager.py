@@ -1,5 +1,49 @@
+import hashlib
+from typing import Iterator
+
 import PyPDF2
 
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """Computes the SHA-256 of a file, reading it in blocks.
+
+    Used as the document id, so re-ingesting the same file is recognised.
+
+    Args:
+        path (str): The file to hash.
+        block_size (int, optional): Bytes read per block. Defaults to 1 MiB.
+
+    Returns:
+        str: The hex digest.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def iter_pdf_pages(pdf_path: str) -> Iterator[str]:
+    """Yields the text of a PDF one page at a time.
+
+    Only the current page's text is held in memory, so callers can start
+    chunking before the whole document has been read.
+
+    Args:
+        pdf_path (str): The path to the PDF file.
+
+    Yields:
+        str: The extracted text of each page ("" for pages without text).
+
+    Raises:
+        FileNotFoundError: If the PDF file is not found.
+        PyPDF2.PdfReadError: If there's an error reading the PDF.
+    """
+
+    with open(pdf_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            yield page.extract_text() or ""  # Handle empty pages
+
 def extract_text_from_pdf(pdf_path: str) -> str:
     """Extracts text from a PDF file.
 
@@ -15,13 +59,7 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     """
 
     try:
-        with open(pdf_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() or ""  # Handle empty pages
-            return text
+        return "".join(iter_pdf_pages(pdf_path))
     except FileNotFoundError:
         print(f"PDF file not found: {pdf_path}")
         return ""
@@ -0,0 +1,450 @@
+import contextlib
+import contextvars
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Set MED_CHAT_METRICS=off to make every hook below a no-op
+METRICS_ENABLED = os.getenv("MED_CHAT_METRICS", "on").lower() not in ("0", "off", "false")
+
+# Run summaries kept in memory for the /metrics/runs endpoint
+RECENT_RUNS = 50
+
+METRIC_PREFIX = "med_chat"
+
+# Minimum seconds between two RSS samples of a run
+RSS_SAMPLE_INTERVAL = 0.05
+
+# The run started on this thread (or task), which `count` adds to
+_current_run = contextvars.ContextVar("med_chat_current_run", default=None)
+
+
+def process_peak_rss_bytes():
+    """
+    Returns the peak resident set size over this process's lifetime in bytes, or None if unknown.
+    """
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def current_rss_bytes():
+    """
+    Returns the current resident set size of this process in bytes, or None if unknown (non-Linux).
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def count(source: str, **values):
+    """
+    Adds to the counters of the run active on this thread, if any.
+
+    The registry's process-wide counters are read from their sources
+    separately; this only attributes the work to the run doing it, so
+    concurrent runs do not see each other's hits, e.g.
+    `count("embedding_cache", hits=3, misses=1)`.
+
+    Args:
+        source (str): Prefix for the counters, e.g. 'embedding_cache'.
+        **values: Counter name to increment.
+    """
+
+    run = _current_run.get()
+    if run is not None:
+        run._count(source, values)
+
+
+class MetricsRegistry:
+    """
+    Process-wide totals per pipeline stage, plus counters contributed by other modules.
+
+    Attributes:
+        runs (deque): Summaries of the most recent runs, oldest first.
+    """
+
+    def __init__(self, recent_runs: int = RECENT_RUNS):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._run_counts = {}
+        self._counter_sources = {}
+        self.runs = deque(maxlen=recent_runs)
+
+    def register_counters(self, name: str, source):
+        """
+        Registers a source of monotonically increasing counters, read on demand.
+
+        Args:
+            name (str): Prefix for the counters, e.g. 'embedding_cache'.
+            source (callable): Returns a dict of counter name to value.
+        """
+
+        with self._lock:
+            self._counter_sources[name] = source
+
+    def counters(self) -> dict:
+        """
+        Reads every registered counter.
+
+        Returns:
+            dict: Maps '<source>_<counter>' to its current value.
+        """
+
+        with self._lock:
+            sources = list(self._counter_sources.items())
+        values = {}
+        for name, source in sources:
+            try:
+                values.update({f"{name}_{key}": value for key, value in source().items()})
+            except Exception as e:
+                logging.warning(f"Metrics source '{name}' failed: {str(e)}")
+        return values
+
+    def observe_stage(self, stage: str, seconds: float, items: int, batches: int):
+        with self._lock:
+            totals = self._stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "items": 0, "batches": 0})
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["items"] += items
+            totals["batches"] += batches
+
+    def record_run(self, summary: dict):
+        with self._lock:
+            self._run_counts[summary["status"]] = self._run_counts.get(summary["status"], 0) + 1
+            self.runs.append(summary)
+
+    def render_prometheus(self) -> str:
+        """
+        Renders the totals in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+
+        with self._lock:
+            stages = {stage: dict(totals) for stage, totals in self._stages.items()}
+            run_counts = dict(self._run_counts)
+
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}" if label_text
+                             else f"{METRIC_PREFIX}_{name} {value}")
+
+        for field, help_text in (("seconds", "Wall time spent in the stage."),
+                                 ("items", "Items processed by the stage."),
+                                 ("batches", "Batches processed by the stage."),
+                                 ("calls", "Times the stage ran.")):
+            family(f"stage_{field}_total", "counter", help_text,
+                   [({"stage": stage}, totals[field]) for stage, totals in sorted(stages.items())])
+        family("runs_total", "counter", "Pipeline runs by outcome.",
+               [({"status": status}, count) for status, count in sorted(run_counts.items())])
+        for name, value in sorted(self.counters().items()):
+            family(f"{name}_total", "counter", f"{name.replace('_', ' ').capitalize()}.", [({}, value)])
+        rss = current_rss_bytes()
+        if rss is not None:
+            family("process_rss_bytes", "gauge", "Resident set size of the process.", [({}, rss)])
+        peak = process_peak_rss_bytes()
+        if peak is not None:
+            family("process_peak_rss_bytes", "gauge", "Peak resident set size of the process.", [({}, peak)])
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class StageTimer:
+    """
+    Times one execution of a stage; returned by `RunMetrics.stage`.
+
+    Attributes:
+        items (int): Items processed; add to it, or call `batch`, inside the block.
+    """
+
+    def __init__(self, run, name, items):
+        self.run = run
+        self.name = name
+        self.items = items
+        self.batch_sizes = []
+
+    def batch(self, size: int):
+        """
+        Records a batch of `size` items.
+        """
+
+        self.batch_sizes.append(size)
+        self.items += size
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.run._record(self.name, time.perf_counter() - self._start, self.items, self.batch_sizes)
+        return False
+
+
+class RunMetrics:
+    """
+    Per-run measurements of the pipeline stages.
+
+    Stages may run several times per run (once per micro-batch) and from
+    several threads; their wall time, items and batch sizes are accumulated.
+    Counters added with `count` on the run's thread (e.g. embedding cache
+    hits) are reported with a hit rate for every '<name>_hits' /
+    '<name>_misses' pair. The process RSS is sampled when the run starts,
+    as its stages complete and when it finishes; the highest sample is its
+    'rss_peak_bytes'.
+
+    Attributes:
+        name (str): The kind of run, e.g. 'pdf_pipeline'.
+        labels (dict): Extra fields copied into the summary, e.g. the file.
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._start_time = time.time()
+        self._start = time.perf_counter()
+        self._counters = {}
+        self._status = None
+        self._token = None
+        self._rss_start = current_rss_bytes()
+        self._rss_peak = self._rss_start
+        self._rss_sampled_at = self._start
+
+    def stage(self, name: str, items: int = 0) -> StageTimer:
+        """
+        Times a stage: `with run.stage("embedding", items=len(chunks)): ...`.
+
+        Args:
+            name (str): The stage name.
+            items (int, optional): Items the stage processes, if known up front. Defaults to 0.
+
+        Returns:
+            StageTimer: A context manager.
+        """
+
+        return StageTimer(self, name, items)
+
+    def timed_iter(self, name: str, iterable):
+        """
+        Wraps an iterator so the time spent producing each item counts towards a stage.
+
+        Args:
+            name (str): The stage name.
+            iterable: The items, e.g. PDF pages.
+
+        Yields:
+            The items of `iterable`.
+        """
+
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+            self._record(name, elapsed, 1, ())
+            yield item
+
+    def annotate(self, **fields):
+        """
+        Adds fields to the run summary, e.g. deduplication stats.
+        """
+
+        with self._lock:
+            self.labels.update(fields)
+
+    def _count(self, source, values):
+        with self._lock:
+            for key, value in values.items():
+                name = f"{source}_{key}"
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def _sample_rss(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._rss_sampled_at < RSS_SAMPLE_INTERVAL:
+            return
+        rss = current_rss_bytes()
+        with self._lock:
+            self._rss_sampled_at = now
+            if rss is not None and (self._rss_peak is None or rss > self._rss_peak):
+                self._rss_peak = rss
+
+    def _record(self, name, seconds, items, batch_sizes):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"seconds": 0.0, "items": 0, "batch_sizes": []})
+            stage["seconds"] += seconds
+            stage["items"] += items
+            stage["batch_sizes"].extend(batch_sizes)
+        registry.observe_stage(name, seconds, items, len(batch_sizes))
+        self._sample_rss()
+
+    def finish(self, status: str = "ok") -> dict:
+        """
+        Closes the run and publishes its summary to the registry.
+
+        Args:
+            status (str, optional): 'ok' or 'failed'. Defaults to 'ok'.
+
+        Returns:
+            dict: The JSON-serializable run summary.
+        """
+
+        self._status = status
+        if self._token is not None:
+            _current_run.reset(self._token)
+            self._token = None
+        self._sample_rss(force=True)
+        summary = self.summary()
+        registry.record_run(summary)
+        return summary
+
+    def summary(self) -> dict:
+        """
+        Returns the run's measurements so far as a JSON-serializable dict.
+        """
+
+        with self._lock:
+            stages = {}
+            for name, stage in self._stages.items():
+                sizes = stage["batch_sizes"]
+                stages[name] = {
+                    "seconds": stage["seconds"],
+                    "items": stage["items"],
+                    "items_per_sec": stage["items"] / stage["seconds"] if stage["seconds"] else 0.0,
+                    "batches": len(sizes),
+                    "mean_batch_size": sum(sizes) / len(sizes) if sizes else None,
+                    "max_batch_size": max(sizes) if sizes else None,
+                }
+
+        with self._lock:
+            counters = dict(self._counters)
+            rss_start, rss_peak = self._rss_start, self._rss_peak
+        for name in list(counters):
+            if name.endswith("_hits"):
+                base = name[:-len("_hits")]
+                lookups = counters[name] + counters.get(f"{base}_misses", 0)
+                counters[f"{base}_hit_rate"] = counters[name] / lookups if lookups else None
+
+        with self._lock:
+            labels = dict(self.labels)
+        return {
+            "run": self.name,
+            **labels,
+            "status": self._status or "running",
+            "started_at": self._start_time,
+            "seconds": time.perf_counter() - self._start,
+            "rss_start_bytes": rss_start,
+            "rss_peak_bytes": rss_peak,
+            "stages": stages,
+            "counters": counters,
+        }
+
+
+class _NullTimer:
+    items = 0
+
+    def batch(self, size):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _NullRun:
+    # Stands in for RunMetrics when metrics are disabled
+    _timer = _NullTimer()
+
+    def stage(self, name, items=0):
+        return self._timer
+
+    def timed_iter(self, name, iterable):
+        return iterable
+
+    def annotate(self, **fields):
+        pass
+
+    def finish(self, status="ok"):
+        return {}
+
+    def summary(self):
+        return {}
+
+
+def start_run(name: str, **labels):
+    """
+    Starts measuring a pipeline run.
+
+    The run becomes the current one on the calling thread until it
+    finishes, so `count` calls made there are attributed to it.
+
+    Args:
+        name (str): The kind of run, e.g. 'pdf_pipeline'.
+        **labels: Extra fields for the summary, e.g. file=path.
+
+    Returns:
+        RunMetrics: The run, or a no-op stand-in when MED_CHAT_METRICS is off.
+    """
+
+    if not METRICS_ENABLED:
+        return _NullRun()
+    run = RunMetrics(name, **labels)
+    run._token = _current_run.set(run)
+    return run
+
+
+@contextlib.contextmanager
+def profiled(path: str = None):
+    """
+    Runs the block under cProfile and dumps the stats to `path`; does nothing if path is None.
+
+    Only the calling thread is profiled. Inspect the output with
+    `python -m pstats <path>` or snakeviz.
+
+    Args:
+        path (str, optional): Where to write the profile.
+    """
+
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        profiler.dump_stats(path)
+        logging.info(f"Profile written to {path}")
@@ -0,0 +1,380 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .index_manager import IndexManager
+
+SHARDS_FILENAME = "shards.json"
+
+# Global chunk ids carry the shard number above this many bits of per-shard id
+SHARD_ID_BITS = 48
+_LOCAL_ID_MASK = (1 << SHARD_ID_BITS) - 1
+
+# Shards searched concurrently; FAISS releases the GIL while searching
+SEARCH_THREADS = int(os.getenv("MED_CHAT_SHARD_SEARCH_THREADS", "8"))
+
+_SHARD_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def check_collection(collection: str) -> str:
+    """
+    Validates a collection name, which doubles as its shard's folder name.
+
+    Args:
+        collection (str): The collection name.
+
+    Returns:
+        str: The name, unchanged.
+
+    Raises:
+        ValueError: If the name has characters other than letters, digits, '_', '.' and '-',
+            or takes the 'hash-' prefix of the hash-routed shards.
+    """
+
+    if not _SHARD_NAME.fullmatch(collection) or collection.startswith("hash-"):
+        raise ValueError(f"Invalid collection name: {collection!r}")
+    return collection
+
+
+def routing(index, collection: str = None) -> dict:
+    """
+    Builds the keyword arguments that place a document in a collection of an index.
+
+    Args:
+        index (IndexManager | ShardedIndex): The index written to.
+        collection (str, optional): The collection, or None to let the index route the document.
+
+    Returns:
+        dict: {'collection': collection}, or {} without a collection.
+
+    Raises:
+        ValueError: If a collection is given for an index that is not sharded, or its name is invalid.
+    """
+
+    if collection is None:
+        return {}
+    if not isinstance(index, ShardedIndex):
+        raise ValueError("Collections need a sharded index; set MED_CHAT_INDEX_SHARDS")
+    return {"collection": check_collection(collection)}
+
+
+class ShardedIndex:
+    """
+    A set of IndexManager shards searched as one index.
+
+    A document goes to the shard named after its collection (a clinic or a
+    document category), or, without one, to one of `hash_shards` shards
+    picked from a hash of its id. Searches fan out to the selected shards on
+    a thread pool and the per-shard top-k lists are merged with a heap.
+    Chunk ids are made global by putting the shard number in their top bits,
+    so results from different shards never collide and the object can stand
+    in for an IndexManager (e.g. behind the search service). A shard can be
+    rebuilt or reloaded from disk while the others, and searches of the
+    shard itself, keep being served.
+
+    Attributes:
+        folder (str): Directory holding one sub-folder per shard.
+        metric (str): The distance metric ('L2' or 'cosine') of every shard.
+        model (str | None): Id of the model producing the vectors, checked by every shard.
+        hash_shards (int): Shards used for documents without a collection.
+    """
+
+    def __init__(self, folder: str, metric: str = 'L2', hash_shards: int = 4, search_threads: int = SEARCH_THREADS,
+                 model: str = None):
+        """
+        Opens the shards in a folder, creating the folder if needed.
+
+        Args:
+            folder (str): Directory holding the shards.
+            metric (str, optional): The distance metric for a new set of shards. Defaults to 'L2'.
+            hash_shards (int, optional): Hash-routed shards for a new set of shards. Defaults to 4.
+            search_threads (int, optional): Shards searched at once. Defaults to SEARCH_THREADS.
+            model (str, optional): Id of the model producing the vectors; see IndexManager. Defaults to None.
+        """
+
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.model = model
+        self._registry_path = os.path.join(folder, SHARDS_FILENAME)
+        registry = {"metric": metric, "hash_shards": hash_shards, "shards": {}}
+        if os.path.exists(self._registry_path):
+            with open(self._registry_path) as file:
+                registry = json.load(file)
+        # Routing must not change once documents were placed, so the stored settings win
+        self.metric = registry["metric"]
+        self.hash_shards = registry["hash_shards"]
+        self._numbers = registry["shards"]
+        self._shards = {
+            name: IndexManager(os.path.join(folder, name), metric=self.metric, model=model) for name in self._numbers
+        }
+        self._names = {number: name for name, number in self._numbers.items()}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=search_threads, thread_name_prefix="shard-search")
+
+    def __len__(self):
+        return sum(len(shard) for shard in list(self._shards.values()))
+
+    @property
+    def shards(self) -> dict:
+        """
+        dict: Vectors per shard name.
+        """
+
+        return {name: len(shard) for name, shard in list(self._shards.items())}
+
+    def shard_for(self, doc_id: str, collection: str = None) -> str:
+        """
+        Names the shard a document belongs to.
+
+        Args:
+            doc_id (str): The document id.
+            collection (str, optional): The document's collection.
+
+        Returns:
+            str: The collection itself, or 'hash-NN' from a stable hash of the document id.
+        """
+
+        if collection is not None:
+            return check_collection(collection)
+        digest = hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest()
+        return f"hash-{int.from_bytes(digest, 'big') % self.hash_shards:02d}"
+
+    def _shard(self, name, create=False):
+        shard = self._shards.get(name)
+        if shard is None and create:
+            with self._lock:
+                shard = self._shards.get(name)
+                if shard is None:
+                    number = max(self._numbers.values(), default=-1) + 1
+                    shard = IndexManager(os.path.join(self.folder, name), metric=self.metric, model=self.model)
+                    self._numbers[name] = number
+                    self._names[number] = name
+                    self._shards[name] = shard
+                    self._write_registry()
+        return shard
+
+    def _write_registry(self):
+        tmp_path = self._registry_path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"metric": self.metric, "hash_shards": self.hash_shards, "shards": self._numbers}, file)
+        os.replace(tmp_path, self._registry_path)
+
+    def _to_global(self, name, ids):
+        return np.where(ids == -1, -1, (self._numbers[name] << SHARD_ID_BITS) | ids)
+
+    def has_document(self, doc_id: str, collection: str = None) -> bool:
+        shard = self._shard(self.shard_for(doc_id, collection))
+        return shard is not None and shard.has_document(doc_id)
+
+    def add_document(self, doc_id: str, chunks: list[str], embeddings, spans: list = None,
+                     collection: str = None) -> np.ndarray:
+        """
+        Indexes a document in its shard, replacing any vectors previously stored for it there.
+
+        Args:
+            doc_id (str): The source document id (e.g. its content hash).
+            chunks (list[str]): The chunk texts.
+            embeddings: A (len(chunks), dim) array of embeddings.
+            spans (list, optional): (start, end) character offsets per chunk.
+            collection (str, optional): The collection routing the document.
+
+        Returns:
+            np.ndarray: The global int64 ids assigned to the chunks.
+        """
+
+        name = self.shard_for(doc_id, collection)
+        ids = self._shard(name, create=True).add_document(doc_id, chunks, embeddings, spans)
+        return self._to_global(name, ids)
+
+    def add_aliases(self, doc_id: str, aliases: list, collection: str = None):
+        """
+        Records occurrences of already indexed chunks of a document.
+
+        Args:
+            doc_id (str): The document containing the occurrences.
+            aliases (list): (global chunk_id, start, end) per occurrence.
+            collection (str, optional): The collection routing the document.
+        """
+
+        self._shard(self.shard_for(doc_id, collection), create=True).add_aliases(
+            doc_id, [(int(chunk_id) & _LOCAL_ID_MASK, start, end) for chunk_id, start, end in aliases]
+        )
+
+    def remove_document(self, doc_id: str, collection: str = None) -> int:
+        shard = self._shard(self.shard_for(doc_id, collection))
+        return 0 if shard is None else shard.remove_document(doc_id)
+
+    def stage_document(self, doc_id: str, collection: str = None) -> "ShardedStagedDocument":
+        """
+        Starts replacing a document in its shard (see IndexManager.stage_document).
+
+        Args:
+            doc_id (str): The source document id.
+            collection (str, optional): The collection routing the document.
+
+        Returns:
+            ShardedStagedDocument: Collects the new chunks under global ids; commit it to swap them in.
+        """
+
+        name = self.shard_for(doc_id, collection)
+        return ShardedStagedDocument(self._shard(name, create=True).stage_document(doc_id), self._numbers[name])
+
+    def search(self, query_vectors, top_k: int = 5, collections: list = None):
+        """
+        Searches the selected shards concurrently and merges their results.
+
+        Args:
+            query_vectors: An (n, dim) array of query embeddings.
+            top_k (int, optional): The number of neighbours per query. Defaults to 5.
+            collections (list, optional): Shard names to search; all shards if None.
+                Unknown names are ignored.
+
+        Returns:
+            tuple: (distances, ids) arrays of shape (n, top_k) with global ids; missing results have id -1.
+        """
+
+        queries = np.array(query_vectors, dtype=np.float32, ndmin=2)
+        shards = list(self._shards.items())
+        if collections is not None:
+            wanted = set(collections)
+            shards = [(name, shard) for name, shard in shards if name in wanted]
+
+        futures = [(name, self._pool.submit(shard.search, queries, top_k)) for name, shard in shards]
+        per_shard = []
+        for name, future in futures:
+            shard_distances, shard_ids = future.result()
+            per_shard.append((shard_distances, self._to_global(name, shard_ids)))
+
+        distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+        ids = np.full((len(queries), top_k), -1, dtype=np.int64)
+        # Each shard's list is already sorted, so merging only walks the first top_k entries of each
+        descending = self.metric == 'cosine'
+        for row in range(len(queries)):
+            merged = heapq.merge(
+                *(zip(shard_distances[row], shard_ids[row]) for shard_distances, shard_ids in per_shard),
+                key=lambda hit: hit[0], reverse=descending,
+            )
+            hits = itertools.islice((hit for hit in merged if hit[1] != -1), top_k)
+            for n, (distance, chunk_id) in enumerate(hits):
+                distances[row, n] = distance
+                ids[row, n] = chunk_id
+        return distances, ids
+
+    def get_chunks(self, ids) -> dict:
+        """
+        Fetches the metadata of chunks by global id.
+
+        Args:
+            ids: Global chunk ids; -1 entries are ignored.
+
+        Returns:
+            dict: Maps each found id to its IndexManager.get_chunks entry plus its 'shard' name.
+        """
+
+        by_shard = {}
+        for chunk_id in np.ravel(ids):
+            if chunk_id != -1:
+                by_shard.setdefault(int(chunk_id) >> SHARD_ID_BITS, []).append(int(chunk_id) & _LOCAL_ID_MASK)
+
+        found = {}
+        for number, local_ids in by_shard.items():
+            name = self._names.get(number)
+            shard = self._shards.get(name)
+            if shard is None:
+                continue
+            for local_id, chunk in shard.get_chunks(local_ids).items():
+                found[(number << SHARD_ID_BITS) | local_id] = {**chunk, "shard": name}
+        return found
+
+    def rebuild_shard(self, name: str, index_type: str = 'auto', **index_params) -> str:
+        """
+        Rebuilds one shard's index (see IndexManager.rebuild) and writes its checkpoint.
+
+        Only writes to that shard wait, including while the checkpoint is
+        written; every shard, including this one, keeps answering searches.
+
+        Args:
+            name (str): The shard name.
+            index_type (str, optional): 'auto' or one of REMOVABLE_INDEX_TYPES. Defaults to 'auto'.
+            **index_params: Further create_faiss_index arguments.
+
+        Returns:
+            str: The FAISS class of the new index, or '' if the shard is empty.
+
+        Raises:
+            KeyError: If there is no such shard.
+        """
+
+        shard = self._shards[name]
+        built = shard.rebuild(index_type, **index_params)
+        shard.checkpoint()
+        return built
+
+    def reload_shard(self, name: str):
+        """
+        Re-reads one shard's index from disk, e.g. after it was rebuilt by another process.
+
+        The shard keeps its connection, so its documents being staged carry
+        on and its pending changes are replayed onto the reloaded index (see
+        IndexManager.reload). Searches keep being served throughout.
+
+        Args:
+            name (str): The shard name.
+
+        Raises:
+            KeyError: If there is no such shard.
+        """
+
+        self._shards[name].reload()
+
+    def save(self):
+        for shard in list(self._shards.values()):
+            shard.save()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for shard in list(self._shards.values()):
+            shard.close()
+
+
+class ShardedStagedDocument:
+    """
+    A StagedDocument of one shard that takes and returns global chunk ids.
+
+    Attributes:
+        doc_id (str): The source document id.
+    """
+
+    def __init__(self, staged, shard_number: int):
+        self.doc_id = staged.doc_id
+        self._staged = staged
+        self._shard_bits = shard_number << SHARD_ID_BITS
+
+    def add_chunks(self, chunks: list[str], embeddings, spans: list = None) -> np.ndarray:
+        return self._staged.add_chunks(chunks, embeddings, spans) | self._shard_bits
+
+    def add_aliases(self, aliases: list):
+        self._staged.add_aliases([(int(chunk_id) & _LOCAL_ID_MASK, start, end) for chunk_id, start, end in aliases])
+
+    def commit(self) -> int:
+        return self._staged.commit()
+
+    def discard(self):
+        self._staged.discard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
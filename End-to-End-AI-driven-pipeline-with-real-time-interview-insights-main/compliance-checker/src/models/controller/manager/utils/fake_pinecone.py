@@ -0,0 +1,76 @@
+import json
+import random
+import threading
+import time
+
+import numpy as np
+
+from .vector_store_pinecone import MAX_REQUEST_BYTES, MAX_VECTORS_PER_REQUEST
+
+
+class FakePineconeIndex:
+    """
+    In-process stand-in for a Pinecone index, for tests and benchmarks without network access.
+
+    It enforces the request limits of the real service, can add per-request
+    latency and random transient failures, and records the peak number of
+    concurrent upserts.
+
+    Args:
+        latency (float, optional): Seconds each request takes. Defaults to 0.
+        failure_rate (float, optional): Probability that an upsert fails with ConnectionError. Defaults to 0.
+        seed (int, optional): Seed for the failure draws.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.vectors = {}
+        self.requests = 0
+        self.max_concurrency = 0
+        self._in_flight = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors: list, namespace: str = None):
+        if len(vectors) > MAX_VECTORS_PER_REQUEST:
+            raise ValueError(f"Upsert of {len(vectors)} vectors exceeds {MAX_VECTORS_PER_REQUEST} per request")
+        if len(json.dumps(vectors, default=float)) > MAX_REQUEST_BYTES:
+            raise ValueError("Upsert request exceeds the maximum request size")
+
+        with self._lock:
+            self.requests += 1
+            self._in_flight += 1
+            self.max_concurrency = max(self.max_concurrency, self._in_flight)
+            fail = self._random.random() < self.failure_rate
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise ConnectionError("Simulated transient Pinecone failure")
+            with self._lock:
+                for vector in vectors:
+                    self.vectors[vector["id"]] = vector
+            return {"upserted_count": len(vectors)}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def query(self, vector: list[float], top_k: int = 5, include_metadata: bool = False, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            stored = list(self.vectors.values())
+        if not stored:
+            return {"matches": []}
+        matrix = np.asarray([v["values"] for v in stored], dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32)
+        scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+        best = np.argsort(-scores)[:top_k]
+        return {"matches": [
+            {"id": stored[i]["id"], "score": float(scores[i]),
+             **({"metadata": stored[i].get("metadata", {})} if include_metadata else {})}
+            for i in best
+        ]}
+
+    def describe_index_stats(self):
+        with self._lock:
+            return {"total_vector_count": len(self.vectors)}
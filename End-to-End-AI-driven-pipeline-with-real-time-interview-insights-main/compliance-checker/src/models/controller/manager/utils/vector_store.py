@@ -5,33 +5,82 @@ class LocalVectorStore:
     """
     Stores and searches for vector embeddings in memory using FAISS.
 
+    Vectors are held once, in a contiguous float32 buffer that grows by
+    doubling. A store saved with `save` can be reopened memory-mapped, so the
+    corpus is paged in from disk on demand instead of being copied into RAM.
+
     Attributes:
-        index (faiss.IndexFlatL2): The FAISS index for efficient search.
-        embeddings (list): A list of stored embeddings.
+        embedding_dim (int): The dimension (length) of each embedding vector.
     """
 
-    def __init__(self, embedding_dim: int):
+    def __init__(self, embedding_dim: int, capacity: int = 1024):
         """
         Initializes the vector store with the specified embedding dimension.
 
         Args:
             embedding_dim (int): The dimension (length) of each embedding vector.
+            capacity (int, optional): Vectors to preallocate room for. Defaults to 1024.
+        """
+
+        self.embedding_dim = embedding_dim
+        self._buffer = np.empty((capacity, embedding_dim), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """
+        np.ndarray: A read-only (len(self), embedding_dim) view of the stored vectors.
         """
 
-        self.index = faiss.IndexFlatL2(embedding_dim)
-        self.embeddings = []
+        view = self._buffer[:self._size]
+        view.flags.writeable = False
+        return view
 
     def add_embeddings(self, embeddings: list):
         """
-        Adds a list of embeddings to the store and updates the index.
+        Adds a list of embeddings to the store.
 
         Args:
-            embeddings (list): A list of embedding vectors.
+            embeddings (list): A list (or (n, d) array) of embedding vectors.
         """
 
-        vectors = np.array(embeddings).astype("float32")
-        self.index.add(vectors)
-        self.embeddings.extend(embeddings)  # Efficiently extend the list
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.embedding_dim)
+        needed = self._size + len(vectors)
+        if needed > len(self._buffer) or not self._buffer.flags.writeable:
+            # Grow by doubling; a memory-mapped store is copied into RAM on its first write
+            grown = np.empty((max(needed, 2 * len(self._buffer), 1), self.embedding_dim), dtype=np.float32)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        self._buffer[self._size:needed] = vectors
+        self._size = needed
+
+    def search_many(self, query_vectors: np.ndarray, top_k: int = 5):
+        """
+        Searches for the nearest neighbours of several queries at once.
+
+        Args:
+            query_vectors (np.ndarray): An (n, embedding_dim) array of queries.
+            top_k (int, optional): The number of nearest neighbors per query. Defaults to 5.
+
+        Returns:
+            tuple: (distances, indices) float32 and int64 arrays of shape (n, top_k),
+                with squared L2 distances; indices are -1 where fewer than top_k vectors exist.
+        """
+
+        queries = np.ascontiguousarray(query_vectors, dtype=np.float32).reshape(-1, self.embedding_dim)
+        distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+        indices = np.full((len(queries), top_k), -1, dtype=np.int64)
+        k = min(top_k, self._size)
+        if k == 0 or len(queries) == 0:
+            return distances, indices
+
+        found_distances, found_indices = faiss.knn(queries, np.ascontiguousarray(self._buffer[:self._size]), k)
+        distances[:, :k] = found_distances
+        indices[:, :k] = found_indices
+        return distances, indices
 
     def search(self, query_vector: list, top_k: int = 5) -> list:
         """
@@ -47,6 +96,35 @@ class LocalVectorStore:
                 - Indices: A list of indices of the nearest neighbors in the self.embeddings list.
         """
 
-        query = np.array([query_vector]).astype("float32")
-        distances, indices = self.index.search(query, top_k)
-        return [distances.tolist()[0], indices.tolist()[0]]  # Convert to single-element lists
\ No newline at end of file
+        distances, indices = self.search_many(np.asarray([query_vector]), top_k)
+        return [distances.tolist()[0], indices.tolist()[0]]  # Convert to single-element lists
+
+    def save(self, path: str):
+        """
+        Writes the stored vectors to a .npy file that `open` can memory-map.
+
+        Args:
+            path (str): The destination file.
+        """
+
+        with open(path, "wb") as file:
+            np.save(file, self._buffer[:self._size])
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True) -> "LocalVectorStore":
+        """
+        Opens a store written by `save`.
+
+        Args:
+            path (str): The .npy file.
+            mmap (bool, optional): Map the file read-only instead of loading it. Defaults to True.
+
+        Returns:
+            LocalVectorStore: The reopened store.
+        """
+
+        vectors = np.load(path, mmap_mode="r" if mmap else None)
+        store = cls(vectors.shape[1], capacity=0)
+        store._buffer = vectors
+        store._size = len(vectors)
+        return store
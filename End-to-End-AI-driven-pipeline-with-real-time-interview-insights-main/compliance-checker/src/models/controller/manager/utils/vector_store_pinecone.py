@@ -1,16 +1,38 @@
-import pinecone
+import json
+import logging
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
 
+# Pinecone request limits: vectors per upsert and request payload size.
+MAX_VECTORS_PER_REQUEST = 1000
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+
+# Bytes reserved for the request body around the vector list (brackets, keys, namespace).
+REQUEST_ENVELOPE_BYTES = 1024
+
 class PineconeVectorStore:
     """
     A class to interact with a Pinecone vector store.
 
     Args:
         index_name (str): The name of the Pinecone index.
+        index (optional): An object implementing the Pinecone index API
+            (`upsert`, `query`) to use instead of connecting, e.g. a
+            FakePineconeIndex for offline tests and benchmarks.
     """
 
-    def __init__(self, index_name: str):
+    def __init__(self, index_name: str, index=None):
+        self.index_name = index_name
+        if index is not None:
+            self.index = index
+            return
+
+        import pinecone
+
         # Load environment variables
         load_dotenv()
         pinecone_api_key = os.getenv("PINECONE_API_KEY")
@@ -26,17 +48,88 @@ class PineconeVectorStore:
             pinecone.create_index(index_name, dimension=384, metric="cosine")  # Adjust metric as needed
         self.index = pinecone.Index(index_name)
 
-    def add_embeddings(self, ids: list[str], embeddings: list[list[float]]):
+    @staticmethod
+    def _batches(vectors: list, batch_size: int, max_bytes: int):
+        # Greedily packs vectors into requests bounded by count and serialized JSON size
+        # (each vector plus its ", " separator, within max_bytes less the request envelope).
+        budget = max_bytes - REQUEST_ENVELOPE_BYTES
+        batch, batch_bytes = [], 0
+        for vector in vectors:
+            size = len(json.dumps(vector)) + 2
+            if batch and (len(batch) >= batch_size or batch_bytes + size > budget):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(vector)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        # Connection failures, timeouts, throttling (429) and server errors (5xx) are worth
+        # retrying; anything else, e.g. a rejected request, fails the same way again.
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        status = getattr(error, "status", None)
+        return isinstance(status, int) and (status == 429 or status >= 500)
+
+    def _upsert_with_retry(self, batch: list, max_retries: int, backoff: float) -> int:
+        for attempt in range(max_retries + 1):
+            try:
+                self.index.upsert(vectors=batch)
+                return attempt
+            except Exception as e:
+                if attempt == max_retries or not self._is_transient(e):
+                    raise
+                delay = backoff * 2 ** attempt * (1 + random.random())
+                logging.warning(f"Pinecone upsert failed ({str(e)}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    def add_embeddings(self, ids: list[str], embeddings: list[list[float]], metadata: list[dict] = None,
+                       batch_size: int = 100, max_workers: int = 4, max_retries: int = 3,
+                       backoff: float = 0.5) -> dict:
         """
         Adds embeddings to the Pinecone index.
 
+        Vectors are split into requests of at most `batch_size` vectors and
+        MAX_REQUEST_BYTES of serialized JSON, sent through a bounded thread
+        pool, and each request is retried with exponential backoff when it
+        fails with a transient error (connection error, timeout, 429 or 5xx).
+
         Args:
             ids (list[str]): A list of IDs for the embeddings.
             embeddings (list[list[float]]): A list of embedding vectors.
+            metadata (list[dict], optional): Metadata per vector.
+            batch_size (int, optional): Maximum vectors per request. Defaults to 100.
+            max_workers (int, optional): Concurrent requests. Defaults to 4.
+            max_retries (int, optional): Retries per request. Defaults to 3.
+            backoff (float, optional): Base retry delay in seconds. Defaults to 0.5.
+
+        Returns:
+            dict: 'vectors', 'batches', 'retries', 'seconds' and 'vectors_per_sec'.
         """
 
-        vectors = [{"id": id_, "vector": embedding} for id_, embedding in zip(ids, embeddings)]
-        self.index.upsert(vectors=vectors)
+        start = time.perf_counter()
+        batch_size = min(batch_size, MAX_VECTORS_PER_REQUEST)
+        vectors = []
+        for n, (id_, embedding) in enumerate(zip(ids, embeddings)):
+            vector = {"id": str(id_), "values": [float(x) for x in embedding]}
+            if metadata is not None:
+                vector["metadata"] = metadata[n]
+            vectors.append(vector)
+
+        batches = list(self._batches(vectors, batch_size, MAX_REQUEST_BYTES))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            retries = sum(pool.map(lambda batch: self._upsert_with_retry(batch, max_retries, backoff), batches))
+
+        elapsed = time.perf_counter() - start
+        return {
+            "vectors": len(vectors),
+            "batches": len(batches),
+            "retries": retries,
+            "seconds": elapsed,
+            "vectors_per_sec": len(vectors) / elapsed if elapsed else 0.0,
+        }
 
     def search(self, query_vector: list[float], top_k: int = 5) -> list:
         """
@@ -51,4 +144,5 @@ class PineconeVectorStore:
         """
 
         query_results = self.index.query(vector=query_vector, top_k=top_k)
-        return query_results["matches"]
\ No newline at end of file
+        return query_results["matches"]
+
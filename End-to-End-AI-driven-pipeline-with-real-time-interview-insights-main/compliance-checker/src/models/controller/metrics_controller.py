@@ -0,0 +1,17 @@
+from flask import Blueprint, Response, jsonify
+
+from .manager.metrics_manager import METRICS_ENABLED, registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled (MED_CHAT_METRICS=off)"}), 404
+    return Response(registry.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@metrics_bp.route('/metrics/runs', methods=['GET'])
+def recent_runs():
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled (MED_CHAT_METRICS=off)"}), 404
+    return jsonify({"runs": list(registry.runs)}), 200
@@ -0,0 +1,219 @@
+import logging
+import os
+import threading
+
+# Default sentence embedding model shared by every controller.
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# Directory holding pre-downloaded models, e.g. <MODEL_DIR>/all-MiniLM-L6-v2.
+MODEL_DIR = os.getenv("MED_CHAT_MODEL_DIR")
+
+# Never reach out to the Hugging Face Hub when set to "1".
+OFFLINE = os.getenv("MED_CHAT_OFFLINE") == "1"
+
+# Inference backend for every embedding path:
+#   'torch'       full-precision PyTorch (default)
+#   'torch-int8'  PyTorch with int8 dynamic quantization of the Linear layers
+#   'onnx'        ONNX Runtime, exported from the local model on first load
+#   'onnx-int8'   ONNX Runtime with an int8 dynamically quantized export
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+BACKEND = os.getenv("MED_CHAT_EMBEDDING_BACKEND", "torch")
+
+# Threads used inside one operator and across independent operators; 0 keeps the library default.
+INTRA_OP_THREADS = int(os.getenv("MED_CHAT_INTRA_OP_THREADS", "0"))
+INTER_OP_THREADS = int(os.getenv("MED_CHAT_INTER_OP_THREADS", "0"))
+
+# Instruction set targeted by the 'onnx-int8' export: 'avx2', 'avx512', 'avx512_vnni' or 'arm64'.
+ONNX_QUANT_CONFIG = os.getenv("MED_CHAT_ONNX_QUANT_CONFIG", "avx2")
+
+_models = {}
+_lock = threading.Lock()
+_threads_configured = False
+
+
+def _canonical_name(name):
+    # 'sentence-transformers/all-MiniLM-L6-v2' and 'all-MiniLM-L6-v2' are the same weights.
+    return name.split("/")[-1]
+
+
+def resolve_model_path(name):
+    """
+    Resolves a model name to a local directory when one is available.
+
+    Args:
+        name (str): The model name.
+
+    Returns:
+        str: The local model directory if MED_CHAT_MODEL_DIR contains it, else the name.
+
+    Raises:
+        FileNotFoundError: If offline mode is on and no local copy exists.
+    """
+
+    if MODEL_DIR:
+        local_path = os.path.join(MODEL_DIR, _canonical_name(name))
+        if os.path.isdir(local_path):
+            return local_path
+    if OFFLINE:
+        raise FileNotFoundError(f"Offline mode: model '{name}' not found in MED_CHAT_MODEL_DIR={MODEL_DIR!r}")
+    return name
+
+
+def model_id(name=DEFAULT_MODEL, backend=None):
+    """
+    Identifies the vectors a model produces, e.g. for cache keys and index manifests.
+
+    Quantized backends produce slightly different vectors, so they get their
+    own id; the full-precision backend keeps the plain model name.
+
+    Args:
+        name (str, optional): The model name. Defaults to 'all-MiniLM-L6-v2'.
+        backend (str, optional): The backend. Defaults to MED_CHAT_EMBEDDING_BACKEND.
+
+    Returns:
+        str: The model id.
+    """
+
+    backend = backend or BACKEND
+    return _canonical_name(name) if backend == "torch" else f"{_canonical_name(name)}@{backend}"
+
+
+def _configure_threads():
+    global _threads_configured
+    if _threads_configured:
+        return
+    _threads_configured = True
+    import torch
+
+    if INTRA_OP_THREADS:
+        torch.set_num_threads(INTRA_OP_THREADS)
+    if INTER_OP_THREADS:
+        try:
+            torch.set_num_interop_threads(INTER_OP_THREADS)
+        except RuntimeError as e:  # Only allowed before the first parallel operation
+            logging.warning(f"Could not set inter-op threads: {str(e)}")
+
+
+def _onnx_model_kwargs():
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if INTRA_OP_THREADS:
+        options.intra_op_num_threads = INTRA_OP_THREADS
+    if INTER_OP_THREADS:
+        options.inter_op_num_threads = INTER_OP_THREADS
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+    return {"provider": "CPUExecutionProvider", "session_options": options}
+
+
+def _load(name, backend):
+    from sentence_transformers import SentenceTransformer
+
+    path = resolve_model_path(name)
+    logging.info(f"Loading embedding model '{_canonical_name(name)}' ({backend}) from {path}")
+    if backend == "torch":
+        return SentenceTransformer(path)
+
+    if backend == "torch-int8":
+        import torch
+
+        model = SentenceTransformer(path, device="cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+    model_kwargs = _onnx_model_kwargs()
+    if backend == "onnx-int8":
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Backend 'onnx-int8' needs a local copy of '{name}' in MED_CHAT_MODEL_DIR")
+        file_name = f"onnx/model_qint8_{ONNX_QUANT_CONFIG}.onnx"
+        if not os.path.exists(os.path.join(path, file_name)):
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            logging.info(f"Exporting int8 ONNX model to {os.path.join(path, file_name)}")
+            export_dynamic_quantized_onnx_model(
+                SentenceTransformer(path, backend="onnx", device="cpu", model_kwargs=model_kwargs),
+                ONNX_QUANT_CONFIG,
+                path,
+            )
+        model_kwargs["file_name"] = file_name
+    return SentenceTransformer(path, backend="onnx", device="cpu", model_kwargs=model_kwargs)
+
+
+def get_sentence_transformer(name=DEFAULT_MODEL, backend=None):
+    """
+    Returns the shared SentenceTransformer for a model, loading it on first use.
+
+    Args:
+        name (str, optional): The model name. Defaults to 'all-MiniLM-L6-v2'.
+        backend (str, optional): One of BACKENDS. Defaults to MED_CHAT_EMBEDDING_BACKEND.
+
+    Returns:
+        SentenceTransformer: The loaded model.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+
+    backend = backend or BACKEND
+    key = (_canonical_name(name), backend)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+    with _lock:
+        if key not in _models:
+            if OFFLINE:
+                os.environ.setdefault("HF_HUB_OFFLINE", "1")
+                os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+            _configure_threads()
+            _models[key] = _load(name, backend)
+        return _models[key]
+
+
+def get_transformer(name=DEFAULT_MODEL, backend=None):
+    """
+    Returns the tokenizer and underlying transformers model of a shared model.
+
+    Both come from the SentenceTransformer instance, so raw `transformers`
+    callers share its weights (and backend) instead of loading another copy.
+
+    Args:
+        name (str, optional): The model name. Defaults to 'all-MiniLM-L6-v2'.
+        backend (str, optional): One of BACKENDS. Defaults to MED_CHAT_EMBEDDING_BACKEND.
+
+    Returns:
+        tuple: (tokenizer, model); with an ONNX backend the model is an
+        ONNX Runtime model with the same call signature.
+    """
+
+    sentence_model = get_sentence_transformer(name, backend)
+    return sentence_model.tokenizer, sentence_model[0].auto_model
+
+
+def warm_up(names=(DEFAULT_MODEL,), background=True):
+    """
+    Loads models ahead of their first use.
+
+    Args:
+        names (tuple, optional): Model names to load. Defaults to the shared embedding model.
+        background (bool, optional): Load in a daemon thread instead of blocking. Defaults to True.
+
+    Returns:
+        threading.Thread | None: The loader thread when running in the background.
+    """
+
+    def load():
+        for name in names:
+            try:
+                get_sentence_transformer(name)
+            except Exception as e:
+                logging.error(f"Model warm-up failed for '{name}': {str(e)}")
+
+    if not background:
+        load()
+        return None
+    thread = threading.Thread(target=load, name="model-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -1,11 +1,14 @@
-from sentence_transformers import SentenceTransformer
 import logging
+import threading
+from .model_registry import get_sentence_transformer
+from .manager.utils.vector_store_pinecone import PineconeVectorStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# Load a pre-trained model
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# One connection per index name, shared by every upsert
+_stores = {}
+_stores_lock = threading.Lock()
 
 def generate_embeddings(chunks):
     """
@@ -19,8 +22,67 @@ def generate_embeddings(chunks):
     """
 
     try:
+        model = get_sentence_transformer()
         embeddings = model.encode(chunks, show_progress_bar=True)
         return embeddings
     except Exception as e:
         logging.error(f"Embedding generation failed: {str(e)}")
-        return {"error": f"Embedding generation failed: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Embedding generation failed: {str(e)}"}
+
+def get_vector_store(index_name, index=None):
+    """
+    Returns the shared PineconeVectorStore for an index, connecting on first use.
+
+    Args:
+        index_name (str): The name of the Pinecone index.
+        index (optional): An index implementation to register instead of connecting,
+            e.g. a FakePineconeIndex.
+
+    Returns:
+        PineconeVectorStore: The store for the index.
+    """
+
+    with _stores_lock:
+        if index is not None or index_name not in _stores:
+            _stores[index_name] = PineconeVectorStore(index_name, index=index)
+        return _stores[index_name]
+
+def upsert_to_pinecone(index_name, embeddings, ids, doc_id=None, chunks=None, aliases=None, **upsert_options):
+    """
+    Upserts embeddings to Pinecone in concurrent, size-bounded batches.
+
+    Args:
+        index_name (str): The name of the Pinecone index.
+        embeddings: A list of embedding vectors.
+        ids: Chunk ids within the document (e.g. range(len(chunks))).
+        doc_id (str, optional): The document id; when given, vector ids become
+            "<doc_id>:<chunk id>" so chunks of different documents never collide.
+        chunks (list, optional): Chunk texts, stored as metadata alongside doc_id.
+        aliases (list, optional): Per chunk, the (start, end) offsets of near-duplicate
+            occurrences that were not embedded, stored as "start-end" strings.
+        **upsert_options: Passed to PineconeVectorStore.add_embeddings
+            (batch_size, max_workers, max_retries, backoff).
+
+    Returns:
+        dict: Upsert throughput metrics.
+    """
+
+    ids = list(ids)
+    vector_ids = [f"{doc_id}:{i}" for i in ids] if doc_id is not None else [str(i) for i in ids]
+    metadata = None
+    if doc_id is not None or chunks is not None:
+        metadata = [
+            {"doc_id": doc_id, "chunk": int(i), **({"text": chunks[n]} if chunks is not None else {})}
+            for n, i in enumerate(ids)
+        ]
+        if aliases is not None:
+            for entry, spans in zip(metadata, aliases):
+                if spans:
+                    entry["aliases"] = [f"{start}-{end}" for start, end in spans]
+
+    stats = get_vector_store(index_name).add_embeddings(vector_ids, embeddings, metadata=metadata, **upsert_options)
+    logging.info(
+        f"Upserted {stats['vectors']} vectors to '{index_name}' in {stats['batches']} batches "
+        f"({stats['vectors_per_sec']:.0f} vectors/s, {stats['retries']} retries)"
+    )
+    return stats
@@ -0,0 +1,225 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from flask import Blueprint, jsonify, request
+
+from .embedding_controller import generate_embeddings
+from .manager.metrics_manager import METRICS_ENABLED, registry as metrics_registry
+from .manager.shard_manager import ShardedIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Queries per batched encode/search, and how long the first query waits for company
+SEARCH_BATCH_SIZE = int(os.getenv("MED_CHAT_SEARCH_BATCH_SIZE", "32"))
+SEARCH_WINDOW_MS = float(os.getenv("MED_CHAT_SEARCH_WINDOW_MS", "5"))
+MAX_TOP_K = 50
+
+search_bp = Blueprint('search', __name__)
+
+# Set up by configure_search()
+search_service = None
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batches handled by a single background thread.
+
+    The first request of a batch waits at most `max_wait_ms` for others to
+    arrive; the batch is handed to `handle_batch` as soon as it is full or the
+    window closes, and each caller receives its own result. If a batch fails,
+    its items are retried one by one, so a failing item only fails its own
+    caller.
+
+    Args:
+        handle_batch (callable): Maps a list of items to a list of results in the same order.
+        max_batch_size (int, optional): Maximum items per batch. Defaults to 32.
+        max_wait_ms (float, optional): Batching window in milliseconds. Defaults to 5.
+    """
+
+    def __init__(self, handle_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.handle_batch = handle_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="search-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item, timeout=None):
+        """
+        Queues an item and blocks until its batch has been processed.
+
+        Args:
+            item: The request item.
+            timeout (float, optional): Seconds to wait for the result.
+
+        Returns:
+            The result for this item.
+        """
+
+        future = Future()
+        self._requests.put((item, future))
+        return future.result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # Once the window has closed, only take what is already waiting
+                item = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.handle_batch(items)
+            except Exception as e:
+                if len(batch) > 1:
+                    logging.warning(f"Search batch of {len(batch)} failed, retrying its items one by one: {str(e)}")
+                self._run_each(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_each(self, batch):
+        for item, future in batch:
+            try:
+                future.set_result(self.handle_batch([item])[0])
+            except Exception as e:
+                logging.error(f"Search request failed: {str(e)}")
+                future.set_exception(e)
+
+
+class SearchService:
+    """
+    Semantic search over the ingested chunks, answering concurrent queries in batches.
+
+    Each batch costs one embedding call for all its queries and one FAISS
+    search with the largest requested top_k per distinct set of collections
+    (only a ShardedIndex can restrict a search to collections).
+
+    Args:
+        index_manager (IndexManager | ShardedIndex): The chunk index and its metadata.
+        max_batch_size (int, optional): Maximum queries per batch.
+        max_wait_ms (float, optional): Batching window in milliseconds.
+    """
+
+    def __init__(self, index_manager, max_batch_size=SEARCH_BATCH_SIZE, max_wait_ms=SEARCH_WINDOW_MS):
+        self.index_manager = index_manager
+        self.batcher = MicroBatcher(self._search_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def _search_batch(self, items):
+        start = time.perf_counter()
+        queries = [query for query, _, _ in items]
+        embeddings = generate_embeddings(queries, show_progress_bar=False, use_cache=False)
+        if isinstance(embeddings, dict):
+            raise RuntimeError(embeddings["error"])
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        groups = {}
+        for n, (_, _, collections) in enumerate(items):
+            groups.setdefault(collections, []).append(n)
+        hits = [None] * len(items)
+        for collections, rows in groups.items():
+            top_k = max(items[n][1] for n in rows)
+            kwargs = {} if collections is None else {"collections": list(collections)}
+            distances, ids = self.index_manager.search(embeddings[rows], top_k, **kwargs)
+            for n, row_distances, row_ids in zip(rows, distances, ids):
+                hits[n] = (row_distances, row_ids)
+        chunks = self.index_manager.get_chunks(np.concatenate([row_ids for _, row_ids in hits]))
+
+        results = []
+        for (_, k, _), (row_distances, row_ids) in zip(items, hits):
+            results.append([
+                {"id": int(i), "distance": float(d), **chunks[int(i)]}
+                for d, i in zip(row_distances[:k], row_ids[:k])
+                if i != -1 and int(i) in chunks
+            ])
+        if METRICS_ENABLED:
+            metrics_registry.observe_stage("search", time.perf_counter() - start, len(items), 1)
+        return results
+
+    def search(self, query, top_k=5, collections=None):
+        """
+        Searches the index for the chunks closest to a query.
+
+        Args:
+            query (str): The query text.
+            top_k (int, optional): The number of chunks to return. Defaults to 5.
+            collections (list, optional): Shards to search when the index is a ShardedIndex.
+
+        Returns:
+            list: Matches with id, distance, doc_id, offsets and text, best first.
+        """
+
+        return self.batcher.submit((query, top_k, None if collections is None else tuple(sorted(collections))))
+
+def configure_search(index_manager, max_batch_size=SEARCH_BATCH_SIZE, max_wait_ms=SEARCH_WINDOW_MS):
+    """
+    Starts the search service behind the /search endpoint.
+
+    Args:
+        index_manager (IndexManager | ShardedIndex): The chunk index to serve.
+        max_batch_size (int, optional): Maximum queries per batch.
+        max_wait_ms (float, optional): Batching window in milliseconds.
+
+    Returns:
+        SearchService: The configured service.
+    """
+
+    global search_service
+    search_service = SearchService(index_manager, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    return search_service
+
+@search_bp.route('/search', methods=['GET', 'POST'])
+def search():
+    if search_service is None:
+        return jsonify({"error": "Search is not configured"}), 503
+
+    # Every field is checked here: a bad value inside a batch would fail the whole batch
+    params = request.args
+    if request.method == 'POST':
+        params = request.get_json(silent=True)
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return jsonify({"error": "The JSON body must be an object"}), 400
+    query = params.get("query") or params.get("q")
+    if not query:
+        return jsonify({"error": "Missing 'query'"}), 400
+    if not isinstance(query, str):
+        return jsonify({"error": "'query' must be a string"}), 400
+    top_k = params.get("top_k", 5)
+    try:
+        if isinstance(top_k, bool):
+            raise TypeError
+        top_k = max(1, min(int(top_k), MAX_TOP_K))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'top_k' must be an integer"}), 400
+
+    # A comma-separated string in the query string, or a list in a JSON body
+    collections = params.get("collections")
+    if isinstance(collections, str):
+        collections = [name for name in collections.split(",") if name]
+    if collections is not None and (not isinstance(collections, list)
+                                    or not all(isinstance(name, str) for name in collections)):
+        return jsonify({"error": "'collections' must be a list of strings"}), 400
+    if collections is not None and not isinstance(search_service.index_manager, ShardedIndex):
+        return jsonify({"error": "'collections' needs a sharded index"}), 400
+
+    try:
+        results = search_service.search(query, top_k, collections)
+    except Exception as e:
+        return jsonify({"error": f"Search failed: {str(e)}"}), 500
+    return jsonify({"query": query, "results": results}), 200
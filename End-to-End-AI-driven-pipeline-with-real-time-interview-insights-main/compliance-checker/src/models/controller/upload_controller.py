@@ -1,21 +1,86 @@
 
 from flask import Flask, request, jsonify, current_app
+import hashlib
 import os
+import uuid
 from werkzeug.utils import secure_filename
+from .job_queue import JobQueue, QueueFullError
+from .manager.shard_manager import check_collection
+from .metrics_controller import metrics_bp
+from .search_controller import search_bp
 
+# Served by `python main.py serve`, which also starts ingestion and search
 app = Flask(__name__)
+app.register_blueprint(search_bp)
+app.register_blueprint(metrics_bp)
 
 # Configure upload directory (outside of app root for security)
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+# Reject request bodies larger than this (Flask answers 413)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("MED_CHAT_MAX_UPLOAD_MB", "50")) * 1024 * 1024
+
+# Bytes copied per read while streaming an upload to disk
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf'}
 
+# Background ingestion; set up by configure_ingestion()
+job_queue = None
+
+# Whether uploads may name a collection (shard) of the index
+collections_enabled = False
+
+def configure_ingestion(process_fn, num_workers=2, max_pending=16, collections=False):
+    """
+    Starts the background workers that ingest uploaded files.
+
+    Args:
+        process_fn (callable): Called with the saved file path and the upload's collection
+            (None if it named none), e.g. a wrapper of process_pdf_pipeline.
+        num_workers (int, optional): Concurrent ingestion jobs. Defaults to 2.
+        max_pending (int, optional): Jobs allowed to wait before uploads get a 429. Defaults to 16.
+        collections (bool, optional): Whether the index is sharded, so uploads may send a
+            'collection' form field. Defaults to False.
+    """
+
+    global job_queue, collections_enabled
+    job_queue = JobQueue(process_fn, num_workers=num_workers, max_pending=max_pending)
+    collections_enabled = collections
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_upload(file, folder):
+    """
+    Streams an uploaded file to disk in blocks while hashing it.
+
+    Args:
+        file: The werkzeug FileStorage.
+        folder (str): The destination directory.
+
+    Returns:
+        tuple: (path, sha256 hex digest) of the saved file, named after its hash.
+    """
+
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(folder, f".{uuid.uuid4().hex}.part")
+    try:
+        with open(tmp_path, 'wb') as out:
+            for block in iter(lambda: file.stream.read(UPLOAD_BLOCK_SIZE), b''):
+                digest.update(block)
+                out.write(block)
+        filename = f"{digest.hexdigest()[:16]}_{secure_filename(file.filename)}"  # Sanitize filename
+        filepath = os.path.join(folder, filename)
+        os.replace(tmp_path, filepath)
+        return filepath, digest.hexdigest()
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 @app.route('/upload', methods=['POST'])
 def upload_pdf():
     if 'file' not in request.files:
@@ -26,13 +91,45 @@ def upload_pdf():
     if file.filename == '':
         return jsonify({"error": "No file selected"}), 400
 
+    collection = request.form.get('collection') or None
+    if collection is not None:
+        if not collections_enabled:
+            return jsonify({"error": "Collections need a sharded index"}), 400
+        try:
+            check_collection(collection)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)  # Sanitize filename
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        return jsonify({"message": "File uploaded successfully", "file_path": filepath}), 200
+        filepath, content_hash = save_upload(file, UPLOAD_FOLDER)
+        if job_queue is None:
+            return jsonify({"message": "File uploaded successfully", "file_path": filepath}), 200
+
+        try:
+            # The same file can be ingested once per collection
+            job, created = job_queue.submit(f"{content_hash}:{collection or ''}", filepath, collection)
+        except QueueFullError as e:
+            if not job_queue.references(filepath):
+                os.remove(filepath)  # Nothing will ingest this copy
+            return jsonify({"error": str(e)}), 429
+
+        body = {"file_path": job.args[0], "job_id": job.id, "status_url": f"/jobs/{job.id}", "collection": collection}
+        if created:
+            return jsonify({"message": "File uploaded, ingestion queued", **body}), 202
+        if filepath != job.args[0]:
+            os.remove(filepath)  # Same content under another name; keep the first copy
+        return jsonify({"message": "File already uploaded", **body, "status": job.status}), 200
     else:
         return jsonify({"error": "Only PDF files are allowed"}), 400
 
-if __name__ == "__main__":
-    app.run(debug=True)
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id) if job_queue is not None else None
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({"error": f"File exceeds the {limit_mb} MB upload limit"}), 413
@@ -2,29 +2,216 @@
 import faiss
 import numpy as np
 
-def create_faiss_index(embeddings, metric='L2'):
+# Index types accepted by create_faiss_index; 'auto' picks one from the corpus size.
+INDEX_TYPES = ('flat', 'ivf', 'hnsw', 'ivfpq', 'auto')
+
+# Index types that support removing vectors by id; HNSW graphs do not.
+REMOVABLE_INDEX_TYPES = ('flat', 'ivf', 'ivfpq')
+
+# Below this many vectors a brute-force scan is both exact and fast enough.
+AUTO_FLAT_MAX_VECTORS = 10_000
+
+# HNSW graph degree; each vector costs about 2 * M neighbour ids on top of its data.
+HNSW_M = 32
+
+def _faiss_metric(metric):
+    if metric == 'L2':
+        return faiss.METRIC_L2
+    elif metric == 'cosine':
+        return faiss.METRIC_INNER_PRODUCT  # Inner product over normalized vectors
+    else:
+        raise ValueError("Invalid metric. Use 'L2' or 'cosine'.")
+
+def prepare_vectors(vectors, metric='L2'):
+    """
+    Converts vectors to the contiguous float32 layout FAISS expects.
+
+    For the 'cosine' metric the result is L2-normalized (on a copy), so inner
+    product equals cosine similarity. Apply it to both stored and query vectors.
+
+    Args:
+        vectors: An (n, d) array-like of vectors.
+        metric: The distance metric ('L2' or 'cosine').
+
+    Returns:
+        A (n, d) float32 NumPy array.
+    """
+
+    x = np.array(vectors, dtype='float32', copy=True, ndmin=2)
+    if metric == 'cosine':
+        faiss.normalize_L2(x)
+    return np.ascontiguousarray(x)
+
+def default_nlist(n_vectors):
+    # ~4 * sqrt(n) inverted lists, keeping at least 39 training points per list.
+    return int(max(1, min(4 * np.sqrt(n_vectors), n_vectors // 39)))
+
+def default_pq_m(dimension):
+    # Largest sub-quantizer count with >= 8 dimensions per sub-vector that divides d.
+    for m in range(max(1, dimension // 8), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+def estimate_index_bytes(index_type, n_vectors, dimension, pq_m=None):
+    """
+    Estimates the memory an index of a given type needs.
+
+    Args:
+        index_type: One of 'flat', 'ivf', 'hnsw' or 'ivfpq'.
+        n_vectors: The number of vectors.
+        dimension: The vector dimension.
+        pq_m: Sub-quantizers for 'ivfpq'. Defaults to default_pq_m(dimension).
+
+    Returns:
+        The approximate size in bytes.
+    """
+
+    vector_bytes = n_vectors * dimension * 4
+    if index_type == 'flat':
+        return vector_bytes
+    if index_type == 'ivf':
+        return vector_bytes + n_vectors * 8
+    if index_type == 'hnsw':
+        return vector_bytes + n_vectors * HNSW_M * 2 * 4
+    if index_type == 'ivfpq':
+        return n_vectors * ((pq_m or default_pq_m(dimension)) + 8)
+    raise ValueError(f"Invalid index type. Use one of {INDEX_TYPES[:-1]}.")
+
+def choose_index_type(n_vectors, dimension, memory_budget_mb=None, removable=False):
+    """
+    Picks an index type from the corpus size and a memory budget.
+
+    Small corpora stay exact ('flat'). Larger ones use 'hnsw' when its graph
+    fits the budget, then 'ivf', and fall back to compressed 'ivfpq'.
+
+    Args:
+        n_vectors: The number of vectors to index.
+        dimension: The vector dimension.
+        memory_budget_mb: Memory available for the index, or None for unlimited.
+        removable: Only pick types in REMOVABLE_INDEX_TYPES, for indexes whose vectors get replaced.
+
+    Returns:
+        The chosen index type.
+    """
+
+    budget = float('inf') if memory_budget_mb is None else memory_budget_mb * 2**20
+    if n_vectors < AUTO_FLAT_MAX_VECTORS and estimate_index_bytes('flat', n_vectors, dimension) <= budget:
+        return 'flat'
+    for index_type in ('ivf',) if removable else ('hnsw', 'ivf'):
+        if estimate_index_bytes(index_type, n_vectors, dimension) <= budget:
+            return index_type
+    return 'ivfpq'
+
+def create_empty_faiss_index(dimension, metric='L2', index_type='flat', nlist=100, pq_m=None):
+    """
+    Creates an empty FAISS index.
+
+    Args:
+        dimension: The length of the vectors the index will hold.
+        metric: The distance metric to use ('L2' or 'cosine').
+        index_type: One of 'flat', 'ivf', 'hnsw' or 'ivfpq'.
+        nlist: Inverted lists for the IVF types.
+        pq_m: Sub-quantizers for 'ivfpq'. Defaults to default_pq_m(dimension).
+
+    Returns:
+        A FAISS index object. IVF types must be trained before vectors are added.
+    """
+
+    faiss_metric = _faiss_metric(metric)
+    if index_type == 'flat':
+        return faiss.IndexFlat(dimension, faiss_metric)
+    if index_type == 'hnsw':
+        return faiss.IndexHNSWFlat(dimension, HNSW_M, faiss_metric)
+    if index_type in ('ivf', 'ivfpq'):
+        quantizer = faiss.IndexFlat(dimension, faiss_metric)
+        if index_type == 'ivf':
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dimension, nlist, pq_m or default_pq_m(dimension), 8, faiss_metric)
+        return index
+    raise ValueError(f"Invalid index type. Use one of {INDEX_TYPES}.")
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """
+    Tunes the speed/recall trade-off of an approximate index.
+
+    Args:
+        index: A FAISS index, possibly wrapped in an IndexIDMap.
+        nprobe: Inverted lists visited per query (IVF types).
+        ef_search: Candidate list size per query (HNSW).
+    """
+
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    if nprobe is not None:
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            ivf.nprobe = nprobe
+    if ef_search is not None and hasattr(index, 'hnsw'):
+        index.hnsw.efSearch = ef_search
+
+def create_faiss_index(embeddings, metric='L2', index_type='flat', memory_budget_mb=None,
+                       nlist=None, nprobe=None, ef_search=None, train_size=None, seed=0, ids=None,
+                       removable=False):
     """
     Creates a FAISS index for efficient nearest neighbor search.
 
     Args:
         embeddings: A list of embeddings.
         metric: The distance metric to use ('L2' or 'cosine').
+        index_type: 'flat' (exact), 'ivf', 'hnsw', 'ivfpq' or 'auto'.
+        memory_budget_mb: Memory budget used by 'auto', or None for unlimited.
+        nlist: Inverted lists for IVF types. Defaults to default_nlist(len(embeddings)).
+        nprobe: Inverted lists visited per query. Defaults to nlist // 16 (at least 1).
+        ef_search: HNSW candidate list size per query.
+        train_size: Vectors sampled to train IVF types. Defaults to 64 * nlist.
+        seed: Random seed for the training sample.
+        ids: Optional int64 ids for the vectors; the index is then wrapped in
+            an IndexIDMap2 and searches return these ids instead of positions.
+        removable: Make 'auto' pick a type whose vectors can be removed by id.
 
     Returns:
-        A FAISS index object.
+        A FAISS index object. For 'cosine', query vectors must be passed
+        through prepare_vectors as well.
     """
 
-    dimension = len(embeddings[0])
-    if metric == 'L2':
-        index = faiss.IndexFlatL2(dimension)
-    elif metric == 'cosine':
-        index = faiss.IndexFlatIP(dimension)  # Inner Product (cosine similarity)
+    vectors = prepare_vectors(embeddings, metric)
+    n_vectors, dimension = vectors.shape
+    if index_type == 'auto':
+        index_type = choose_index_type(n_vectors, dimension, memory_budget_mb, removable=removable)
+
+    nlist = nlist or default_nlist(n_vectors)
+    index = create_empty_faiss_index(dimension, metric=metric, index_type=index_type, nlist=nlist)
+    if not index.is_trained:
+        sample_size = min(n_vectors, train_size or 64 * nlist)
+        sample = np.random.default_rng(seed).choice(n_vectors, size=sample_size, replace=False)
+        index.train(vectors[np.sort(sample)])
+    if ids is None:
+        index.add(vectors)
     else:
-        raise ValueError("Invalid metric. Use 'L2' or 'cosine'.")
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
 
-    index.add(np.array(embeddings).astype('float32'))
+    set_search_params(index, nprobe=nprobe or max(1, nlist // 16), ef_search=ef_search)
     return index
 
+def search_faiss_index(index, query_vectors, top_k=5, metric='L2'):
+    """
+    Searches a FAISS index, applying the same vector preparation as at build time.
+
+    Args:
+        index: The FAISS index.
+        query_vectors: An (n, d) array-like of query embeddings.
+        top_k: The number of neighbours per query.
+        metric: The metric the index was built with ('L2' or 'cosine').
+
+    Returns:
+        (distances, ids) arrays of shape (n, top_k).
+    """
+
+    return index.search(prepare_vectors(query_vectors, metric), top_k)
+
 def save_faiss_index(index, path='data/vector_store/faiss.index'):
     """
     Saves a FAISS index to disk.
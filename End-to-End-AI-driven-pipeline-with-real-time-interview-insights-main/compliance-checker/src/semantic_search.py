@@ -0,0 +1,217 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+import faiss
+import numpy as np
+
+from models.controller.embedding_controller import generate_embeddings
+from models.controller.model_registry import model_id
+from models.controller.vector_controller import create_faiss_index, load_faiss_index, save_faiss_index
+
+# Cosine similarity a question must exceed to be used as the answer.
+DEFAULT_SIMILARITY_THRESHOLD = 0.5
+
+QUERY_CACHE_SIZE = 1024
+
+# Questions kept per document chunk when matching a whole document.
+DOCUMENT_TOP_K = 3
+
+# Persisted indexes live in this folder next to their dataset.
+CACHE_DIR_NAME = ".kb_cache"
+
+
+def normalize_query(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _encode_normalized_query(text):
+    embedding = generate_embeddings([text], normalize=True, show_progress_bar=False, use_cache=False)
+    if isinstance(embedding, dict):
+        raise RuntimeError(embedding["error"])
+    embedding = np.asarray(embedding, dtype="float32")
+    embedding.setflags(write=False)  # Shared by every caller hitting the cache
+    return embedding
+
+
+def encode_query(text):
+    """
+    Encodes a chat query, reusing the embedding of previously seen queries.
+
+    Args:
+        text (str): The raw user query.
+
+    Returns:
+        numpy.ndarray: A read-only (1, dim) float32 array of the normalized embedding.
+    """
+
+    return _encode_normalized_query(normalize_query(text))
+
+
+def _index_paths(dataset_path):
+    folder = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), CACHE_DIR_NAME)
+    stem = os.path.join(folder, os.path.basename(dataset_path))
+    return folder, stem + ".faiss", stem + ".rows.npy", stem + ".faiss.json"
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return []
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class SemanticQuestionIndex:
+    """
+    Answers chat messages by embedding similarity against the dataset questions.
+
+    Attributes:
+        index (faiss.Index): Inner-product index over normalized question embeddings.
+        rows (numpy.ndarray): Dataset row position of each vector in the index.
+        responses (numpy.ndarray): The dataset responses, in row order.
+        threshold (float): Minimum cosine similarity (exclusive) for a match.
+    """
+
+    def __init__(self, index, rows, responses, threshold=DEFAULT_SIMILARITY_THRESHOLD):
+        self.index = index
+        self.rows = rows
+        self.responses = responses
+        self.threshold = threshold
+        self._vectors = None
+
+    @classmethod
+    def load_or_build(cls, database, dataset_path, threshold=DEFAULT_SIMILARITY_THRESHOLD, version=None):
+        """
+        Loads the persisted index for a dataset, embedding the questions only if it is stale.
+
+        Args:
+            database (pandas.DataFrame): The loaded dataset with 'Question' and 'Response' columns.
+            dataset_path (str): The dataset file the index is stored next to.
+            threshold (float, optional): Minimum cosine similarity. Defaults to 0.5.
+            version (optional): JSON-serializable value that changes whenever the dataset does, e.g.
+                [store.store_id, store.version()] for a KnowledgeStore. Defaults to the dataset
+                file's modification time and size.
+
+        Returns:
+            SemanticQuestionIndex: The ready-to-query index.
+        """
+
+        folder, index_path, rows_path, meta_path = _index_paths(dataset_path)
+        version = _file_version(dataset_path) if version is None else version
+        responses = database["Response"].to_numpy()
+        questions = database["Question"]
+        rows = np.flatnonzero(questions.notna().to_numpy()).astype("int64")
+
+        if os.path.exists(meta_path) and os.path.exists(index_path) and os.path.exists(rows_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            # The rows check catches a version key reused for other data
+            if (meta.get("model") == model_id() and meta.get("version") == version
+                    and np.array_equal(np.load(rows_path), rows)):
+                return cls(load_faiss_index(index_path), rows, responses, threshold)
+
+        embeddings = generate_embeddings([str(q) for q in questions.iloc[rows]], normalize=True)
+        if isinstance(embeddings, dict):
+            raise RuntimeError(embeddings["error"])
+        index = create_faiss_index(embeddings, metric='cosine', index_type='auto')
+
+        os.makedirs(folder, exist_ok=True)
+        save_faiss_index(index, path=index_path)
+        np.save(rows_path, rows)
+        with open(meta_path, "w") as file:
+            json.dump({"model": model_id(), "version": version}, file)
+        return cls(index, rows, responses, threshold)
+
+    def search(self, query, top_k=5):
+        """
+        Finds the questions closest to a query.
+
+        Args:
+            query (str): The raw user query.
+            top_k (int, optional): The number of questions to return. Defaults to 5.
+
+        Returns:
+            list: (row position, cosine similarity) tuples, best first.
+        """
+
+        if self.index.ntotal == 0:
+            return []
+        scores, ids = self.index.search(encode_query(query), min(top_k, self.index.ntotal))
+        return [(int(self.rows[i]), float(s)) for i, s in zip(ids[0], scores[0]) if i != -1]
+
+    def question_vectors(self):
+        """
+        Returns the normalized question embeddings, in index order, read back from the index once.
+
+        Returns:
+            numpy.ndarray: A read-only (ntotal, dim) float32 array.
+        """
+
+        if self._vectors is None:
+            index = faiss.downcast_index(self.index)
+            ivf = faiss.try_extract_index_ivf(index)
+            if ivf is not None:
+                ivf.make_direct_map()
+            vectors = index.reconstruct_n(0, index.ntotal) if index.ntotal else np.empty((0, index.d), "float32")
+            vectors.setflags(write=False)
+            self._vectors = vectors
+        return self._vectors
+
+    def match_document(self, chunks, top_k=DOCUMENT_TOP_K):
+        """
+        Matches every chunk of a document against every question in one batched pass.
+
+        All chunks are embedded in a single call and scored against all
+        questions with one matrix product; each chunk keeps its `top_k` best
+        questions (found with argpartition) that clear the threshold, and each
+        question is reported once, with the chunk it fits best.
+
+        Args:
+            chunks (list[str]): The document chunks.
+            top_k (int, optional): Questions kept per chunk. Defaults to 3.
+
+        Returns:
+            list: (row position, cosine similarity, chunk number) tuples, best first.
+        """
+
+        questions = self.question_vectors()
+        if not chunks or not len(questions):
+            return []
+        embeddings = generate_embeddings(chunks, normalize=True, show_progress_bar=False, use_cache=False)
+        if isinstance(embeddings, dict):
+            raise RuntimeError(embeddings["error"])
+
+        similarity = np.asarray(embeddings, dtype="float32") @ questions.T
+        k = min(top_k, similarity.shape[1])
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(similarity, top, axis=1)
+
+        best = {}
+        for chunk_no, question in zip(*np.nonzero(scores > self.threshold)):
+            row, value = int(self.rows[top[chunk_no, question]]), float(scores[chunk_no, question])
+            if row not in best or value > best[row][0]:
+                best[row] = (value, int(chunk_no))
+        return sorted(((row, value, chunk_no) for row, (value, chunk_no) in best.items()), key=lambda hit: -hit[1])
+
+    def query_key(self, query):
+        """
+        Returns the form of a query that determines its match, for response caching.
+        """
+
+        return normalize_query(query)
+
+    def match(self, query):
+        """
+        Returns the response of the most similar question, or None below the threshold.
+
+        Args:
+            query (str): The raw user query.
+        """
+
+        hits = self.search(query, top_k=1)
+        if hits and hits[0][1] > self.threshold:
+            return self.responses[hits[0][0]]
+        return None
@@ -1,101 +1,199 @@
 import streamlit as st
 import pandas as pd
-import os
+import hashlib
+from collections import deque
 from PyPDF2 import PdfReader
 from docx import Document
-from fuzzywuzzy import process
+from chatbot_matcher import PrefilteredMatcher, ResponseCache
+from knowledge_store import KB_DB_PATH, KnowledgeStore
 
-DB_PATH = "indian_health_chatbot_dataset (1)4444.xlsx"
+# Answers remembered per dataset version and answer mode, shared by all sessions
+RESPONSE_CACHE_SIZE = 1024
+
+# Chat messages kept per session; older ones are dropped
+MAX_CHAT_MESSAGES = 200
+# Most recent messages always shown; earlier ones are paged in an expander
+VISIBLE_CHAT_MESSAGES = 20
+CHAT_PAGE_SIZE = 20
+
+@st.cache_resource(show_spinner="Importing knowledge base...")
+def get_knowledge_store():
+    # One connection shared by all sessions; a new store is seeded from the shipped datasets.
+    store = KnowledgeStore(KB_DB_PATH)
+    if not len(store):
+        store.import_shipped_datasets()
+    return store
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def read_database(version):
+    # Shared across sessions; `version` changes whenever the store does.
+    return get_knowledge_store().to_frame()
 
 def load_database():
-    if not os.path.exists(DB_PATH):
-        st.error("Database not found! Please upload a dataset in the 'Data Upload' section.")
-        return pd.DataFrame()
     try:
-        database = pd.read_excel(DB_PATH)
+        database = read_database(database_version())
         if database.empty:
-            st.warning("The dataset is empty. Please upload a valid dataset.")
-            return pd.DataFrame()
-        
-        required_columns = {"Question", "Response"}
-        if not required_columns.issubset(database.columns):
-            st.error("Dataset is missing required columns: 'Question' and 'Response'. Please upload a valid dataset.")
+            st.error("Database not found! Please upload a dataset in the 'Data Upload' section.")
             return pd.DataFrame()
-        
         return database
     except Exception as e:
         st.error(f"Error loading dataset: {e}")
         return pd.DataFrame()
 
+@st.cache_resource(show_spinner=False, max_entries=1)
+def get_question_matcher(db_version):
+    # Candidates come from the store's FTS index, so nothing is preprocessed up front.
+    return PrefilteredMatcher(get_knowledge_store())
+
+@st.cache_resource(show_spinner="Loading semantic index...", max_entries=1)
+def get_semantic_index(db_version, _database):
+    # Imported lazily so fuzzy mode never pays for loading the embedding model.
+    from semantic_search import SemanticQuestionIndex
+    # The persisted index outlives the store's version counter, which restarts with a new database
+    return SemanticQuestionIndex.load_or_build(_database, KB_DB_PATH,
+                                               version=[get_knowledge_store().store_id, db_version])
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_response_cache(db_version, answer_mode):
+    # A new dataset version gets a fresh cache; stale ones age out of max_entries.
+    return ResponseCache(RESPONSE_CACHE_SIZE)
+
+def database_version():
+    return get_knowledge_store().version()
+
+def file_digest(file):
+    return hashlib.sha256(file.getvalue()).hexdigest()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def read_pdf_pages(digest, _file):
+    # Keyed by content hash, so re-uploads and reruns skip parsing.
+    reader = PdfReader(_file)
+    return [text for text in (page.extract_text() for page in reader.pages) if text]
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def read_word_paragraphs(digest, _file):
+    return [para.text for para in Document(_file).paragraphs]
+
 def extract_pdf_text(file):
     try:
-        reader = PdfReader(file)
-        return '\n'.join([page.extract_text() for page in reader.pages if page.extract_text()])
+        return '\n'.join(read_pdf_pages(file_digest(file), file))
     except Exception as e:
         st.error(f"Error reading PDF: {e}")
         return ""
 
 def extract_word_text(file):
     try:
-        doc = Document(file)
-        return '\n'.join([para.text for para in doc.paragraphs])
+        return '\n'.join(read_word_paragraphs(file_digest(file), file))
     except Exception as e:
         st.error(f"Error reading Word document: {e}")
         return ""
 
-def upload_data():
+@st.cache_data(show_spinner="Matching the document against the knowledge base...", max_entries=32)
+def analyze_document(digest, db_version, _text, _database):
+    # One embedding call for all chunks and one similarity matrix against all questions.
+    from models.controller.chunk_controller import chunk_text
+    chunks = chunk_text(_text)
+    hits = get_semantic_index(db_version, _database).match_document(chunks)
+    return pd.DataFrame(
+        [
+            {"Question": _database["Question"].iat[row], "Response": _database["Response"].iat[row],
+             "Similarity": round(score, 3), "Passage": chunks[chunk_no]}
+            for row, score, chunk_no in hits
+        ],
+        columns=["Question", "Response", "Similarity", "Passage"],
+    )
+
+def show_document_analysis(uploaded_file, text, database):
+    if not text or database.empty:
+        return
+    digest = file_digest(uploaded_file)
+    if st.checkbox("Find relevant answers in the knowledge base", key=f"analyze_{digest}"):
+        try:
+            matches = analyze_document(digest, database_version(), text, database)
+        except Exception as e:
+            st.error(f"Error analyzing document: {e}")
+            return
+        if matches.empty:
+            st.info("No knowledge base entries matched this document.")
+        else:
+            st.dataframe(matches)
+
+def upload_data(database):
     uploaded_file = st.file_uploader("Please upload any previous prescription", type=["csv", "xlsx", "pdf", "docx"])
     if uploaded_file:
         try:
-            if uploaded_file.type == "text/csv":
-                data = pd.read_csv(uploaded_file)
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
-                data = pd.read_excel(uploaded_file)
+            if uploaded_file.type in ("text/csv", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"):
+                try:
+                    written = get_knowledge_store().import_file(uploaded_file, name=uploaded_file.name)
+                except ValueError:
+                    st.error("Uploaded dataset must contain 'Question' and 'Response' columns.")
+                    return None
             elif uploaded_file.type == "application/pdf":
                 text = extract_pdf_text(uploaded_file)
                 st.text_area("Extracted PDF Content", text, height=300)
+                show_document_analysis(uploaded_file, text, database)
                 return text
             elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
                 text = extract_word_text(uploaded_file)
                 st.text_area("Extracted Word Content", text, height=300)
+                show_document_analysis(uploaded_file, text, database)
                 return text
             else:
                 st.error("Unsupported file type!")
                 return None
             
-            required_columns = {"Question", "Response"}
-            if isinstance(data, pd.DataFrame) and not required_columns.issubset(data.columns):
-                st.error("Uploaded dataset must contain 'Question' and 'Response' columns.")
-                return None
-            
-            st.dataframe(data)
-            data.to_excel(DB_PATH, index=False)  # Save uploaded data
-            st.success("Dataset uploaded and saved successfully!")
-            return data
+            # Merged rows replace the answers of questions already in the store
+            read_database.clear()
+            get_response_cache.clear()
+            st.success(f"Dataset merged into the knowledge base: {written} rows added or updated.")
+            return written
         except Exception as e:
             st.error(f"Error processing file: {e}")
     return None
 
+def render_messages(messages):
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+def render_chat_history(history):
+    # Renders a bounded number of messages however long the session gets.
+    messages = list(history)
+    earlier, recent = messages[:-VISIBLE_CHAT_MESSAGES], messages[-VISIBLE_CHAT_MESSAGES:]
+    if earlier:
+        with st.expander(f"Earlier messages ({len(earlier)})"):
+            pages = (len(earlier) + CHAT_PAGE_SIZE - 1) // CHAT_PAGE_SIZE
+            page = st.number_input("Page", min_value=1, max_value=pages, value=pages, key="chat_history_page")
+            render_messages(earlier[(page - 1) * CHAT_PAGE_SIZE:page * CHAT_PAGE_SIZE])
+    render_messages(recent)
+
 def chatbot(database):
     st.sidebar.header("Chatbot Assistant")
+    answer_mode = st.sidebar.radio("Answer mode:", ["Fuzzy", "Semantic"], horizontal=True)
+    matcher = None
+    cache = None
+    if not database.empty:
+        db_version = database_version()
+        if answer_mode == "Semantic":
+            matcher = get_semantic_index(db_version, database)
+        cache = get_response_cache(db_version, answer_mode)
     chatbot_container = st.sidebar.container()
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+    history = st.session_state.get("chat_history")
+    if not isinstance(history, deque) or history.maxlen != MAX_CHAT_MESSAGES:
+        st.session_state.chat_history = deque(history or [], maxlen=MAX_CHAT_MESSAGES)
     
     with chatbot_container:
-        for message in st.session_state.chat_history:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        render_chat_history(st.session_state.chat_history)
         
         user_input = st.chat_input("Ask something...")
         if user_input:
             st.session_state.chat_history.append({"role": "user", "content": user_input})
-            response = get_chatbot_response(user_input, database)
+            response = get_chatbot_response(user_input, database, matcher, cache)
             st.session_state.chat_history.append({"role": "assistant", "content": response})
             st.chat_message("user").markdown(user_input)
             st.chat_message("assistant").markdown(response)
 
-def get_chatbot_response(user_input, database):
+def get_chatbot_response(user_input, database, matcher=None, cache=None):
     greetings = ["hi", "hello", "hey", "greetings", "good morning", "good evening", "namaste"]
     
     if user_input.lower() in greetings:
@@ -104,12 +202,14 @@ def get_chatbot_response(user_input, database):
     if database.empty or "Question" not in database or "Response" not in database:
         return "I'm here to help, but no valid dataset was found. Please upload a proper dataset."
     
-    questions = database["Question"].dropna().tolist()
-    if questions:
-        best_match, score = process.extractOne(user_input, questions)
-        if score > 60:  # Lowered threshold to improve matching
-            response = database.loc[database["Question"] == best_match, "Response"].values[0]
-            return response
+    if matcher is None:
+        matcher = get_question_matcher(database_version())
+    if cache is None:
+        response = matcher.match(user_input)
+    else:
+        response = cache.get_or_compute(matcher.query_key(user_input), lambda: matcher.match(user_input))
+    if response is not None:
+        return response
     
     return "I'm here to help, but I couldn't find relevant data. Can you provide more details?"
 
@@ -128,7 +228,7 @@ def main():
     
     elif options == "Data Upload":
         st.header("Please upload any previous prescription")
-        new_data = upload_data()
+        new_data = upload_data(database)
         if new_data is not None:
             st.session_state.new_data = new_data
     
@@ -0,0 +1,27 @@
+import re
+import zlib
+
+import numpy as np
+import pytest
+
+FAKE_DIMENSION = 64
+
+
+def bag_of_words(texts, normalize=False, **kwargs):
+    """
+    Deterministic stand-in for generate_embeddings: a hashed bag of words, so
+    texts sharing words get similar vectors.
+    """
+
+    vectors = np.zeros((len(texts), FAKE_DIMENSION), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", str(text).lower()):
+            vectors[row, zlib.crc32(word.encode()) % FAKE_DIMENSION] += 1.0
+    if normalize:
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors
+
+
+@pytest.fixture
+def fake_embeddings():
+    return bag_of_words
@@ -0,0 +1,67 @@
+from PyPDF2 import PdfWriter
+
+from benchmarks.synthetic import write_pdf
+from models.controller import bulk_ingestion_controller
+from models.controller.bulk_ingestion_controller import bulk_ingest
+from models.controller.manager.index_manager import IndexManager
+
+
+def write_blank_pdf(path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    with open(path, "wb") as file:
+        writer.write(file)
+
+
+def test_documents_are_indexed_once(tmp_path, monkeypatch, fake_embeddings):
+    monkeypatch.setattr(bulk_ingestion_controller, "generate_embeddings", fake_embeddings)
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    write_pdf(str(pdfs / "a.pdf"), pages=2, seed=1)
+    write_pdf(str(pdfs / "b.pdf"), pages=1, seed=2)
+    write_blank_pdf(str(pdfs / "blank.pdf"))
+
+    stats = bulk_ingest(str(pdfs), index_folder=str(tmp_path / "index"), workers=1)
+    assert (stats["documents"], stats["pages"], stats["skipped"], stats["failed"]) == (3, 4, 0, [])
+
+    stats = bulk_ingest(str(pdfs), index_folder=str(tmp_path / "index"), workers=1)
+    assert (stats["documents"], stats["skipped"]) == (0, 3)  # The blank PDF is not parsed again
+
+
+def test_an_embedding_error_fails_its_files_and_the_run_goes_on(tmp_path, monkeypatch, fake_embeddings):
+    def generate_embeddings(chunks, **kwargs):
+        if any("Page 1 of 2" in chunk for chunk in chunks):
+            return {"error": "model failed"}
+        return fake_embeddings(chunks)
+
+    monkeypatch.setattr(bulk_ingestion_controller, "generate_embeddings", generate_embeddings)
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    write_pdf(str(pdfs / "a.pdf"), pages=2, seed=1)
+    write_pdf(str(pdfs / "b.pdf"), pages=1, seed=2)
+
+    stats = bulk_ingest(str(pdfs), index_folder=str(tmp_path / "index"), workers=1, embed_batch_size=1)
+    assert [failure["file"] for failure in stats["failed"]] == [str(pdfs / "a.pdf")]
+    assert (stats["documents"], stats["pages"]) == (1, 1)
+
+    # The index was saved with the other document, and the failed one is retried
+    index = IndexManager(str(tmp_path / "index"))
+    assert len(index) > 0
+    index.close()
+    monkeypatch.setattr(bulk_ingestion_controller, "generate_embeddings", fake_embeddings)
+    stats = bulk_ingest(str(pdfs), index_folder=str(tmp_path / "index"), workers=1)
+    assert (stats["documents"], stats["skipped"], stats["failed"]) == (1, 1, [])
+
+
+def test_a_file_that_fails_to_parse_does_not_stop_the_run(tmp_path, monkeypatch, fake_embeddings):
+    monkeypatch.setattr(bulk_ingestion_controller, "generate_embeddings", fake_embeddings)
+    pdfs = tmp_path / "pdfs"
+    (pdfs / "nested").mkdir(parents=True)
+    write_pdf(str(pdfs / "nested" / "a.pdf"), pages=1)
+    (pdfs / "broken.pdf").write_bytes(b"not a pdf")
+    (pdfs / "notes.txt").write_text("ignored")
+
+    stats = bulk_ingest(str(pdfs), index_folder=str(tmp_path / "index"), workers=2)
+
+    assert [failure["file"] for failure in stats["failed"]] == [str(pdfs / "broken.pdf")]
+    assert (stats["documents"], stats["pages"]) == (1, 1)
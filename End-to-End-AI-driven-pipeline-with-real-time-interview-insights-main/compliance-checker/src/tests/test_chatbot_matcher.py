@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from rapidfuzz import process, utils
+
+from chatbot_matcher import QuestionMatcher, ResponseCache
+
+DATABASE = pd.DataFrame({
+    "Question": ["I have a fever, what should I do?", None, "How to reduce tension headaches?",
+                 "What are the symptoms of dengue?"],
+    "Response": ["Drink fluids and rest.", "No question", "Try relaxation techniques.", "High fever and rash."],
+})
+
+
+def original_lookup(user_input, database):
+    # The chatbot's lookup before QuestionMatcher (fuzzywuzzy, which preprocesses both sides)
+    questions = database["Question"].dropna().tolist()
+    best_match, score = process.extractOne(user_input, questions, processor=utils.default_process)[:2]
+    if score > 60:
+        return database.loc[database["Question"] == best_match, "Response"].values[0]
+    return None
+
+
+@pytest.mark.parametrize("query", ["fever what to do", "HOW TO REDUCE TENSION HEADACHES", "dengue symptoms",
+                                   "my knee hurts when running", "xyz"])
+def test_matches_like_the_original_lookup(query):
+    assert QuestionMatcher(DATABASE).match(query) == original_lookup(query, DATABASE)
+
+
+def test_rows_without_a_question_are_skipped_and_responses_stay_aligned():
+    matcher = QuestionMatcher(DATABASE)
+    assert len(matcher) == 3
+    assert matcher.match_many(["symptoms of dengue", "tension headaches"]) == [
+        "High fever and rash.", "Try relaxation techniques."]
+
+
+def test_a_score_at_the_threshold_is_not_a_match():
+    matcher = QuestionMatcher(DATABASE, threshold=100)
+    assert matcher.match("How to reduce tension headaches?") is None
+    assert QuestionMatcher(DATABASE.iloc[:0]).match("fever") is None
+
+
+def test_cached_answers_skip_the_matcher_and_include_misses():
+    cache = ResponseCache(max_entries=2)
+    matcher = QuestionMatcher(DATABASE)
+    calls = []
+
+    def answer(query):
+        return cache.get_or_compute(matcher.query_key(query), lambda: calls.append(query) or matcher.match(query))
+
+    assert answer("What are the symptoms of dengue?") == "High fever and rash."
+    assert answer("what are the symptoms of dengue") == "High fever and rash."
+    assert answer("zzzz") is None
+    assert answer("ZZZZ!") is None
+    assert calls == ["What are the symptoms of dengue?", "zzzz"]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_the_least_recently_used_answer_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 0)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert len(cache) == 2
+    assert cache.get_or_compute("a", lambda: 0) == 1
+    assert cache.get_or_compute("b", lambda: 0) == 0
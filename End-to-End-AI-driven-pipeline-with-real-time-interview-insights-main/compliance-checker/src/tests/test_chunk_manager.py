@@ -0,0 +1,39 @@
+import pytest
+from transformers import BertTokenizerFast
+
+from models.controller.manager.chunk_manager import TokenChunker
+
+WORDS = "take rest drink water for a fever see a doctor if pain lasts honey helps with cough".split()
+
+
+@pytest.fixture
+def tokenizer():
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", *dict.fromkeys(WORDS)]
+    return BertTokenizerFast(vocab={token: n for n, token in enumerate(vocab)})
+
+
+def test_chunks_hold_whole_sentences_within_the_budget(tokenizer):
+    text = "Take rest. Drink water for a fever. See a doctor if pain lasts. Honey helps with cough."
+    chunks = TokenChunker(tokenizer, max_tokens=12, overlap_tokens=0).chunk(text)
+
+    assert [chunk.text for chunk in chunks] == [
+        "Take rest. Drink water for a fever.", "See a doctor if pain lasts. Honey helps with cough.",
+    ]
+    for chunk in chunks:
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert chunk.n_tokens <= 12
+
+
+def test_long_sentences_are_split_and_chunks_overlap(tokenizer):
+    text = " ".join(WORDS * 3) + "."
+    chunks = TokenChunker(tokenizer, max_tokens=10, overlap_tokens=4).chunk(text)
+
+    assert len(chunks) > 1
+    assert all(chunk.n_tokens <= 10 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.start < previous.end  # The next chunk repeats the tail of the previous one
+    assert chunks[0].start == 0 and chunks[-1].end == len(text)
+
+
+def test_text_without_tokens_gives_no_chunks(tokenizer):
+    assert TokenChunker(tokenizer, max_tokens=10).chunk("  \n ") == []
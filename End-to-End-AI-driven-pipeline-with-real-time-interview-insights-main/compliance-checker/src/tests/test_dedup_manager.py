@@ -0,0 +1,46 @@
+import numpy as np
+
+from benchmarks.synthetic import DISCLAIMER
+from models.controller.manager.dedup_manager import ChunkDeduplicator, simhash, split_duplicates
+from models.controller.manager.index_manager import IndexManager
+
+BODY = [
+    "Take paracetamol twice a day after meals for five days.",
+    "Apply the ointment to the affected skin every evening before sleep.",
+    "Drink plenty of water and avoid cold drinks until the cough settles.",
+]
+
+
+def test_near_identical_texts_get_close_fingerprints():
+    edited = DISCLAIMER.replace("dosage", "dose")
+
+    assert bin(simhash(DISCLAIMER) ^ simhash(edited)).count("1") <= 6
+    assert bin(simhash(DISCLAIMER) ^ simhash(BODY[0])).count("1") > 6
+
+
+def test_repeats_map_to_their_first_occurrence_across_batches():
+    dedup = ChunkDeduplicator()
+    first = dedup.assign([DISCLAIMER, BODY[0]])
+    second = dedup.assign([BODY[1], DISCLAIMER.replace("dosage", "dose"), BODY[2], DISCLAIMER])
+
+    assert first + second == [0, 1, 2, 0, 4, 0]
+    assert dedup.stats(encode_seconds=4.0) == {
+        "chunks": 6, "duplicates": 2, "embedded": 4, "encode_seconds_saved": 2.0,
+    }
+
+    keep, aliases = split_duplicates(second, [(10, 20), (20, 30), (30, 40), (40, 50)], first_index=2)
+    assert keep == [0, 2]
+    assert aliases == [(0, 20, 30), (0, 40, 50)]
+
+
+def test_aliases_are_returned_with_their_chunk_and_removed_with_the_document(tmp_path):
+    index = IndexManager(str(tmp_path / "index"))
+    ids = index.add_document("a", [DISCLAIMER], np.ones((1, 4)), spans=[(0, len(DISCLAIMER))])
+    index.add_aliases("b", [(ids[0], 100, 100 + len(DISCLAIMER))])
+
+    aliases = index.get_chunks(ids)[int(ids[0])]["aliases"]
+    assert aliases == [{"doc_id": "b", "start": 100, "end": 100 + len(DISCLAIMER)}]
+
+    index.remove_document("b")
+    assert index.get_chunks(ids)[int(ids[0])]["aliases"] == []
+    index.close()
@@ -0,0 +1,34 @@
+import numpy as np
+
+from models.controller.manager.embedding_cache import EmbeddingCache
+
+
+def test_vectors_persist_across_reopens(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = EmbeddingCache(path)
+    key = EmbeddingCache.key("all-MiniLM-L6-v2", "fever")
+    cache.put_many([key], np.array([[1.0, 2.0, 3.0]]))
+    cache.close()
+
+    cache = EmbeddingCache(path)
+    found = cache.get_many([key, EmbeddingCache.key("all-MiniLM-L6-v2", "cough")])
+    assert list(found) == [key]
+    np.testing.assert_array_equal(found[key], np.array([1.0, 2.0, 3.0], dtype=np.float32))
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+    cache.close()
+
+
+def test_keys_depend_on_the_model():
+    assert EmbeddingCache.key("all-MiniLM-L6-v2", "fever") != EmbeddingCache.key("all-MiniLM-L6-v2@onnx", "fever")
+
+
+def test_the_least_recently_used_vectors_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.put_many(["a"], np.zeros((1, 4)))
+    cache.put_many(["b"], np.zeros((1, 4)))
+    cache.get_many(["a"])  # Now more recent than b
+    cache.put_many(["c"], np.zeros((1, 4)))
+
+    assert len(cache) == 2
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+    cache.close()
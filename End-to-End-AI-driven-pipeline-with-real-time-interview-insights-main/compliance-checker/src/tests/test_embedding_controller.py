@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from models.controller import embedding_controller, model_registry
+from models.controller.manager.embedding_cache import EmbeddingCache
+
+DIMENSION = 8
+
+
+class FakeModel:
+    """Deterministic stand-in for a SentenceTransformer."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, texts, show_progress_bar=False, normalize_embeddings=False):
+        self.encoded.extend(texts)
+        if not len(texts):
+            return []
+        return np.stack([np.random.default_rng(sum(map(ord, text))).standard_normal(DIMENSION) for text in texts])
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(embedding_controller, "get_sentence_transformer", lambda: model)
+    return model
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(embedding_controller, "get_embedding_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_no_chunks_give_an_empty_array_of_the_model_dimension(model, cache, use_cache):
+    embeddings = embedding_controller.generate_embeddings([], show_progress_bar=False, use_cache=use_cache)
+    assert embeddings.shape == (0, DIMENSION)
+
+
+def test_cached_chunks_are_not_encoded_again(model, cache):
+    first = embedding_controller.generate_embeddings(["a", "b", "a"], show_progress_bar=False)
+    second = embedding_controller.generate_embeddings(["b", "c"], show_progress_bar=False)
+
+    assert model.encoded == ["a", "b", "c"]
+    np.testing.assert_array_equal(first[1], second[0])
+    np.testing.assert_array_equal(first[0], first[2])
+
+
+def test_vectors_of_another_backend_are_not_reused(model, cache, monkeypatch):
+    embedding_controller.generate_embeddings(["a"], show_progress_bar=False)
+    monkeypatch.setattr(model_registry, "BACKEND", "onnx-int8")
+    embedding_controller.generate_embeddings(["a"], show_progress_bar=False)
+
+    assert model.encoded == ["a", "a"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from models.controller.manager import embedding_manager
+from models.controller.manager.embedding_manager import Embedder
+
+WORDS = "fever cough rest honey water sleep pain arm broken cast".split()
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    vocab = {token: n for n, token in enumerate(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *WORDS])}
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1,
+                        num_attention_heads=2, intermediate_size=32)
+    model = BertModel(config).eval()
+    monkeypatch.setattr(embedding_manager, "get_transformer", lambda name, backend: (BertTokenizerFast(vocab=vocab), model))
+    return Embedder()
+
+
+def test_batches_of_mixed_lengths_match_one_chunk_at_a_time(embedder):
+    chunks = ["fever", "broken arm cast and pain", "rest", "honey water sleep", "cough cough"]
+
+    batched = embedder.embed_batch(chunks, batch_size=2)
+    single = np.array([embedding[0] for embedding in embedder.get_embeddings(chunks)], dtype=np.float32)
+
+    assert batched.shape == (5, 16) and batched.dtype == np.float32
+    np.testing.assert_allclose(batched, single, atol=1e-5)  # Padding does not leak into the mean
+
+
+def test_normalized_batches_have_unit_rows(embedder):
+    vectors = embedder.embed_batch(["fever and cough", "rest"], normalize=True)
+
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    assert embedder.embed_batch([]).shape == (0, 16)
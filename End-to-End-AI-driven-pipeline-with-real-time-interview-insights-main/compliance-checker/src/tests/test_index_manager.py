@@ -0,0 +1,186 @@
+import os
+
+import numpy as np
+import pytest
+
+from models.controller import vector_controller
+from models.controller.manager import index_manager
+from models.controller.manager.index_manager import INDEX_FILENAME, IndexManager
+
+DIMENSION = 8
+
+
+def vectors(count, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+def chunks(count, prefix="chunk"):
+    return [f"{prefix} {n}" for n in range(count)]
+
+
+def nearest(manager, query):
+    return int(manager.search(query[None, :], top_k=1)[1][0, 0])
+
+
+@pytest.fixture
+def folder(tmp_path):
+    return str(tmp_path / "index")
+
+
+def test_save_commits_without_rewriting_the_index_file(folder):
+    manager = IndexManager(folder)
+    manager.add_document("a", chunks(3), vectors(3))
+    manager.save()
+    assert not os.path.exists(os.path.join(folder, INDEX_FILENAME))
+    manager.close()
+
+    reopened = IndexManager(folder)
+    assert len(reopened) == 3
+    assert reopened.has_document("a")
+    reopened.close()
+
+
+def test_checkpoint_is_written_once_enough_changed(folder, monkeypatch):
+    monkeypatch.setattr(index_manager, "CHECKPOINT_MIN_CHANGES", 5)
+    manager = IndexManager(folder)
+    manager.add_document("a", chunks(3), vectors(3))
+    manager.save()
+    assert not os.path.exists(os.path.join(folder, INDEX_FILENAME))
+    manager.add_document("b", chunks(3), vectors(3, seed=1))
+    manager.save()
+    assert os.path.exists(os.path.join(folder, INDEX_FILENAME))
+    manager.close()
+
+
+def test_reopen_replays_changes_made_after_the_checkpoint(folder):
+    manager = IndexManager(folder)
+    a, b = vectors(4), vectors(4, seed=1)
+    a_ids = manager.add_document("a", chunks(4), a)
+    manager.checkpoint()
+    manager.remove_document("a")
+    b_ids = manager.add_document("b", chunks(4), b)
+    manager.save()
+    manager.close()
+
+    reopened = IndexManager(folder)
+    assert len(reopened) == 4
+    assert not reopened.has_document("a")
+    assert nearest(reopened, b[2]) == b_ids[2]
+    assert set(a_ids).isdisjoint(reopened.get_chunks(a_ids))
+    reopened.close()
+
+
+def test_ids_are_not_reused_after_an_uncommitted_add(folder):
+    manager = IndexManager(folder)
+    first = manager.add_document("a", chunks(2), vectors(2))
+    manager.checkpoint()
+    manager.add_document("lost", chunks(2), vectors(2, seed=1))  # Never saved, as after a crash
+    manager.close()
+
+    reopened = IndexManager(folder)
+    second = reopened.add_document("b", chunks(2), vectors(2, seed=2))
+    assert set(first).isdisjoint(second)
+    assert len(reopened) == 4
+    assert not reopened.has_document("lost")
+    reopened.close()
+
+
+def test_staged_document_replaces_the_previous_version_on_commit(folder):
+    manager = IndexManager(folder)
+    manager.add_document("a", chunks(3, "old"), vectors(3))
+    new = vectors(4, seed=1)
+    with manager.stage_document("a") as staged:
+        ids = staged.add_chunks(chunks(2, "new"), new[:2])
+        ids = np.concatenate([ids, staged.add_chunks(chunks(2, "more"), new[2:])])
+        staged.add_aliases([(ids[0], 10, 20)])
+        assert len(manager) == 3  # Searches still see the old version
+    assert len(manager) == 4
+    found = manager.get_chunks(ids)
+    assert [found[i]["chunk_no"] for i in ids] == [0, 1, 2, 3]
+    assert found[ids[0]]["aliases"] == [{"doc_id": "a", "start": 10, "end": 20}]
+    assert nearest(manager, new[3]) == ids[3]
+    manager.close()
+
+
+def test_failed_staged_document_leaves_the_previous_version(folder):
+    manager = IndexManager(folder)
+    old_ids = manager.add_document("a", chunks(3, "old"), vectors(3))
+    manager.save()
+    with pytest.raises(RuntimeError):
+        with manager.stage_document("a") as staged:
+            staged.add_chunks(chunks(2, "new"), vectors(2, seed=1))
+            raise RuntimeError("embedding failed")
+    manager.save()
+    manager.close()
+
+    reopened = IndexManager(folder)
+    assert len(reopened) == 3
+    assert sorted(reopened.get_chunks(old_ids)) == sorted(old_ids.tolist())
+    reopened.close()
+
+
+def test_writes_from_another_model_are_refused(folder):
+    manager = IndexManager(folder, model="all-minilm-l6-v2")
+    manager.add_document("a", chunks(3), vectors(3))
+    manager.save()
+    manager.close()
+
+    other = IndexManager(folder, model="all-minilm-l6-v2@onnx-int8")
+    assert other.stored_model() == "all-minilm-l6-v2"
+    with pytest.raises(ValueError):
+        other.add_document("b", chunks(2), vectors(2, seed=1))
+    with pytest.raises(ValueError):
+        other.stage_document("b")
+    with pytest.raises(ValueError):
+        other.rebuild("flat")
+    assert not other.has_document("b")
+    other.close()
+
+    same = IndexManager(folder, model="all-minilm-l6-v2")
+    same.add_document("b", chunks(2), vectors(2, seed=1))
+    assert len(same) == 5
+    same.close()
+
+
+def test_auto_rebuild_keeps_documents_replaceable(folder, monkeypatch):
+    monkeypatch.setattr(vector_controller, "AUTO_FLAT_MAX_VECTORS", 10)
+    manager = IndexManager(folder)
+    manager.add_document("a", chunks(300), vectors(300))
+    manager.add_document("b", chunks(100), vectors(100, seed=1))
+
+    assert manager.rebuild("auto") != "IndexHNSWFlat"
+    manager.add_document("a", chunks(5), vectors(5, seed=2))
+    assert len(manager) == 105
+    with pytest.raises(ValueError):
+        manager.rebuild("hnsw")
+    manager.close()
+
+
+def test_rebuild_reads_exact_vectors_and_leaves_documents_removable(folder):
+    manager = IndexManager(folder)
+    stored = vectors(400)
+    manager.add_document("a", chunks(300), stored[:300])
+    manager.add_document("b", chunks(100), stored[300:])
+
+    manager.rebuild("ivfpq", nlist=4)
+    ids, exact = manager.vectors()
+    np.testing.assert_array_equal(exact, stored)  # Not the compressed codes
+
+    manager.rebuild("ivf", nlist=4)
+    manager.vectors()
+    assert manager.remove_document("b") == 100
+    manager.add_document("a", chunks(5), vectors(5, seed=2))
+    assert len(manager) == 5
+    manager.close()
+
+
+def test_a_document_without_chunks_adds_nothing(folder):
+    fresh = IndexManager(folder)
+    assert len(fresh.add_document("empty", [], np.empty((0, DIMENSION), dtype=np.float32))) == 0
+    assert fresh.index is None
+    fresh.add_document("a", chunks(3), vectors(3))
+    assert len(fresh.add_document("empty", [], np.empty((0, 0), dtype=np.float32))) == 0
+    with fresh.stage_document("empty") as staged:
+        staged.add_chunks([], np.empty((0, DIMENSION), dtype=np.float32))
+    assert len(fresh) == 3
+    fresh.close()
@@ -0,0 +1,36 @@
+import threading
+
+from models.controller.job_queue import JobQueue
+
+
+def test_finished_jobs_beyond_the_cap_are_forgotten():
+    jobs = JobQueue(lambda value: None, num_workers=1, max_finished=2)
+    submitted = [jobs.submit(f"key-{n}", n)[0] for n in range(5)]
+    jobs._pending.join()  # Every job has finished
+
+    assert [jobs.get(job.id) for job in submitted[:3]] == [None, None, None]
+    assert [jobs.get(job.id).status for job in submitted[3:]] == ["done", "done"]
+    job, created = jobs.submit("key-0", 0)
+    assert created and job.id != submitted[0].id
+
+
+def test_finished_jobs_expire_after_the_ttl():
+    jobs = JobQueue(lambda value: None, num_workers=1, finished_ttl=0)
+    job, _ = jobs.submit("key", 1)
+    jobs._pending.join()  # Every job has finished
+
+    assert jobs.get(job.id) is None
+    assert jobs.submit("key", 1)[1]
+
+
+def test_unfinished_jobs_are_kept_and_deduplicated():
+    release = threading.Event()
+    jobs = JobQueue(lambda value: release.wait(), num_workers=1, max_finished=0)
+    first, _ = jobs.submit("key", 1)
+    second, created = jobs.submit("key", 1)
+
+    assert second is first and not created
+    assert jobs.get(first.id) is first
+    release.set()
+    jobs._pending.join()  # Every job has finished
+    assert jobs.get(first.id) is None
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from chatbot_matcher import PrefilteredMatcher
+from knowledge_store import KnowledgeStore
+
+
+def write_dataset(path, rows):
+    pd.DataFrame(rows, columns=["Question", "Response"]).to_excel(path, index=False)
+
+
+def test_a_reopened_store_serves_the_parsed_rows_without_reimporting(tmp_path):
+    dataset = tmp_path / "dataset.xlsx"
+    write_dataset(dataset, [("What helps a cough?", "Honey"), ("How to treat fever?", "Rest")])
+    store = KnowledgeStore(str(tmp_path / "kb.sqlite"))
+    assert store.import_shipped_datasets(str(tmp_path), paths=("dataset.xlsx",)) == {"dataset.xlsx": 2}
+    version = store.version()
+    store.close()
+
+    dataset.unlink()  # A rerun or another session only needs the database
+    store = KnowledgeStore(str(tmp_path / "kb.sqlite"))
+    assert store.to_frame().values.tolist() == [["What helps a cough?", "Honey"], ["How to treat fever?", "Rest"]]
+    assert store.version() == version  # Caches keyed on the version stay valid
+    store.close()
+
+
+def test_imports_merge_on_the_normalized_question(tmp_path):
+    store = KnowledgeStore(str(tmp_path / "kb.sqlite"))
+    csv = tmp_path / "extra.csv"
+    pd.DataFrame({"User_Input": ["what helps a COUGH", None, "   "], "Chatbot_Response": ["Warm water", "x", "y"]}
+                 ).to_csv(csv, index=False)
+
+    store.upsert_many([("What helps a cough?", "Honey"), ("How to treat fever?", "Rest")])
+    version = store.version()
+    assert store.import_file(str(csv), columns=("User_Input", "Chatbot_Response"), batch_size=1) == 1
+
+    assert store.to_frame().values.tolist() == [["what helps a COUGH", "Warm water"], ["How to treat fever?", "Rest"]]
+    assert store.version() > version
+    store.close()
+
+
+def test_datasets_without_the_columns_are_rejected(tmp_path):
+    store = KnowledgeStore(str(tmp_path / "kb.sqlite"))
+    csv = tmp_path / "other.csv"
+    pd.DataFrame({"Last_Message": ["hi"], "AI_Response": ["hello"]}).to_csv(csv, index=False)
+
+    with pytest.raises(ValueError):
+        store.import_file(str(csv))
+    assert store.import_shipped_datasets(str(tmp_path)) == {}  # Shipped files that are absent are skipped
+    assert len(store) == 0
+    store.close()
+
+
+def test_candidates_share_words_with_the_query_and_the_matcher_scores_them(tmp_path):
+    store = KnowledgeStore(str(tmp_path / "kb.sqlite"))
+    store.upsert_many([("What helps a cough?", "Honey"), ("How to treat fevers?", "Rest"),
+                       ("Is walking good exercise?", "Yes")])
+
+    # Stemmed words match, the best BM25 match comes first and questions sharing no word are left out
+    assert [question for question, _ in store.candidates("treating a fever")] == [
+        "How to treat fevers?", "What helps a cough?",
+    ]
+    assert store.candidates("!!!") == []
+
+    matcher = PrefilteredMatcher(store)
+    assert matcher.match_many(["what helps with a cough", "broken arm", "How to treat fevers"]) == ["Honey", None, "Rest"]
+    store.close()
@@ -0,0 +1,53 @@
+import sys
+import threading
+
+import pytest
+
+from models.controller.manager import metrics_manager
+from models.controller.manager.metrics_manager import RunMetrics, count, start_run
+
+
+@pytest.fixture(autouse=True)
+def metrics_enabled(monkeypatch):
+    monkeypatch.setattr(metrics_manager, "METRICS_ENABLED", True)
+
+
+def test_counters_are_attributed_to_the_run_on_the_same_thread():
+    summaries = {}
+    both_counted = threading.Barrier(2)
+
+    def job(name, hits, misses):
+        run = start_run("test")
+        count("embedding_cache", hits=hits, misses=misses)
+        both_counted.wait()
+        summaries[name] = run.finish()
+
+    threads = [threading.Thread(target=job, args=("a", 3, 1)), threading.Thread(target=job, args=("b", 5, 5))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert summaries["a"]["counters"] == {"embedding_cache_hits": 3, "embedding_cache_misses": 1,
+                                          "embedding_cache_hit_rate": 0.75}
+    assert summaries["b"]["counters"]["embedding_cache_hits"] == 5
+
+
+def test_counts_after_finish_do_not_reach_the_run():
+    run = start_run("test")
+    run.finish()
+    count("embedding_cache", hits=1)
+    assert run.summary()["counters"] == {}
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="RSS is read from /proc")
+def test_rss_is_sampled_during_the_run():
+    run = RunMetrics("test")
+    with run.stage("work"):
+        ballast = bytearray(64 * 2**20)
+        ballast[::4096] = b"x" * len(ballast[::4096])  # Touch every page
+    run._sample_rss(force=True)
+    summary = run.finish()
+    del ballast
+
+    assert summary["rss_peak_bytes"] >= summary["rss_start_bytes"] + 32 * 2**20
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from models.controller import model_registry
+from models.controller.model_registry import get_sentence_transformer, model_id, resolve_model_path
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    calls = []
+
+    def load(name, backend):
+        calls.append((name, backend))
+        return object()
+
+    monkeypatch.setattr(model_registry, "_models", {})
+    monkeypatch.setattr(model_registry, "_load", load)
+    monkeypatch.setattr(model_registry, "_configure_threads", lambda: None)
+    return calls
+
+
+def test_every_caller_shares_one_model(loads):
+    models = []
+    threads = [
+        threading.Thread(target=lambda name=name: models.append(get_sentence_transformer(name, "torch")))
+        for name in ["all-MiniLM-L6-v2", "sentence-transformers/all-MiniLM-L6-v2"] * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
+    assert get_sentence_transformer(backend="onnx") is not models[0]  # Another backend is another model
+
+
+def test_unknown_backends_are_rejected(loads):
+    with pytest.raises(ValueError):
+        get_sentence_transformer(backend="tensorflow")
+    assert loads == []
+
+
+def test_local_copies_are_preferred_and_offline_mode_never_downloads(tmp_path, monkeypatch):
+    (tmp_path / "all-MiniLM-L6-v2").mkdir()
+    monkeypatch.setattr(model_registry, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(model_registry, "OFFLINE", True)
+
+    assert resolve_model_path("sentence-transformers/all-MiniLM-L6-v2") == str(tmp_path / "all-MiniLM-L6-v2")
+    with pytest.raises(FileNotFoundError):
+        resolve_model_path("paraphrase-MiniLM-L3-v2")
+
+
+
+def test_model_ids_tell_backends_apart():
+    assert model_id("sentence-transformers/all-MiniLM-L6-v2", "torch") == "all-MiniLM-L6-v2"
+    assert model_id("all-MiniLM-L6-v2", "onnx-int8") == "all-MiniLM-L6-v2@onnx-int8"
+
+
+def test_the_configured_backend_is_the_default(loads, monkeypatch):
+    monkeypatch.setattr(model_registry, "BACKEND", "torch-int8")
+
+    get_sentence_transformer()
+
+    assert loads == [("all-MiniLM-L6-v2", "torch-int8")]
+    assert model_id() == "all-MiniLM-L6-v2@torch-int8"
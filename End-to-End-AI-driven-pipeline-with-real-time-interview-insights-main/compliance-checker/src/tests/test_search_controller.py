@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+from flask import Flask
+
+from models.controller import search_controller
+from models.controller.manager.index_manager import IndexManager
+from models.controller.search_controller import MicroBatcher, configure_search, search_bp
+
+
+def test_a_failing_item_only_fails_its_own_request():
+    batches = []
+
+    def handle_batch(items):
+        batches.append(list(items))
+        if "bad" in items:
+            raise ValueError("bad item")
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher(handle_batch, max_batch_size=8, max_wait_ms=200)
+    results = {}
+
+    def submit(item):
+        try:
+            results[item] = batcher.submit(item, timeout=5)
+        except ValueError as e:
+            results[item] = e
+
+    threads = [threading.Thread(target=submit, args=(item,)) for item in ("a", "bad", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results["a"] == "A" and results["b"] == "B"
+    assert isinstance(results["bad"], ValueError)
+    assert len(batches[0]) == 3  # Batched together before being retried one by one
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, fake_embeddings):
+    monkeypatch.setattr(search_controller, "generate_embeddings", fake_embeddings)
+    index = IndexManager(str(tmp_path / "index"))
+    chunks = ["fever and cough", "broken arm"]
+    index.add_document("doc", chunks, fake_embeddings(chunks))
+    configure_search(index, max_wait_ms=0)
+    app = Flask(__name__)
+    app.register_blueprint(search_bp)
+    yield app.test_client()
+    monkeypatch.setattr(search_controller, "search_service", None)
+    index.close()
+
+
+def test_search_returns_the_closest_chunk(client):
+    response = client.post("/search", json={"query": "cough", "top_k": 1})
+
+    assert response.status_code == 200
+    assert [hit["text"] for hit in response.get_json()["results"]] == ["fever and cough"]
+
+
+@pytest.mark.parametrize("body", [
+    ["cough"],
+    {"query": ["cough"]},
+    {"query": 3},
+    {"query": "cough", "top_k": "many"},
+    {"query": "cough", "top_k": True},
+    {"query": "cough", "top_k": None},
+    {"query": "cough", "collections": "clinic-1"},
+    {"query": "cough", "collections": [1]},
+    {"query": "cough", "collections": {"name": "clinic-1"}},
+])
+def test_malformed_requests_are_rejected_before_batching(client, body):
+    assert client.post("/search", json=body).status_code == 400
+    assert client.post("/search", json={"query": "cough"}).status_code == 200
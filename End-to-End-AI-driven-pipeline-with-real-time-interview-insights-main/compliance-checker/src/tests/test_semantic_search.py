@@ -0,0 +1,100 @@
+import os
+
+import pandas as pd
+import pytest
+
+import semantic_search
+from knowledge_store import KnowledgeStore
+from semantic_search import SemanticQuestionIndex
+
+
+@pytest.fixture(autouse=True)
+def embeddings(monkeypatch, fake_embeddings):
+    calls = []
+
+    def generate(texts, **kwargs):
+        calls.append(list(texts))
+        return fake_embeddings(texts, **kwargs)
+
+    monkeypatch.setattr(semantic_search, "generate_embeddings", generate)
+    semantic_search._encode_normalized_query.cache_clear()
+    yield calls
+    semantic_search._encode_normalized_query.cache_clear()
+
+
+def store_index(path, pairs):
+    store = KnowledgeStore(path)
+    store.upsert_many(pairs)
+    database = store.to_frame()
+    index = SemanticQuestionIndex.load_or_build(database, path, version=[store.store_id, store.version()])
+    store.close()
+    return index
+
+
+def test_a_recreated_store_does_not_reuse_the_persisted_index(tmp_path, embeddings):
+    path = str(tmp_path / "kb.sqlite")
+    store_index(path, [("how to treat a fever", "Rest"), ("what helps a cough", "Honey")])
+    os.remove(path)
+
+    index = store_index(path, [("what helps a cough", "Honey and warm water")])
+
+    assert len(embeddings) == 2  # Embedded again, though the version counter matches
+    assert index.match("What helps a cough?") == "Honey and warm water"
+
+
+def test_an_unchanged_dataset_loads_the_persisted_index(tmp_path, embeddings):
+    database = pd.DataFrame({"Question": ["how to treat a fever", None, "what helps a cough"],
+                             "Response": ["Rest", "Ignored", "Honey"]})
+    path = str(tmp_path / "qa.csv")
+    database.to_csv(path, index=False)
+
+    SemanticQuestionIndex.load_or_build(database, path)
+    index = SemanticQuestionIndex.load_or_build(database, path)
+
+    assert len(embeddings) == 1
+    assert index.match("how to treat fever") == "Rest"
+
+
+def test_an_edited_dataset_file_rebuilds_the_index(tmp_path, embeddings):
+    path = str(tmp_path / "qa.csv")
+    first = pd.DataFrame({"Question": ["how to treat a fever"], "Response": ["Rest"]})
+    first.to_csv(path, index=False)
+    SemanticQuestionIndex.load_or_build(first, path)
+
+    second = pd.DataFrame({"Question": ["how to treat a fever", "what helps a cough"],
+                           "Response": ["Rest", "Honey"]})
+    second.to_csv(path, index=False)
+    index = SemanticQuestionIndex.load_or_build(second, path)
+
+    assert len(embeddings) == 2
+    assert index.match("what helps a cough") == "Honey"
+
+
+def test_queries_below_the_threshold_get_no_answer(tmp_path):
+    database = pd.DataFrame({"Question": ["how to treat a fever"], "Response": ["Rest"]})
+    index = SemanticQuestionIndex.load_or_build(database, str(tmp_path / "qa.csv"), threshold=0.5)
+
+    assert index.match("broken arm cast") is None
+
+
+def test_repeated_queries_are_encoded_once(tmp_path, embeddings):
+    database = pd.DataFrame({"Question": ["how to treat a fever"], "Response": ["Rest"]})
+    index = SemanticQuestionIndex.load_or_build(database, str(tmp_path / "qa.csv"))
+
+    for query in ["How to treat a fever?", "how to  treat a fever?", "HOW TO TREAT A FEVER?"]:
+        assert index.match(query) == "Rest"
+    assert embeddings[1:] == [["how to treat a fever?"]]
+
+
+def test_a_document_is_matched_in_one_batch_with_each_question_once(tmp_path, embeddings):
+    database = pd.DataFrame({"Question": ["how to treat a fever", "what helps a cough", "is walking good exercise"],
+                             "Response": ["Rest", "Honey", "Yes"]})
+    index = SemanticQuestionIndex.load_or_build(database, str(tmp_path / "qa.csv"))
+    chunks = ["fever treat how", "unrelated words here", "what helps a cough and a fever", "what helps a cough"]
+
+    hits = index.match_document(chunks, top_k=2)
+
+    assert embeddings[1:] == [chunks]  # All chunks in a single call
+    assert [(row, chunk_no) for row, _, chunk_no in hits] == [(1, 3), (0, 0)]
+    assert hits[0][1] >= hits[1][1] > index.threshold
+    assert index.match_document([]) == []
@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+import pytest
+
+from models.controller.manager import index_manager
+from models.controller.manager.index_manager import IndexManager
+from models.controller.manager.shard_manager import ShardedIndex, routing
+
+DIMENSION = 8
+
+
+def vectors(count, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ShardedIndex(str(tmp_path / "shards"), hash_shards=2)
+    yield index
+    index.close()
+
+
+def test_routing_places_documents_in_their_collection(index):
+    with index.stage_document("a", **routing(index, "clinic-1")) as staged:
+        staged.add_chunks(["first", "second"], vectors(2))
+
+    assert index.shards == {"clinic-1": 2}
+    assert index.has_document("a", collection="clinic-1")
+    assert not index.has_document("a")
+
+
+def test_routing_rejects_collections_without_shards(tmp_path, index):
+    manager = IndexManager(str(tmp_path / "flat"))
+    assert routing(manager) == {}
+    with pytest.raises(ValueError):
+        routing(manager, "clinic-1")
+    with pytest.raises(ValueError):
+        routing(index, "hash-00")
+    manager.close()
+
+
+def test_rebuild_shard_keeps_answering_searches_while_writing(index, monkeypatch):
+    index.add_document("a", ["chunk"] * 50, vectors(50), collection="clinic-1")
+    searched = []
+    write = index_manager.save_faiss_index
+
+    def write_while_searching(faiss_index, path):
+        # Runs while the checkpoint is written; a search must not wait for it
+        searcher = threading.Thread(target=lambda: searched.append(index.search(vectors(1, seed=1))))
+        searcher.start()
+        searcher.join(timeout=5)
+        write(faiss_index, path=path)
+
+    monkeypatch.setattr(index_manager, "save_faiss_index", write_while_searching)
+    index.rebuild_shard("clinic-1", "flat")
+
+    assert len(searched) == 1
+
+
+def test_reload_shard_keeps_staged_documents_and_pending_writes(index):
+    index.add_document("a", ["chunk"] * 10, vectors(10), collection="clinic-1")
+    index.rebuild_shard("clinic-1", "flat")  # Writes the checkpoint that gets reloaded
+    staged = index.stage_document("b", collection="clinic-1")
+    staged.add_chunks(["staged"] * 3, vectors(3, seed=1))
+    index.add_document("c", ["pending"] * 4, vectors(4, seed=2), collection="clinic-1")  # Not saved
+
+    index.reload_shard("clinic-1")
+    staged.add_chunks(["staged"] * 2, vectors(2, seed=3))
+    staged.commit()
+
+    assert index.shards == {"clinic-1": 19}
+    assert all(index.has_document(doc_id, collection="clinic-1") for doc_id in "abc")
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import write_pdf
+from models.controller.chunk_controller import chunk_spans, chunk_text, iter_chunks
+from models.controller.manager.index_manager import IndexManager
+
+
+@pytest.mark.parametrize("page_sizes", [[1200], [30, 30, 900, 7], [450] * 5, [1] * 80])
+def test_streamed_chunks_match_whole_text_chunks(page_sizes):
+    text = "".join(chr(ord("a") + n % 26) for n in range(sum(page_sizes)))
+    pages, start = [], 0
+    for size in page_sizes:
+        pages.append(text[start:start + size])
+        start += size
+
+    chunks = list(iter_chunks(pages))
+
+    assert chunks == chunk_text(text)
+    assert [text[begin:end] for begin, end in chunk_spans(chunks)] == chunks
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch, fake_embeddings):
+    monkeypatch.chdir(tmp_path)  # main creates its data folders in the working directory
+    import main
+
+    monkeypatch.setattr(main, "generate_embeddings", fake_embeddings)
+    return main
+
+
+def indexed_chunks(index):
+    chunks = index.get_chunks(np.arange(len(index) + 100))
+    return sorted((chunk["start"], chunk["end"], chunk["text"], len(chunk["aliases"])) for chunk in chunks.values())
+
+
+def test_streaming_indexes_the_same_chunks_as_the_whole_document_run(tmp_path, monkeypatch, pipeline):
+    write_pdf(str(tmp_path / "doc.pdf"), pages=3)
+    indexes = {}
+    for streaming in (False, True):
+        index = indexes[streaming] = IndexManager(str(tmp_path / f"index-{streaming}"))
+        monkeypatch.setattr(pipeline, "_index_manager", index)
+        pipeline.process_pdf_pipeline(str(tmp_path / "doc.pdf"), streaming=streaming, batch_size=3, queue_size=1)
+
+    assert len(indexes[True]) > 3
+    assert indexed_chunks(indexes[True]) == indexed_chunks(indexes[False])
+
+
+def test_a_failed_streaming_run_keeps_the_indexed_version(tmp_path, monkeypatch, pipeline, fake_embeddings):
+    write_pdf(str(tmp_path / "doc.pdf"), pages=3)
+    index = IndexManager(str(tmp_path / "index"))
+    monkeypatch.setattr(pipeline, "_index_manager", index)
+    pipeline.process_pdf_pipeline(str(tmp_path / "doc.pdf"), streaming=True, batch_size=3)
+    before = indexed_chunks(index)
+
+    calls = []
+
+    def fail_later(texts, **kwargs):
+        calls.append(texts)
+        return fake_embeddings(texts) if len(calls) < 3 else {"error": "model failed"}
+
+    monkeypatch.setattr(pipeline, "generate_embeddings", fail_later)
+    with pytest.raises(RuntimeError):
+        pipeline.process_pdf_pipeline(str(tmp_path / "doc.pdf"), streaming=True, batch_size=3)
+
+    assert indexed_chunks(index) == before
@@ -0,0 +1,33 @@
+from benchmarks.synthetic import (
+    BOILERPLATE_HEADER, DISCLAIMER, FOOTER, HEADER, make_boilerplate_document, make_chunks, make_document,
+    make_qa_dataset, write_pdf,
+)
+from models.controller.manager.ingestion_manager import iter_pdf_pages
+
+
+def test_generators_are_reproducible():
+    assert make_chunks(20, seed=3) == make_chunks(20, seed=3) != make_chunks(20, seed=4)
+    assert make_document(50, seed=3) == make_document(50, seed=3)
+    assert make_qa_dataset(30, style="chatbot", seed=3).equals(make_qa_dataset(30, style="chatbot", seed=3))
+
+
+def test_chunks_respect_their_word_counts():
+    assert all(2 <= len(chunk.split()) <= 4 for chunk in make_chunks(50, min_words=2, max_words=4))
+
+
+def test_boilerplate_takes_the_requested_share_of_each_page():
+    document = make_boilerplate_document(pages=4, boilerplate=0.25)
+    boilerplate_words = len((BOILERPLATE_HEADER + DISCLAIMER).split()) * 4
+
+    assert document.count(DISCLAIMER) == 4
+    assert abs(boilerplate_words / len(document.split()) - 0.25) < 0.02
+
+
+def test_written_pdfs_are_readable_page_by_page(tmp_path):
+    body_chars = write_pdf(str(tmp_path / "doc.pdf"), pages=3, lines_per_page=5, seed=2)
+    pages = list(iter_pdf_pages(str(tmp_path / "doc.pdf")))
+
+    assert len(pages) == 3
+    assert all(HEADER in page and FOOTER in page for page in pages)
+    assert "Page 2 of 3" in pages[1]
+    assert body_chars > 0
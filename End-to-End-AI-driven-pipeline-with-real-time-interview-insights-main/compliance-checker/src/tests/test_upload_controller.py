@@ -0,0 +1,46 @@
+import io
+import threading
+import time
+
+import pytest
+
+from models.controller import upload_controller
+from models.controller.upload_controller import app, configure_ingestion
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_controller, "UPLOAD_FOLDER", str(tmp_path))
+    release = threading.Event()
+    configure_ingestion(lambda filepath, collection: release.wait(), num_workers=1, max_pending=1)
+    yield tmp_path
+    release.set()
+    monkeypatch.setattr(upload_controller, "job_queue", None)
+
+
+def upload(client, name, content):
+    return client.post("/upload", data={"file": (io.BytesIO(content), name)}, content_type="multipart/form-data")
+
+
+def test_an_upload_rejected_with_429_is_not_kept(uploads):
+    client = app.test_client()
+    running = upload(client, "running.pdf", b"%PDF running").get_json()
+    while upload_controller.job_queue.get(running["job_id"]).status != "running":
+        time.sleep(0.01)
+    assert upload(client, "queued.pdf", b"%PDF queued").status_code == 202
+
+    assert upload(client, "rejected.pdf", b"%PDF rejected").status_code == 429
+    assert sorted(path.name.split("_", 1)[1] for path in uploads.iterdir()) == ["queued.pdf", "running.pdf"]
+
+
+def test_a_429_keeps_a_file_another_job_still_needs(uploads):
+    client = app.test_client()
+    running = upload(client, "running.pdf", b"%PDF running").get_json()
+    while upload_controller.job_queue.get(running["job_id"]).status != "running":
+        time.sleep(0.01)
+    assert upload(client, "queued.pdf", b"%PDF queued").status_code == 202
+    # Same file as the running job, but its earlier attempt is gone so it is submitted again
+    upload_controller.job_queue._jobs_by_key.clear()
+
+    assert upload(client, "running.pdf", b"%PDF running").status_code == 429
+    assert (uploads / running["file_path"].rsplit("/", 1)[1]).exists()
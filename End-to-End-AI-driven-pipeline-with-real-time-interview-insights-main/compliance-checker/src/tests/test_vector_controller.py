@@ -0,0 +1,44 @@
+import faiss
+import numpy as np
+import pytest
+
+from models.controller.vector_controller import (
+    choose_index_type, create_faiss_index, estimate_index_bytes, search_faiss_index,
+)
+
+
+def clustered_vectors(count, dimension=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((20, dimension)) * 5
+    return (centers[rng.integers(0, 20, count)] + rng.standard_normal((count, dimension))).astype(np.float32)
+
+
+def test_small_corpora_stay_exact_and_budgets_pick_smaller_types():
+    assert choose_index_type(1_000, 384) == 'flat'
+    assert choose_index_type(1_000_000, 384) == 'hnsw'
+    hnsw_mb = estimate_index_bytes('hnsw', 1_000_000, 384) / 2**20
+    assert choose_index_type(1_000_000, 384, memory_budget_mb=hnsw_mb - 1) == 'ivf'
+    assert choose_index_type(1_000_000, 384, memory_budget_mb=100) == 'ivfpq'
+    assert choose_index_type(1_000_000, 384, removable=True) == 'ivf'
+
+
+@pytest.mark.parametrize("index_type", ['flat', 'ivf', 'hnsw', 'ivfpq'])
+def test_every_type_finds_the_stored_vectors(index_type):
+    vectors = clustered_vectors(2_000)
+    index = create_faiss_index(vectors, index_type=index_type, nprobe=8)
+
+    _, ids = search_faiss_index(index, vectors[:50], top_k=5)
+
+    recall = np.mean([n in row for n, row in enumerate(ids)])
+    assert recall >= (1.0 if index_type == 'flat' else 0.9)
+
+
+def test_ids_are_returned_and_cosine_queries_are_normalized():
+    vectors = clustered_vectors(100)
+    index = create_faiss_index(vectors, metric='cosine', ids=np.arange(100) + 1000)
+
+    scores, ids = search_faiss_index(index, vectors[:3] * 10, top_k=1, metric='cosine')
+
+    assert isinstance(index, faiss.IndexIDMap2)
+    assert ids[:, 0].tolist() == [1000, 1001, 1002]
+    np.testing.assert_allclose(scores[:, 0], 1.0, rtol=1e-5)
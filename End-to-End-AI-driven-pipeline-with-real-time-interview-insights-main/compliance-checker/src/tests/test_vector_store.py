@@ -0,0 +1,44 @@
+import numpy as np
+
+from models.controller.manager.utils.vector_store import LocalVectorStore
+
+
+def vectors(count, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, 8)).astype(np.float32)
+
+
+def test_batched_search_matches_brute_force():
+    store = LocalVectorStore(8, capacity=1)
+    for batch in np.split(vectors(100), [3, 10, 60]):  # Grows past the capacity several times
+        store.add_embeddings(batch)
+    queries = vectors(5, seed=1)
+
+    distances, indices = store.search_many(queries, top_k=4)
+
+    expected = ((queries[:, None] - vectors(100)[None]) ** 2).sum(axis=2)
+    np.testing.assert_array_equal(indices, np.argsort(expected, axis=1)[:, :4])
+    np.testing.assert_allclose(distances, np.sort(expected, axis=1)[:, :4], rtol=1e-4)
+    assert store.search(queries[0], top_k=4)[1] == indices[0].tolist()
+
+
+def test_missing_neighbours_are_padded():
+    store = LocalVectorStore(8)
+    store.add_embeddings(vectors(2))
+
+    distances, indices = store.search_many(vectors(1, seed=1), top_k=3)
+
+    assert indices[0, 2] == -1 and distances[0, 2] == np.inf
+
+
+def test_a_reopened_store_is_mapped_and_copied_on_write(tmp_path):
+    store = LocalVectorStore(8)
+    store.add_embeddings(vectors(10))
+    store.save(str(tmp_path / "store.npy"))
+
+    reopened = LocalVectorStore.open(str(tmp_path / "store.npy"))
+    assert isinstance(reopened._buffer, np.memmap)
+    np.testing.assert_array_equal(reopened.embeddings, vectors(10))
+
+    reopened.add_embeddings(vectors(1, seed=1))
+    assert len(reopened) == 11
+    np.testing.assert_array_equal(np.load(str(tmp_path / "store.npy")), vectors(10))  # The file is untouched
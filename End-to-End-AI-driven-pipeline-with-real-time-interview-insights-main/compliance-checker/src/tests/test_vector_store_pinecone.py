@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+
+from models.controller.manager.utils.fake_pinecone import FakePineconeIndex
+from models.controller.manager.utils.vector_store_pinecone import MAX_REQUEST_BYTES, PineconeVectorStore
+
+
+def normalized_vectors(count, dimension=384, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class RecordingIndex(FakePineconeIndex):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.request_bytes = []
+
+    def upsert(self, vectors, namespace=None):
+        self.request_bytes.append(len(json.dumps(vectors)))
+        return super().upsert(vectors, namespace)
+
+
+class RejectingIndex(FakePineconeIndex):
+    def upsert(self, vectors, namespace=None):
+        with self._lock:
+            self.requests += 1
+        raise ValueError("Invalid vector")
+
+
+def test_large_batches_are_split_under_the_request_size_limit():
+    index = RecordingIndex()
+    store = PineconeVectorStore("test", index=index)
+    ids = [f"doc:{n}" for n in range(3000)]
+    stats = store.add_embeddings(ids, normalized_vectors(3000), batch_size=1000, backoff=0.001)
+
+    assert len(index.vectors) == 3000
+    assert stats["retries"] == 0
+    assert stats["batches"] == index.requests > 3
+    assert max(index.request_bytes) <= MAX_REQUEST_BYTES
+
+
+def test_metadata_counts_towards_the_request_size():
+    index = RecordingIndex()
+    store = PineconeVectorStore("test", index=index)
+    metadata = [{"doc_id": "doc", "text": "x" * 2000} for _ in range(500)]
+    store.add_embeddings([str(n) for n in range(500)], normalized_vectors(500), metadata=metadata, batch_size=1000)
+
+    assert len(index.vectors) == 500
+    assert max(index.request_bytes) <= MAX_REQUEST_BYTES
+
+
+def test_transient_failures_are_retried():
+    index = FakePineconeIndex(failure_rate=0.3, seed=1)
+    store = PineconeVectorStore("test", index=index)
+    stats = store.add_embeddings([str(n) for n in range(500)], normalized_vectors(500, dimension=8),
+                                 batch_size=50, max_retries=10, backoff=0.001)
+
+    assert len(index.vectors) == 500
+    assert stats["retries"] > 0
+
+
+def test_rejected_requests_are_not_retried():
+    index = RejectingIndex()
+    store = PineconeVectorStore("test", index=index)
+    with pytest.raises(ValueError):
+        store.add_embeddings(["a"], normalized_vectors(1, dimension=8), max_workers=1, backoff=0.001)
+    assert index.requests == 1